@@ -0,0 +1,125 @@
+"""
+Caching around Firebase ID-token verification.
+
+`verify_id_token(check_revoked=True)` costs a signature check against Google's
+public keys plus a network call to Firebase for the revocation status.
+`VerifiedTokenCache` keeps verified claims per token (keyed by its SHA-256,
+so raw tokens are never held), never past the token's own `exp`, and only
+repeats the revocation check every `revocation_interval` seconds.
+`SigningKeyPrefetcher` keeps the verifier's HTTP cache of the signing keys
+warm so no request pays for fetching them.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from firebase_admin import auth
+
+from app.core.background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+ID_TOKEN_CERT_URI = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+
+class _Entry:
+    __slots__ = ("claims", "expires_at", "checked_at")
+
+    def __init__(self, claims: Dict[str, Any], expires_at: float, checked_at: float):
+        self.claims = claims
+        self.expires_at = expires_at
+        self.checked_at = checked_at
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_entries: int = 256, revocation_interval: float = 300.0):
+        self.max_entries = max_entries
+        self.revocation_interval = revocation_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # get_current_user is a sync dependency, so it runs on the threadpool.
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "revocation_checks": 0, "evictions": 0}
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the verified claims for `token`, raising the same auth errors as
+        `auth.verify_id_token(token, check_revoked=True)`.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.expires_at:
+                del self._entries[key]
+                entry = None
+            if entry is not None and now - entry.checked_at < self.revocation_interval:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry.claims
+            self._counters["misses" if entry is None else "revocation_checks"] += 1
+
+        try:
+            claims = auth.verify_id_token(token, check_revoked=True)
+        except Exception:
+            self.forget(key)
+            raise
+
+        with self._lock:
+            self._entries[key] = _Entry(claims, float(claims.get("exp", now)), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return claims
+
+    def forget(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, size=len(self._entries), max_entries=self.max_entries)
+
+
+class SigningKeyPrefetcher:
+    """Fetch Google's token signing keys at startup and keep them fresh in the background."""
+
+    def __init__(self, refresh_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self._tasks = BackgroundTasks()
+
+    def prefetch(self):
+        try:
+            # The verifier's request object caches responses per Cache-Control,
+            # so fetching through it is what warms verification.
+            request = auth._get_client(None)._token_verifier.request
+            request(ID_TOKEN_CERT_URI, method="GET")
+        except Exception as e:
+            logger.warning("Could not prefetch token signing keys: %s", e)
+
+    async def _run(self):
+        while True:
+            await asyncio.to_thread(self.prefetch)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks.spawn(self._run())
+
+    async def close(self):
+        await self._tasks.stop()
+
+
+token_cache = VerifiedTokenCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "256")),
+    revocation_interval=float(os.getenv("TOKEN_REVOCATION_CHECK_INTERVAL", "300")),
+)
+signing_keys = SigningKeyPrefetcher(refresh_interval=float(os.getenv("TOKEN_KEYS_REFRESH_INTERVAL", "3600")))
@@ -0,0 +1,35 @@
+"""
+Tasks that run in the background of a long-lived service object.
+
+Services start their loops from the app's lifespan hook and stop them on
+shutdown: `spawn` runs a coroutine as a task, `stop` cancels the tasks still
+running and waits until they have unwound, `wait` lets them finish instead.
+Finished tasks drop out of the set on their own.
+"""
+import asyncio
+from typing import Coroutine, Set
+
+
+class BackgroundTasks:
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def wait(self):
+        """Wait for every running task to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self):
+        """Cancel every running task and wait until they have finished."""
+        for task in self._tasks:
+            task.cancel()
+        await self.wait()
@@ -0,0 +1,4 @@
+"""Limits Firestore puts on writes, shared by everything that batches them."""
+
+# Writes per WriteBatch or transaction.
+MAX_BATCH_WRITES = 500
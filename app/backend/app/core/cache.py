@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-collection freshness windows (seconds). Arena counters move quickly,
+# the rest of the content only changes through the admin dashboard.
+DEFAULT_TTLS = {
+    "projects": 300,
+    "writings": 300,
+    "systems": 600,
+    "vault": 300,
+    "arena": 15,
+}
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class ReadCache:
+    """
+    Bounded LRU cache for Firestore reads.
+
+    Keys are tuples whose first element is the collection name, e.g.
+    ("projects", "list") or ("projects", "doc", project_id). Entries are fresh
+    for the collection TTL, then served stale for `stale_ttl` more seconds while
+    a single background refresh runs. Concurrent misses on the same key await
+    one shared load task.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 60,
+        stale_ttl: float = 300,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = dict(ttls or {})
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._flights: Dict[Tuple, asyncio.Task] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def ttl_for(self, collection: str) -> float:
+        return self.ttls.get(collection, self.default_ttl)
+
+    async def get_or_load(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, awaiting `loader` at most once per miss."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry.expires_at:
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            self._counters["stale_hits"] += 1
+            if key not in self._flights:
+                self._start_flight(key, loader)
+            return entry.value
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["misses"] += 1
+            flight = self._start_flight(key, loader)
+        # The load runs as its own task so a cancelled request cannot abort it
+        # for everyone else waiting on the same key.
+        return await asyncio.shield(flight)
+
+    def peek(self, key: Tuple) -> Any:
+        """Return the fresh cached value for `key` without loading, or None."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry.expires_at:
+            return None
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return entry.value
+
+    def put(self, key: Tuple, value: Any):
+        """Store a value produced outside `get_or_load`."""
+        self._store(key, value)
+
+    def discard(self, key: Tuple):
+        """Drop one entry, leaving the rest of its collection alone."""
+        self._entries.pop(key, None)
+
+    def invalidate(self, collection: str, doc_id: Optional[str] = None):
+        """
+        Drop every list/query entry for `collection` plus the detail entry for
+        `doc_id`. Loads already in flight for the collection will not be stored.
+        """
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        doomed = [
+            key for key in self._entries
+            if key[0] == collection and (key[1] != "doc" or key[2] == doc_id)
+        ]
+        for key in doomed:
+            del self._entries[key]
+        # Callers arriving after the write must not join a pre-write load.
+        for key in [key for key in self._flights if key[0] == collection]:
+            del self._flights[key]
+        self._counters["invalidations"] += 1
+
+    def clear(self):
+        for collection in {key[0] for key in self._entries}:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _start_flight(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        # The generation is taken now, not when the task first runs, so an
+        # invalidation in between still keeps the result out of the cache.
+        generation = self._generations.get(key[0], 0)
+        flight = asyncio.ensure_future(self._load(key, loader, generation))
+        flight.add_done_callback(lambda task: self._end_flight(key, task))
+        self._flights[key] = flight
+        return flight
+
+    async def _load(self, key: Tuple, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        self._counters["loads"] += 1
+        value = await loader()
+        # A write landed while we were loading; the value may predate it.
+        if self._generations.get(key[0], 0) == generation:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Tuple, value: Any):
+        now = time.monotonic()
+        ttl = self.ttl_for(key[0])
+        self._entries[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _end_flight(self, key: Tuple, task: asyncio.Task):
+        # The flight may already have been detached by an invalidation and
+        # replaced with a newer one.
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Marks the exception retrieved for background refreshes nobody awaits.
+            self._counters["load_errors"] += 1
+            logger.error("Cache load failed for %s: %s", key, task.exception())
+
+
+read_cache = ReadCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+    default_ttl=float(os.getenv("CACHE_DEFAULT_TTL", "60")),
+    stale_ttl=float(os.getenv("CACHE_STALE_TTL", "300")),
+    ttls=DEFAULT_TTLS,
+)
@@ -0,0 +1,90 @@
+import time
+from collections import deque
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one upstream dependency.
+
+    Closed: calls flow and outcomes are tracked over the last `window` calls.
+    Once at least `min_calls` are recorded and the failure rate reaches
+    `failure_rate`, the breaker opens and rejects calls for `cooldown`
+    seconds. After that it is half-open: a single probe call is let through,
+    and its outcome closes the breaker again or restarts the cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5, cooldown: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Ask permission for one call; every True must be followed by a record_* call."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self._counters["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self._counters["successes"] += 1
+        if self._state == self.HALF_OPEN:
+            self._close()
+        else:
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        self._counters["failures"] += 1
+        if self._state == self.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+            self._open()
+
+    def record_cancelled(self):
+        """The call was abandoned without an outcome (e.g. it lost a hedge)."""
+        self._probe_in_flight = False
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._counters["opened"] += 1
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        recorded = len(self._outcomes)
+        snapshot = dict(self._counters)
+        snapshot["state"] = state
+        snapshot["failure_rate"] = round(self._outcomes.count(False) / recorded, 4) if recorded else 0.0
+        if state == self.OPEN:
+            snapshot["retry_in"] = round(self.cooldown - (time.monotonic() - self._opened_at), 3)
+        return snapshot
@@ -0,0 +1,164 @@
+"""
+Negotiated gzip/brotli response compression.
+
+Two paths share the negotiation in `choose_encoding`:
+
+- Cached reads (`conditional_response`) compress a `CachedContent` body once
+  per encoding and keep the result on the entry, so a hot page is compressed
+  once per cache fill rather than once per request.
+- `CompressionMiddleware` compresses every other buffered response. Streamed
+  responses (SSE, NDJSON exports) pass through untouched so they still flush
+  as they are produced.
+
+Bodies under `COMPRESSION_MIN_SIZE` bytes are sent as they are: the framing
+overhead outweighs the saving. Brotli is used when the `brotli` package is
+installed and the client accepts it, gzip otherwise.
+"""
+import gzip
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Per-request work stays cheap; cached bodies are compressed once, so they can afford more.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+# Never compressed: already compressed, or streamed and meant to flush as produced.
+SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+_counters = {"compressed": 0, "cached_hits": 0, "skipped_small": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best encoding the client accepts (RFC 9110 12.5.3), or None for identity."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if coding:
+            weights[coding] = weight
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+def record(size_in: int, size_out: int, cached_hit: bool = False):
+    if cached_hit:
+        _counters["cached_hits"] += 1
+    else:
+        _counters["compressed"] += 1
+    _counters["bytes_in"] += size_in
+    _counters["bytes_out"] += size_out
+
+
+def skipped_small():
+    _counters["skipped_small"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    stats = dict(_counters, min_size=MIN_SIZE, encodings=list(supported_encodings()))
+    stats["ratio"] = round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else 0.0
+    return stats
+
+
+def _vary(headers: list) -> list:
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered responses of at least `min_size` bytes."""
+
+    def __init__(self, app, min_size: int = MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in headers or content_type.startswith(SKIP_TYPES):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start_message is None:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # A streamed response: send it as produced.
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            headers = list(start_message.get("headers", []))
+            if len(body) < self.min_size:
+                skipped_small()
+                await send(dict(start_message, headers=headers))
+                await send(message)
+                return
+            compressed = compress(body, encoding)
+            record(len(body), len(compressed))
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"content-length", str(len(compressed)).encode()))
+            await send(dict(start_message, headers=_vary(headers)))
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, wrapped_send)
@@ -6,17 +6,41 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+class EmailDeliveryError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
 class EmailService:
     def __init__(self):
         self.endpoint = os.getenv("FORMSPREE_ENDPOINT")
         if not self.endpoint:
             print("WARNING: FORMSPREE_ENDPOINT not set. Email service disabled.")
+        self._client = None
 
-    async def send_email(self, subject: str, recipients: List[str], body: str):
-        if not self.endpoint:
-            print("EmailService is disabled. Skipping email.")
-            return False
+    @property
+    def enabled(self) -> bool:
+        return bool(self.endpoint)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # One pooled client, so consecutive sends reuse the TLS connection.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
 
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def deliver(self, subject: str, recipients: List[str], body: str):
+        """
+        Post one message to Formspree. Raises EmailDeliveryError, marked
+        non-retryable for client errors other than 408/429.
+        """
         # Formspree typically expects a flat dict of fields
         # adjusting payload to match common Formspree patterns
         payload = {
@@ -25,16 +49,25 @@ class EmailService:
             "_replyto": recipients[0] if recipients else None
             # You can add more fields if your form expects them
         }
+        try:
+            response = await self._get_client().post(self.endpoint, json=payload)
+        except httpx.HTTPError as e:
+            raise EmailDeliveryError(f"Error sending email via Formspree: {e!r}")
+        if response.status_code >= 400:
+            retryable = response.status_code >= 500 or response.status_code in (408, 429)
+            raise EmailDeliveryError(
+                f"Failed to send email via Formspree: {response.status_code} {response.text}", retryable
+            )
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.endpoint, json=payload)
-                if response.status_code >= 400:
-                   print(f"Failed to send email via Formspree: {response.status_code} {response.text}")
-                   return False
-                return True
-            except Exception as e:
-                print(f"Error sending email via Formspree: {e}")
-                return False
+    async def send_email(self, subject: str, recipients: List[str], body: str):
+        if not self.endpoint:
+            print("EmailService is disabled. Skipping email.")
+            return False
+        try:
+            await self.deliver(subject, recipients, body)
+            return True
+        except EmailDeliveryError as e:
+            print(e)
+            return False
 
 email_service = EmailService()
@@ -1,5 +1,5 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 import os
 
 # Initialize Firebase Admin
@@ -47,3 +47,6 @@ if not firebase_admin._apps:
         raise e
 
 db = firestore.client()
+
+# Non-blocking client used by the request handlers; `db` remains for scripts.
+async_db = firestore_async.client()
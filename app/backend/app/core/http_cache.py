@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, List, Optional, Type
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from app.core import compression
+
+# Documents read back from our own collections were validated when written;
+# set TRUSTED_READS=0 to validate them again on every cache fill.
+TRUSTED_READS = os.getenv("TRUSTED_READS", "1") != "0"
+
+# Browsers always revalidate (cheap with ETags); the CDN in front of Cloud Run
+# may reuse a response for `s-maxage` and keep serving it while it refetches.
+CACHE_CONTROL = {
+    "projects": "public, max-age=0, s-maxage=60, stale-while-revalidate=600",
+    "writings": "public, max-age=0, s-maxage=60, stale-while-revalidate=600",
+    "systems": "public, max-age=0, s-maxage=300, stale-while-revalidate=3600",
+    "vault": "public, max-age=0, s-maxage=60, stale-while-revalidate=600",
+    "arena": "public, max-age=0, s-maxage=5, stale-while-revalidate=30",
+    "bootstrap": "public, max-age=0, s-maxage=60, stale-while-revalidate=600",
+}
+
+
+class CachedContent:
+    """
+    A payload serialized once, together with its ETag and compressed forms.
+
+    There is no Last-Modified: documents carry no update time, and the time a
+    payload was rendered says nothing about when its content last changed.
+    """
+
+    __slots__ = ("data", "body", "etag", "headers", "_encoded")
+
+    def __init__(self, data: Any, body: bytes, headers: Optional[Dict[str, str]] = None, etag: Optional[str] = None):
+        self.data = data
+        self.body = body
+        self.headers = headers or {}
+        self.etag = '"%s"' % (etag or hashlib.sha256(body).hexdigest()[:32])
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with `encoding`, compressed on first use and kept with the entry."""
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compression.compress(self.body, encoding, cached=True)
+            compression.record(len(self.body), len(body))
+        else:
+            compression.record(len(self.body), len(body), cached_hit=True)
+        return body
+
+
+def _dump_trusted(data: Any) -> bytes:
+    # Datetimes (Firestore's subclass included) go through pydantic's own JSON
+    # conversion so they come out exactly as a validated model would write them.
+    return orjson.dumps(data, default=to_jsonable_python, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def render(
+    data: Any, adapter: TypeAdapter, headers: Optional[Dict[str, str]] = None, trusted: bool = False
+) -> Optional[CachedContent]:
+    """
+    Validate `data` against the route's response model and serialize it once.
+    `trusted` skips the validation; only use it with adapters over plain dicts
+    (projections), where serializing the input as it is gives the same bytes.
+    """
+    if data is None:
+        return None
+    if trusted and TRUSTED_READS:
+        return CachedContent(data, _dump_trusted(data), headers)
+    return CachedContent(data, adapter.dump_json(adapter.validate_python(data)), headers)
+
+
+class TrustedRenderer:
+    """
+    Serializes documents read from Firestore as `model` without validating
+    them again: each document is reduced to the model's fields, in the model's
+    order, with defaults filled in from tables built once per model, and
+    encoded with orjson. A document missing a required field (written before
+    the model gained it, say) sends the whole payload through `render`.
+
+    `model_construct` would do the same job, but it runs in Python and costs
+    more per item than pydantic-core's validation (see benchmarks/serialization.py).
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.adapter = TypeAdapter(model)
+        self.list_adapter = TypeAdapter(List[model])
+        fields = model.model_fields
+        self.names = tuple(fields)
+        self.required = frozenset(name for name, field in fields.items() if field.is_required())
+        self.defaults = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in fields.items() if not field.is_required()
+        }
+
+    def shape(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        defaults = self.defaults
+        return {name: doc[name] if name in doc else defaults[name] for name in self.names}
+
+    def render(self, data: Any, headers: Optional[Dict[str, str]] = None) -> Optional[CachedContent]:
+        """Serialize one document (a dict) or a list of them."""
+        if data is None:
+            return None
+        many = isinstance(data, list)
+        docs = data if many else [data]
+        required = self.required
+        if not TRUSTED_READS or any(not required <= doc.keys() for doc in docs):
+            return render(data, self.list_adapter if many else self.adapter, headers)
+        shape = self.shape
+        body = _dump_trusted([shape(doc) for doc in docs] if many else shape(data))
+        return CachedContent(data, body, headers)
+
+
+_ENCODING_SUFFIX = re.compile(r'-(?:gzip|br)"$')
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix.
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Compressed representations carry the encoding in their tag ("<hash>-gzip").
+        tag = _ENCODING_SUFFIX.sub('"', tag)
+        if tag == etag:
+            return True
+    return False
+
+
+def conditional_response(request: Request, content: CachedContent, cache_control: str) -> Response:
+    """
+    Answer with 304 when the client's validators still match, else the cached
+    body, compressed if the client accepts it and the body is large enough.
+    """
+    encoding = None
+    if len(content.body) >= compression.MIN_SIZE:
+        encoding = compression.choose_encoding(request.headers.get("accept-encoding"))
+    headers = {
+        **content.headers,
+        "ETag": content.etag if encoding is None else f'{content.etag[:-1]}-{encoding}"',
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, content.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=content.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=content.encoded(encoding), media_type="application/json", headers=headers)
@@ -1,4 +1,310 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+Per-client rate limits for the public write endpoints.
 
-limiter = Limiter(key_func=get_remote_address)
+Limits are declared per route name in `RATE_LIMITS` (overridable with the
+`RATE_LIMITS` env var, e.g. "create_message=5/minute,explain=30/minute") and
+enforced with a sliding-window counter: a client's estimate is the current
+window's count plus the previous window's count weighted by how much of it
+still overlaps the last `period` seconds. Each client costs two integers, and
+at most `max_keys` clients are tracked per process (least recently seen go
+first).
+
+Decisions are always made from the local counters, so a check never waits
+on the network. With `RATE_LIMIT_STORAGE_URI` set, hits admitted locally are
+pushed to a shared store every `sync_interval` seconds with INCRBY, and the
+store's total (every instance's hits) replaces the local count, so every
+worker and instance converges on the same count. Until a sync lands each
+process may admit up to one extra burst per client. `memory://` shares
+counters inside one process (useful for tests); `redis://`, `rediss://` (TLS)
+and `unix://` URIs, with credentials and database as redis-py accepts them,
+use Redis through `redis.asyncio` (the optional `redis` package).
+"""
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from fastapi import HTTPException, Request
+
+from app.core.background import BackgroundTasks
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.asyncio.retry import Retry
+    from redis.backoff import ExponentialBackoff
+    from redis.exceptions import ConnectionError as RedisConnectionError, RedisError, TimeoutError as RedisTimeoutError
+except ImportError:  # optional: only needed for a shared store
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITS = {
+    "create_message": "5/minute",
+    "explain": "20/minute",
+    "add_comment": "10/minute",
+    "react": "60/minute",
+}
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+KEY_PREFIX = "ratelimit:"
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """"5/minute" -> (5, 60.0); "100/10minutes" -> (100, 600.0)."""
+    match = _LIMIT_RE.match(spec)
+    if not match:
+        raise ValueError(f"Invalid rate limit {spec!r}")
+    amount, multiple, unit = match.groups()
+    return int(amount), float(int(multiple or 1) * _PERIODS[unit])
+
+
+def _load_limits() -> Dict[str, str]:
+    limits = dict(RATE_LIMITS)
+    for item in os.getenv("RATE_LIMITS", "").split(","):
+        if "=" in item:
+            name, spec = item.split("=", 1)
+            limits[name.strip()] = spec.strip()
+    return limits
+
+
+class StorageError(Exception):
+    pass
+
+
+class MemoryStorage:
+    """Shared counters for limiters living in the same process."""
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, int], int] = {}
+
+    async def add(self, key: str, window: int, count: int, period: float) -> Tuple[int, int]:
+        self._counts.pop((key, window - 2), None)
+        self._counts[(key, window)] = self._counts.get((key, window), 0) + count
+        return self._counts[(key, window)], self._counts.get((key, window - 1), 0)
+
+    async def close(self):
+        pass
+
+
+class RedisStorage:
+    """Window counters in Redis: INCRBY on `<prefix><key>:<window>`, expiring after two periods."""
+
+    def __init__(self, uri: str, timeout: float = 1.0):
+        if redis_asyncio is None:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URI needs the redis package (pip install redis)")
+        # redis-py handles TLS, AUTH, SELECT, reconnects and reply parsing; failed
+        # commands are retried with backoff before a sync gives up on them.
+        self._client = redis_asyncio.from_url(
+            uri,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            health_check_interval=30,
+            retry=Retry(ExponentialBackoff(cap=timeout, base=0.05), retries=2),
+            retry_on_error=[RedisConnectionError, RedisTimeoutError],
+        )
+
+    async def add(self, key: str, window: int, count: int, period: float) -> Tuple[int, int]:
+        current = f"{KEY_PREFIX}{key}:{window}"
+        previous = f"{KEY_PREFIX}{key}:{window - 1}"
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.incrby(current, count)
+                pipe.pexpire(current, int(period * 2000))
+                pipe.get(previous)
+                total, _, before = await pipe.execute()
+        except RedisError as e:
+            raise StorageError(f"Rate limit store unavailable: {e!r}") from e
+        return int(total), int(before or 0)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def storage_from_uri(uri: str):
+    if not uri:
+        return None
+    scheme = urlparse(uri).scheme
+    if scheme == "memory":
+        return MemoryStorage()
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStorage(uri)
+    raise ValueError(f"Unsupported rate limit storage {uri!r}")
+
+
+class _Window:
+    __slots__ = ("index", "current", "previous")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.current = 0
+        self.previous = 0
+
+    def roll(self, index: int):
+        if index != self.index:
+            self.previous = self.current if index == self.index + 1 else 0
+            self.current = 0
+            self.index = index
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: Dict[str, str],
+        storage=None,
+        max_keys: int = 10000,
+        sync_interval: float = 0.5,
+    ):
+        self.limits = {name: parse_limit(spec) for name, spec in limits.items()}
+        self.specs = dict(limits)
+        self.storage = storage
+        self.max_keys = max_keys
+        self.sync_interval = sync_interval
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        # (key, period, window) -> hits admitted here but not yet pushed to the store.
+        self._unsynced: Counter = Counter()
+        # Windows checked here, refreshed from the store on every sync until they end,
+        # even with nothing to push, so hits made elsewhere show up.
+        self._touched: set = set()
+        self._tasks = BackgroundTasks()
+        self._counters = {"allowed": 0, "limited": 0, "syncs": 0, "sync_errors": 0}
+
+    def hit(self, name: str, client: str, now: Optional[float] = None) -> Optional[float]:
+        """Count a request; returns None if it is allowed, else seconds until it would be."""
+        limit, period = self.limits[name]
+        now = time.time() if now is None else now
+        key = f"{name}:{client}"
+        index = int(now // period)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(index)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+        window.roll(index)
+        if self.storage is not None:
+            self._touched.add((key, period, index))
+
+        elapsed = now / period - index
+        if window.previous * (1 - elapsed) + window.current + 1 > limit:
+            self._counters["limited"] += 1
+            return _retry_after(window, limit, period, elapsed)
+        window.current += 1
+        self._counters["allowed"] += 1
+        if self.storage is not None:
+            self._unsynced[(key, period, index)] += 1
+        return None
+
+    async def sync(self):
+        """Push the hits admitted since the last sync and adopt the store's totals."""
+        if self.storage is None or not (self._unsynced or self._touched):
+            return
+        now = time.time()
+        pending, self._unsynced = self._unsynced, Counter()
+        self._touched = {
+            (key, period, index) for key, period, index in self._touched
+            if index == int(now // period) and key in self._windows
+        }
+        for touched in self._touched:
+            pending.setdefault(touched, 0)
+        results = await asyncio.gather(
+            *(self.storage.add(key, index, count, period) for (key, period, index), count in pending.items()),
+            return_exceptions=True,
+        )
+        self._counters["syncs"] += 1
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            self._counters["sync_errors"] += len(errors)
+            logger.warning("Rate limit sync failed for %d keys: %s", len(errors), errors[0])
+        for ((key, period, index), count), result in zip(pending.items(), results):
+            if isinstance(result, Exception):
+                # Retry while the window still counts towards a decision.
+                if count and index >= int(now // period) - 1:
+                    self._unsynced[(key, period, index)] += count
+                continue
+            window = self._windows.get(key)
+            if window is None or window.index != index:
+                continue
+            current, previous = result
+            # The store's total counts every instance's hits, this one's included;
+            # add back only what was admitted here while the push was in flight.
+            window.current = current + self._unsynced.get((key, period, index), 0)
+            window.previous = previous + self._unsynced.get((key, period, index - 1), 0)
+        if len(self._unsynced) > self.max_keys:
+            self._unsynced.clear()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Rate limit sync failed: %s", e)
+
+    def start(self):
+        if not self._tasks and self.storage is not None:
+            self._tasks.spawn(self._run())
+
+    async def close(self):
+        await self._tasks.stop()
+        if self.storage is not None:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Rate limit sync failed: %s", e)
+            await self.storage.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self._counters,
+            limits=self.specs,
+            storage=type(self.storage).__name__ if self.storage is not None else None,
+            tracked=len(self._windows),
+            unsynced=sum(self._unsynced.values()),
+            running=bool(self._tasks),
+        )
+
+
+def _retry_after(window: _Window, limit: int, period: float, elapsed: float) -> float:
+    # Weight (1 - e) at which the decaying previous window leaves room for one more hit.
+    if window.current + 1 <= limit and window.previous:
+        needed = 1 - (limit - 1 - window.current) / window.previous
+        return max(needed - elapsed, 0.0) * period
+    # The current window alone is full: wait for it to become the previous one and decay.
+    needed = 1 - (limit - 1) / window.current if window.current else 0.0
+    return (1 - elapsed + max(needed, 0.0)) * period
+
+
+def client_key(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(name: str):
+    """Dependency enforcing the configured limit `name` per client address."""
+    if name not in limiter.limits:
+        raise KeyError(f"No rate limit configured for {name!r}")
+
+    async def check(request: Request):
+        retry_after = limiter.hit(name, client_key(request))
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {limiter.specs[name]}",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return check
+
+
+limiter = RateLimiter(
+    _load_limits(),
+    storage=storage_from_uri(os.getenv("RATE_LIMIT_STORAGE_URI", "")),
+    max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000")),
+    sync_interval=float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "0.5")),
+)
@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from google.cloud import firestore
+from pydantic import TypeAdapter
+
+MAX_PAGE_SIZE = 100
+
+
+class PageParams:
+    """Validated `limit` / `cursor` / `order_by` / `fields` query parameters for one collection."""
+
+    def __init__(
+        self,
+        limit: Optional[int],
+        cursor: Optional[str],
+        order_by: Optional[str],
+        fields: Optional[str],
+        default_order: str,
+        sortable: Sequence[str],
+        selectable: Sequence[str],
+    ):
+        self.limit = limit
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.descending = False
+        order = order_by or default_order
+        if order.startswith("-"):
+            self.descending = True
+            order = order[1:]
+        if order not in sortable:
+            raise HTTPException(status_code=400, detail=f"Cannot order by '{order}'")
+        self.order_field = order
+
+        self.fields = None
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in requested if f not in selectable]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            # The id and the ordering field are always needed to build the next cursor.
+            self.fields = sorted(set(requested) | {"id", self.order_field})
+
+        self.is_default = limit is None and cursor is None and order_by is None and fields is None
+
+    def cache_key(self) -> Tuple:
+        return (
+            self.limit,
+            encode_cursor(self.cursor) if self.cursor else None,
+            self.order_field,
+            self.descending,
+            tuple(self.fields) if self.fields else None,
+        )
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    # Cursors come from clients: anything malformed is a 400, never a 500.
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError("expected [value, id]")
+        value, doc_id = _decode_value(values[0]), values[1]
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # The value is an ordering field's (a scalar), and the id goes into a document path.
+    if not isinstance(value, (str, int, float, bool, datetime, type(None))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(doc_id, str) or not doc_id or "/" in doc_id or doc_id in (".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return [value, doc_id]
+
+
+async def fetch_page(collection_ref, params: PageParams) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Run one page of an ordered collection query. Returns the documents and the
+    cursor for the following page (None once the collection is exhausted).
+    """
+    direction = firestore.Query.DESCENDING if params.descending else firestore.Query.ASCENDING
+    query = collection_ref.order_by(params.order_field, direction=direction).order_by(u'__name__', direction=direction)
+    if params.fields:
+        query = query.select(params.fields)
+    if params.cursor:
+        value, doc_id = params.cursor
+        query = query.start_after({params.order_field: value, u'__name__': doc_id})
+    limit = params.limit or MAX_PAGE_SIZE
+    query = query.limit(limit)
+
+    items = []
+    last = None
+    async for doc in query.stream():
+        items.append(doc.to_dict())
+        last = doc
+    next_cursor = None
+    if last is not None and len(items) == limit:
+        next_cursor = encode_cursor([last.to_dict().get(params.order_field), last.id])
+    return items, next_cursor
+
+
+def page_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+
+projection_adapter = TypeAdapter(List[Dict[str, Any]])
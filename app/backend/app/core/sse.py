@@ -0,0 +1,7 @@
+import json
+from typing import Any
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event; `data` is sent as a single line of JSON."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,221 @@
+"""
+Inverted index with BM25 ranking, prefix matching and highlighting.
+
+Every term maps to the documents containing it with a field-weighted term
+frequency. The last query term also matches as a prefix (search-as-you-type),
+and hits carry <mark>-highlighted snippets of the fields that matched.
+Per-term scores of recent queries are kept until the next write, since
+reads vastly outnumber content edits. The index is plain in-memory data;
+`app.services.search` feeds it from Firestore.
+"""
+import bisect
+import heapq
+import html
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Returned with every hit so the client can render and link it.
+RESULT_FIELDS = ("title", "slug")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 16
+SCORE_CACHE_SIZE = 256
+SNIPPET_CHARS = 160
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 1 or token.isdigit()]
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+
+class _Document:
+    __slots__ = ("collection", "id", "meta", "fields", "length", "terms")
+
+    def __init__(self, collection, doc_id, meta, fields, length, terms):
+        self.collection = collection
+        self.id = doc_id
+        self.meta = meta
+        self.fields = fields
+        self.length = length
+        self.terms = terms
+
+
+class InvertedIndex:
+    def __init__(self, fields: Dict[str, Dict[str, float]], k1: float = 1.2, b: float = 0.75):
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Tuple[str, str], float]] = {}
+        # Sorted vocabulary, for prefix lookups.
+        self._terms: List[str] = []
+        self._docs: Dict[Tuple[str, str], _Document] = {}
+        self._total_length = 0.0
+        self._norm_cache: Optional[Dict[Tuple[str, str], float]] = None
+        # Per-term scores for recent queries (typeahead repeats prefixes); dropped on every write.
+        self._score_cache: "OrderedDict[Tuple[str, ...], Dict[Tuple[str, str], float]]" = OrderedDict()
+
+    def _changed(self):
+        self._norm_cache = None
+        self._score_cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._terms)
+
+    def add(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        """Index (or re-index) one document."""
+        key = (collection, doc_id)
+        self.remove(collection, doc_id)
+        self._changed()
+        texts = {field: _field_text(data.get(field)) for field in self.fields[collection]}
+        frequencies: Counter = Counter()
+        length = 0.0
+        for field, weight in self.fields[collection].items():
+            tokens = tokenize(texts[field])
+            length += weight * len(tokens)
+            for token in tokens:
+                frequencies[token] += weight
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[key] = frequency
+        meta = {field: data.get(field) for field in RESULT_FIELDS if data.get(field) is not None}
+        self._docs[key] = _Document(collection, doc_id, meta, texts, length, set(frequencies))
+        self._total_length += length
+
+    def remove(self, collection: str, doc_id: str):
+        doc = self._docs.pop((collection, doc_id), None)
+        if doc is None:
+            return
+        self._changed()
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings[term]
+            del postings[(collection, doc_id)]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def expand(self, prefix: str) -> List[str]:
+        """Indexed terms starting with `prefix`, most common first."""
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\U0010ffff", start)
+        matches = self._terms[start:end]
+        if len(matches) > MAX_EXPANSIONS:
+            matches = heapq.nlargest(MAX_EXPANSIONS, matches, key=lambda term: len(self._postings[term]))
+        return matches
+
+    def _norms(self) -> Dict[Tuple[str, str], float]:
+        # BM25's length normalisation per document; it only changes on writes.
+        if self._norm_cache is None:
+            average = self._total_length / len(self._docs) or 1.0
+            k1, b = self.k1, self.b
+            self._norm_cache = {key: k1 * (1 - b + b * doc.length / average) for key, doc in self._docs.items()}
+        return self._norm_cache
+
+    def _group_scores(self, group: Tuple[str, ...]) -> Dict[Tuple[str, str], float]:
+        """BM25 contribution of one query term (or of a prefix's best expansion) per document."""
+        cached = self._score_cache.get(group)
+        if cached is not None:
+            self._score_cache.move_to_end(group)
+            return cached
+        norms = self._norms()
+        count = len(self._docs)
+        boost = self.k1 + 1
+        best: Dict[Tuple[str, str], float] = {}
+        for term in group:
+            postings = self._postings[term]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            if not best:
+                best = {key: idf * f * boost / (f + norms[key]) for key, f in postings.items()}
+                continue
+            for key, f in postings.items():
+                score = idf * f * boost / (f + norms[key])
+                if score > best.get(key, 0.0):
+                    best[key] = score
+        self._score_cache[group] = best
+        if len(self._score_cache) > SCORE_CACHE_SIZE:
+            self._score_cache.popitem(last=False)
+        return best
+
+    def search(
+        self, query: str, collections: Optional[Iterable[str]] = None, limit: int = 20
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (total matches, top `limit` hits) for `query`."""
+        tokens = tokenize(query)
+        if not tokens or not self._docs:
+            return 0, []
+        groups = [(token,) for token in tokens[:-1] if token in self._postings]
+        last = tokens[-1]
+        if len(last) >= MIN_PREFIX:
+            groups.append(tuple(self.expand(last)))
+        elif last in self._postings:
+            groups.append((last,))
+        groups = [group for group in groups if group]
+        if not groups:
+            return 0, []
+
+        # Start from the largest contribution and add the others into a copy of it.
+        contributions = sorted((self._group_scores(group) for group in groups), key=len, reverse=True)
+        scores = dict(contributions[0])
+        for contribution in contributions[1:]:
+            for key, score in contribution.items():
+                scores[key] = scores.get(key, 0.0) + score
+        if collections:
+            allowed = set(collections)
+            scores = {key: score for key, score in scores.items() if key[0] in allowed}
+
+        pattern = match_pattern(term for group in groups for term in group)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return len(scores), [self._hit(self._docs[key], score, pattern) for key, score in top]
+
+    def _hit(self, doc: _Document, score: float, pattern: "re.Pattern") -> Dict[str, Any]:
+        highlights = {}
+        for field, text in doc.fields.items():
+            snippet = highlight(text, pattern)
+            if snippet is not None:
+                highlights[field] = snippet
+        return dict(doc.meta, collection=doc.collection, id=doc.id, score=round(score, 4), highlights=highlights)
+
+
+def match_pattern(terms: Iterable[str]) -> Optional["re.Pattern"]:
+    """A regex matching any of `terms` as a whole token, case-insensitively."""
+    terms = sorted(terms, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r"(?<!\w)(?:%s)(?!\w)" % "|".join(map(re.escape, terms)), re.IGNORECASE)
+
+
+def highlight(text: str, pattern: "re.Pattern", width: int = SNIPPET_CHARS) -> Optional[str]:
+    """An HTML-escaped excerpt of `text` around the first match, matches wrapped in <mark>."""
+    first = pattern.search(text)
+    if first is None:
+        return None
+    start = max(0, first.start() - width // 4)
+    end = min(len(text), start + width)
+    if start > 0:
+        # Don't cut the first word in half.
+        space = text.find(" ", start, first.start())
+        start = space + 1 if space != -1 else start
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match in pattern.finditer(text, first.start(), end):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
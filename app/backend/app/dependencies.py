@@ -1,6 +1,7 @@
 from fastapi import Header, HTTPException, status
 import firebase_admin
 from firebase_admin import auth
+from app.core.auth_cache import token_cache
 
 def get_current_user(authorization: str = Header(...)):
     """
@@ -17,8 +18,9 @@ def get_current_user(authorization: str = Header(...)):
     token = authorization.split("Bearer ")[1]
     
     try:
-        # Verify the ID token while checking if the token is revoked.
-        decoded_token = auth.verify_id_token(token, check_revoked=True)
+        # Verify the ID token while checking if the token is revoked
+        # (served from the verified-token cache between revocation checks).
+        decoded_token = token_cache.verify(token)
         return decoded_token
     except auth.ExpiredIdTokenError:
         raise HTTPException(
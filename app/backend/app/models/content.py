@@ -81,8 +81,18 @@ class ArenaThreadCreate(ArenaThreadBase):
 
 class ArenaThread(ArenaThreadBase):
     id: str
+    commentCount: int = 0
+    # Only threads not yet moved to the comments subcollection still embed them.
     responses: List[dict] = []
 
+class ArenaCommentCreate(BaseModel):
+    content: str
+    author: str = "Anonymous"
+
+class ArenaComment(ArenaCommentCreate):
+    id: str
+    createdAt: datetime
+
 class MessageBase(BaseModel):
     name: str
     email: str
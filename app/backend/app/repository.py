@@ -0,0 +1,379 @@
+"""
+One Firestore repository per content collection, shared by the routers.
+
+A `Repository` owns everything the routers used to repeat per collection:
+
+- Reads: `get`, `get_many` (one batched `get_all`), `list` and `page` with an
+  optional field projection, plus cached/serialized variants that go through
+  `read_cache` and, for card-only pages, the card index.
+- Writes: `create`, `update` and `delete` commit the document together with
+  its card index (and slug index) changes. Updates and deletes carry an
+  "exists" precondition instead of reading the document first, so a missing
+  document costs the one failed commit and becomes a 404.
+- Hooks: after a committed write every `RepositoryHook` is told about it
+  (read cache invalidation, search and facet indexing), and every operation
+  reports its latency (`repository_metrics`, served by /api/v1/ops/repositories).
+
+Collection-specific work plugs in through `prepare` (post-process loaded
+documents, e.g. adding reaction shard totals) and the `stage` callback of
+the write methods (extra writes in the same batch).
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from google.api_core import exceptions
+from google.cloud import firestore
+from pydantic import BaseModel
+
+from app.core.cache import read_cache
+from app.core.firebase import async_db
+from app.core.http_cache import CachedContent, TrustedRenderer, render
+from app.core.metrics import LatencyHistogram
+from app.core.pagination import PageParams, fetch_page, page_headers, projection_adapter
+from app.services import card_index, facets, slug_index
+from app.services.facets import FACET_FIELDS, facet_index
+from app.services.search import SEARCH_FIELDS, search_index
+
+# Seconds; Firestore calls mostly take a few to a few hundred milliseconds.
+REPOSITORY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+Prepare = Callable[[List[Dict[str, Any]], Optional[str], Optional[List[str]]], Awaitable[List[Dict[str, Any]]]]
+Stage = Callable[[Any], Awaitable[None]]
+
+
+class RepositoryHook:
+    """Observer of every repository. Override what you need."""
+
+    def written(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        pass
+
+    def deleted(self, collection: str, doc_id: str):
+        pass
+
+    def observed(self, collection: str, operation: str, seconds: float):
+        pass
+
+
+class CacheInvalidation(RepositoryHook):
+    def written(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        read_cache.invalidate(collection, doc_id)
+
+    def deleted(self, collection: str, doc_id: str):
+        read_cache.invalidate(collection, doc_id)
+
+
+class IndexSync(RepositoryHook):
+    """Keeps this instance's search and facet indexes in step with its writes."""
+
+    def written(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        if collection in SEARCH_FIELDS:
+            search_index.upsert(collection, doc_id, data)
+        if collection in FACET_FIELDS:
+            facet_index.upsert(collection, doc_id, data)
+
+    def deleted(self, collection: str, doc_id: str):
+        if collection in SEARCH_FIELDS:
+            search_index.remove(collection, doc_id)
+        if collection in FACET_FIELDS:
+            facet_index.remove(collection, doc_id)
+
+
+class RepositoryMetrics(RepositoryHook):
+    """Latency histogram and error count per collection and operation."""
+
+    def __init__(self, buckets: Sequence[float] = REPOSITORY_BUCKETS):
+        self.buckets = buckets
+        self._latency: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._errors: Dict[str, Dict[str, int]] = {}
+
+    def observed(self, collection: str, operation: str, seconds: float):
+        operations = self._latency.setdefault(collection, {})
+        if operation not in operations:
+            operations[operation] = LatencyHistogram(self.buckets)
+        operations[operation].observe(seconds)
+
+    def failed(self, collection: str, operation: str):
+        errors = self._errors.setdefault(collection, {})
+        errors[operation] = errors.get(operation, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            collection: {
+                operation: dict(histogram.snapshot(), errors=self._errors.get(collection, {}).get(operation, 0))
+                for operation, histogram in operations.items()
+            }
+            for collection, operations in self._latency.items()
+        }
+
+
+repository_metrics = RepositoryMetrics()
+DEFAULT_HOOKS: List[RepositoryHook] = [CacheInvalidation(), IndexSync(), repository_metrics]
+
+
+def notify_written(collection: str, doc_id: str, data: Dict[str, Any], hooks: Iterable[RepositoryHook] = DEFAULT_HOOKS):
+    """Run the write hooks for a document written outside a repository (e.g. bulk imports)."""
+    for hook in hooks:
+        hook.written(collection, doc_id, data)
+
+
+class Repository:
+    def __init__(
+        self,
+        collection: str,
+        model: Type[BaseModel],
+        not_found: str = "Document not found",
+        prepare: Optional[Prepare] = None,
+        hooks: Optional[List[RepositoryHook]] = None,
+    ):
+        self.collection = collection
+        self.model = model
+        self.not_found = not_found
+        self.prepare = prepare
+        self.hooks = DEFAULT_HOOKS if hooks is None else hooks
+        self.renderer = TrustedRenderer(model)
+        self.has_cards = collection in card_index.CARD_FIELDS
+        self.has_slugs = collection in slug_index.SLUG_COLLECTIONS
+
+    @property
+    def ref(self):
+        return async_db.collection(self.collection)
+
+    def new_id(self) -> str:
+        return self.ref.document().id
+
+    def serialize(self, model: BaseModel, doc_id: str, exclude: Optional[set] = None) -> Dict[str, Any]:
+        """The stored form of `model`: JSON types only (datetimes as ISO strings) plus the id."""
+        data = model.model_dump(mode="json", exclude=exclude)
+        data['id'] = doc_id
+        return data
+
+    @contextmanager
+    def _timed(self, operation: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if repository_metrics in self.hooks:
+                repository_metrics.failed(self.collection, operation)
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.observed(self.collection, operation, seconds)
+
+    async def _prepared(self, docs: List[Dict[str, Any]], doc_id: Optional[str] = None, fields=None):
+        if self.prepare is None:
+            return docs
+        return await self.prepare(docs, doc_id, fields)
+
+    # Reads
+
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._timed("get"):
+            doc = await self.ref.document(doc_id).get()
+            if not doc.exists:
+                return None
+            return (await self._prepared([doc.to_dict()], doc_id))[0]
+
+    async def get_many(self, doc_ids: Sequence[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Fetch several documents in one round trip, in the order of `doc_ids` (missing ones skipped)."""
+        if not doc_ids:
+            return []
+        with self._timed("get_many"):
+            refs = [self.ref.document(doc_id) for doc_id in doc_ids]
+            found = {doc.id: doc.to_dict() async for doc in async_db.get_all(refs, field_paths=fields) if doc.exists}
+            docs = [found[doc_id] for doc_id in doc_ids if doc_id in found]
+            return await self._prepared(docs, None, fields)
+
+    async def list(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with self._timed("list"):
+            query = self.ref.select(fields) if fields else self.ref
+            docs = [doc.to_dict() async for doc in query.stream()]
+            return await self._prepared(docs, None, fields)
+
+    async def cards(self) -> List[Dict[str, Any]]:
+        """Every document's card fields: the card index document, or a projected scan until it is built."""
+        with self._timed("cards"):
+            cards = await card_index.load_cards(self.collection)
+            if cards is None:
+                fields = card_index.CARD_FIELDS[self.collection] + ['id']
+                query = self.ref.select(fields)
+                cards = [card_index.card_for(self.collection, doc.id, doc.to_dict()) async for doc in query.stream()]
+            return cards
+
+    async def page(self, page: PageParams):
+        with self._timed("page"):
+            docs, next_cursor = await fetch_page(self.ref, page)
+            return await self._prepared(docs, None, page.fields), next_cursor
+
+    # Cached, serialized reads
+
+    def _render_list(self, docs: List[Dict[str, Any]], page: Optional[PageParams] = None, next_cursor=None):
+        if page is not None and page.fields:
+            return render(docs, projection_adapter, page_headers(next_cursor), trusted=True)
+        return self.renderer.render(docs, page_headers(next_cursor))
+
+    async def _load_doc(self, doc_id: str) -> Optional[CachedContent]:
+        return self.renderer.render(await self.get(doc_id))
+
+    async def _load_list(self) -> CachedContent:
+        return self._render_list(await self.list())
+
+    async def _load_page(self, page: PageParams) -> CachedContent:
+        docs, next_cursor = await self.page(page)
+        return self._render_list(docs, page, next_cursor)
+
+    async def cached(self, doc_id: str) -> Optional[CachedContent]:
+        return await read_cache.get_or_load((self.collection, 'doc', doc_id), lambda: self._load_doc(doc_id))
+
+    async def cached_or_404(self, doc_id: str) -> CachedContent:
+        content = await self.cached(doc_id)
+        if content is None:
+            raise HTTPException(status_code=404, detail=self.not_found)
+        return content
+
+    async def cached_by_slug(self, slug: str) -> Optional[CachedContent]:
+        # slug -> id comes from the slug index; the document itself shares the by-id cache entry.
+        doc_id = await read_cache.get_or_load(
+            (self.collection, 'slug', slug), lambda: slug_index.resolve(self.collection, slug)
+        )
+        return await self.cached(doc_id) if doc_id else None
+
+    async def cached_list(self, page: Optional[PageParams] = None) -> CachedContent:
+        """The whole collection, or one page of it when `page` is not the default listing."""
+        if page is None or page.is_default:
+            return await read_cache.get_or_load((self.collection, 'list'), self._load_list)
+        # Card-only pages come from the single card index document when it exists.
+        content = None
+        if self.has_cards and card_index.covers(self.collection, page.fields):
+            content = await read_cache.get_or_load(
+                (self.collection, 'list', 'cards', page.cache_key()),
+                lambda: card_index.render_cards(self.collection, page),
+            )
+        if content is None:
+            content = await read_cache.get_or_load(
+                (self.collection, 'list', page.cache_key()), lambda: self._load_page(page)
+            )
+        return content
+
+    async def _load_filtered(self, filters: facets.Filters, page: PageParams) -> CachedContent:
+        # The facet index picks the ids; only the matching documents are read.
+        docs = await self.get_many(await facet_index.select(self.collection, filters))
+        items, next_cursor = card_index.page_cards(docs, page)
+        return self._render_list(items, page, next_cursor)
+
+    async def cached_filtered(self, filters: facets.Filters, page: PageParams) -> CachedContent:
+        return await read_cache.get_or_load(
+            (self.collection, 'list', 'facets', facets.cache_key(filters), page.cache_key()),
+            lambda: self._load_filtered(filters, page),
+        )
+
+    # Writes
+
+    def _written(self, doc_id: str, data: Dict[str, Any]):
+        for hook in self.hooks:
+            hook.written(self.collection, doc_id, data)
+
+    def _deleted(self, doc_id: str):
+        for hook in self.hooks:
+            hook.deleted(self.collection, doc_id)
+
+    async def create(self, data: Dict[str, Any], stage: Optional[Stage] = None) -> Dict[str, Any]:
+        """Write a new document (`data` carries its id). `stage` may add writes to the same batch."""
+        with self._timed("create"):
+            doc_ref = self.ref.document(data['id'])
+            if self.has_slugs:
+                await _save_slugged(async_db.transaction(), self, doc_ref, data, False, stage)
+            else:
+                batch = async_db.batch()
+                batch.set(doc_ref, data)
+                await self._stage_write(batch, doc_ref.id, data, stage)
+                await batch.commit()
+        self._written(doc_ref.id, data)
+        return data
+
+    async def update(self, doc_id: str, data: Dict[str, Any], stage: Optional[Stage] = None) -> Dict[str, Any]:
+        """Overwrite the fields in `data`; 404 if the document does not exist."""
+        with self._timed("update"):
+            doc_ref = self.ref.document(doc_id)
+            if self.has_slugs:
+                await _save_slugged(async_db.transaction(), self, doc_ref, data, True, stage)
+            else:
+                # `update` requires the document to exist, so the batch doubles as the existence check.
+                batch = async_db.batch()
+                batch.update(doc_ref, data)
+                await self._stage_write(batch, doc_id, data, stage)
+                await self._commit(batch)
+        self._written(doc_id, data)
+        return data
+
+    async def delete(self, doc_id: str, stage: Optional[Stage] = None):
+        """Delete the document; 404 if it does not exist."""
+        with self._timed("delete"):
+            doc_ref = self.ref.document(doc_id)
+            if self.has_slugs:
+                await _delete_slugged(async_db.transaction(), self, doc_ref, stage)
+            else:
+                batch = async_db.batch()
+                if stage is not None:
+                    await stage(batch)
+                batch.delete(doc_ref, option=async_db.write_option(exists=True))
+                if self.has_cards:
+                    card_index.stage_delete(batch, self.collection, doc_id)
+                await self._commit(batch)
+        self._deleted(doc_id)
+
+    async def _stage_write(self, batch, doc_id: str, data: Dict[str, Any], stage: Optional[Stage]):
+        if self.has_cards:
+            card_index.stage_upsert(batch, self.collection, doc_id, data)
+        if stage is not None:
+            await stage(batch)
+
+    async def _commit(self, batch):
+        try:
+            await batch.commit()
+        except exceptions.NotFound:
+            raise HTTPException(status_code=404, detail=self.not_found)
+
+
+@firestore.async_transactional
+async def _save_slugged(
+    transaction, repository: Repository, doc_ref, data: Dict[str, Any], must_exist: bool, stage: Optional[Stage] = None
+):
+    # Reads first (Firestore transactions require it) and issued together, then every write atomically.
+    collection = repository.collection
+    slug = data['slug']
+    slug_index.validate(slug)
+    previous_slug = None
+    if must_exist:
+        doc, owner = await asyncio.gather(
+            doc_ref.get(transaction=transaction), slug_index.owner(transaction, collection, slug)
+        )
+        if not doc.exists:
+            raise HTTPException(status_code=404, detail=repository.not_found)
+        previous_slug = doc.to_dict().get('slug')
+    else:
+        owner = await slug_index.owner(transaction, collection, slug)
+    slug_index.stage_claim(transaction, collection, slug, doc_ref.id, owner, previous_slug)
+    transaction.set(doc_ref, data, merge=must_exist)
+    if repository.has_cards:
+        card_index.stage_upsert(transaction, collection, doc_ref.id, data)
+    # The caller's extra writes commit with the transaction, like they do with a batch.
+    if stage is not None:
+        await stage(transaction)
+
+
+@firestore.async_transactional
+async def _delete_slugged(transaction, repository: Repository, doc_ref, stage: Optional[Stage] = None):
+    doc = await doc_ref.get(transaction=transaction)
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail=repository.not_found)
+    slug_index.stage_release(transaction, repository.collection, doc.to_dict().get('slug'))
+    if stage is not None:
+        await stage(transaction)
+    transaction.delete(doc_ref)
+    if repository.has_cards:
+        card_index.stage_delete(transaction, repository.collection, doc_ref.id)
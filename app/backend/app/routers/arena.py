@@ -1,109 +1,134 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.models.content import ArenaThread, ArenaThreadCreate
-from app.core.firebase import db
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from google.api_core import exceptions
+from typing import List, Optional
+from app.models.content import ArenaComment, ArenaCommentCreate, ArenaThread, ArenaThreadCreate
+from app.core.firebase import async_db
+from app.core.cache import read_cache
+from app.core.http_cache import CACHE_CONTROL, TrustedRenderer, conditional_response, render
+from app.core.limiter import rate_limit
+from app.core.pagination import MAX_PAGE_SIZE, PageParams, fetch_page, page_headers, projection_adapter
 from app.dependencies import get_current_user
+from app.repository import Repository
+from app.services import arena_comments, reactions
 
 router = APIRouter()
 
+_comments_renderer = TrustedRenderer(ArenaComment)
+
+async def _with_reactions(threads, thread_id=None, fields=None):
+    # Reads add the counter shard totals to each thread's own counters.
+    return reactions.apply_totals(threads, await reactions.shard_totals(thread_id), fields)
+
+repository = Repository(u'arena', ArenaThread, not_found="Thread not found", prepare=_with_reactions)
+
 @router.post("/", response_model=ArenaThread)
-def create_thread(thread: ArenaThreadCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'arena').document()
-    thread_dict = thread.dict()
-    thread_dict['id'] = doc_ref.id
-    if thread_dict.get('publishedAt'):
-         thread_dict['publishedAt'] = thread_dict['publishedAt'].isoformat()
-    doc_ref.set(thread_dict)
-    return thread_dict
+async def create_thread(thread: ArenaThreadCreate, user=Depends(get_current_user)):
+    thread_dict = repository.serialize(thread, repository.new_id())
+    # Seed comments go to the subcollection like any other comment.
+    comments = [
+        {**arena_comments.new_comment(r.get('content', ''), r.get('author', 'Anonymous')), **r}
+        for r in thread_dict.pop('responses')
+    ]
+    thread_dict['commentCount'] = len(comments)
+
+    async def stage_comments(batch):
+        for comment in comments:
+            batch.set(arena_comments.comments_ref(thread_dict['id']).document(comment['id']), comment)
+
+    return await repository.create(thread_dict, stage=stage_comments)
 
 @router.get("/", response_model=List[ArenaThread])
-def read_threads():
-    docs = db.collection(u'arena').stream()
-    return [doc.to_dict() for doc in docs]
+async def read_threads(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='-publishedAt',
+        sortable=(u'publishedAt', u'title', u'likes', u'commentCount'),
+        selectable=list(ArenaThread.model_fields),
+    )
+    content = await repository.cached_list(page)
+    return conditional_response(request, content, CACHE_CONTROL[u'arena'])
 
 @router.get("/{thread_id}", response_model=ArenaThread)
-def read_thread(thread_id: str):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        raise HTTPException(status_code=404, detail="Thread not found")
+async def read_thread(thread_id: str, request: Request):
+    content = await repository.cached_or_404(thread_id)
+    return conditional_response(request, content, CACHE_CONTROL[u'arena'])
 
 @router.put("/{thread_id}", response_model=ArenaThread)
-def update_thread(thread_id: str, thread: ArenaThreadCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    thread_dict = thread.dict()
-    thread_dict['id'] = thread_id
-    if thread_dict.get('publishedAt'):
-         thread_dict['publishedAt'] = thread_dict['publishedAt'].isoformat()
-    doc_ref.set(thread_dict, merge=True)
-    return thread_dict
+async def update_thread(thread_id: str, thread: ArenaThreadCreate, user=Depends(get_current_user)):
+    # Comments and reactions are only written through their own endpoints (and
+    # reactions partly live in buffers and shards), so the stored counters are
+    # left alone and not known here without another read.
+    return await repository.update(
+        thread_id, repository.serialize(thread, thread_id, exclude={'responses', 'likes', 'dislikes'})
+    )
 
 @router.delete("/{thread_id}")
-def delete_thread(thread_id: str, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    doc_ref.delete()
+async def delete_thread(thread_id: str, user=Depends(get_current_user)):
+    # Firestore does not delete subcollections with their parent, so comments and
+    # counter shards are removed explicitly; the thread itself goes last, with the
+    # batch's precondition.
+    await arena_comments.delete_all(thread_id)
+    await repository.delete(thread_id, stage=lambda batch: reactions.delete_shards(batch, thread_id))
     return {"message": "Thread deleted successfully"}
 
-@router.post("/{thread_id}/like")
-def like_thread(thread_id: str):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    current_likes = doc.to_dict().get('likes', 0)
-    doc_ref.update({'likes': current_likes + 1})
-    return {"likes": current_likes + 1}
-
-@router.post("/{thread_id}/dislike")
-def dislike_thread(thread_id: str):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    current_dislikes = doc.to_dict().get('dislikes', 0)
-    doc_ref.update({'dislikes': current_dislikes + 1})
-    return {"dislikes": current_dislikes + 1}
-
-from pydantic import BaseModel
-class CommentCreate(BaseModel):
-    content: str
-    author: str = "Anonymous"
-
-@router.post("/{thread_id}/comment")
-def add_comment(thread_id: str, comment: CommentCreate):
-    doc_ref = db.collection(u'arena').document(thread_id)
-    doc = doc_ref.get()
-    if not doc.exists:
+async def _react(thread_id: str, field: str):
+    # Existence comes from the read cache and the click is buffered, so a
+    # reaction costs no Firestore round trip of its own. The returned count is
+    # the last known total plus this instance's unflushed clicks.
+    content = await repository.cached_or_404(thread_id)
+    reactions.reaction_buffer.add(thread_id, field)
+    return {field: (content.data.get(field) or 0) + reactions.reaction_buffer.pending(thread_id, field)}
+
+@router.post("/{thread_id}/like", dependencies=[Depends(rate_limit("react"))])
+async def like_thread(thread_id: str):
+    return await _react(thread_id, u'likes')
+
+@router.post("/{thread_id}/dislike", dependencies=[Depends(rate_limit("react"))])
+async def dislike_thread(thread_id: str):
+    return await _react(thread_id, u'dislikes')
+
+@router.post("/{thread_id}/comment", response_model=ArenaComment, dependencies=[Depends(rate_limit("add_comment"))])
+async def add_comment(thread_id: str, comment: ArenaCommentCreate):
+    new_comment = arena_comments.new_comment(comment.content, comment.author)
+    batch = async_db.batch()
+    arena_comments.stage_add(batch, thread_id, new_comment)
+    try:
+        await batch.commit()
+    except exceptions.NotFound:
         raise HTTPException(status_code=404, detail="Thread not found")
-    
-    import uuid
-    from datetime import datetime
-    
-    new_comment = {
-        "id": str(uuid.uuid4()),
-        "content": comment.content,
-        "author": comment.author,
-        "createdAt": datetime.utcnow().isoformat() + "Z"
-    }
-    
-    # Atomically add to array if possible, or read-modify-write
-    # Firestore array_union only works if elements are unique entriely, which they are due to ID
-    # But read-modify-write is safer for order if we want to prepend/append specific logic
-    
-    current_responses = doc.to_dict().get('responses', [])
-    current_responses.append(new_comment)
-    
-    doc_ref.update({'responses': current_responses})
+    read_cache.invalidate(u'arena', thread_id)
     return new_comment
+
+async def _load_comments(thread_id: str, page: PageParams):
+    comments, next_cursor = await fetch_page(arena_comments.comments_ref(thread_id), page)
+    if page.fields:
+        return render(comments, projection_adapter, page_headers(next_cursor), trusted=True)
+    return _comments_renderer.render(comments, page_headers(next_cursor))
+
+@router.get("/{thread_id}/comments", response_model=List[ArenaComment])
+async def read_comments(
+    thread_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    await repository.cached_or_404(thread_id)
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='createdAt',
+        sortable=(u'createdAt',),
+        selectable=list(ArenaComment.model_fields),
+    )
+    content = await read_cache.get_or_load(
+        (u'arena', 'comments', thread_id, page.cache_key()),
+        lambda: _load_comments(thread_id, page),
+    )
+    return conditional_response(request, content, CACHE_CONTROL[u'arena'])
@@ -0,0 +1,116 @@
+"""
+Everything the home page needs in one round trip.
+
+GET /api/v1/bootstrap/ returns the card fields of several collections at once:
+
+    {"projects": {"etag": "…", "items": [...]}, "writings": {...}, "systems": {...}}
+
+The sections are loaded concurrently and each is cached on its own, so a write
+to one collection only rebuilds that section. A client already holding a
+section sends its etag back in `known` (`known=projects:<etag>,writings:<etag>`)
+and gets `{"etag": ..., "unchanged": true}` without the items for it.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.cache import read_cache
+from app.core.http_cache import CACHE_CONTROL, CachedContent, conditional_response, render
+from app.core.pagination import projection_adapter
+from app.routers import projects, systems, writings
+from app.services import card_index
+
+router = APIRouter()
+
+# Section -> (repository, order of its items).
+SECTIONS = {
+    u'projects': (projects.repository, 'title'),
+    u'writings': (writings.repository, '-publishedAt'),
+    u'systems': (systems.repository, 'name'),
+}
+
+
+def _card_defaults(repository) -> Dict[str, object]:
+    # Older documents may lack fields the model defaults (e.g. a project's `status`).
+    fields = repository.model.model_fields
+    return {
+        name: fields[name].default
+        for name in card_index.CARD_FIELDS[repository.collection]
+        if name in fields and not fields[name].is_required() and fields[name].default is not None
+    }
+
+
+_DEFAULTS = {name: _card_defaults(repository) for name, (repository, _) in SECTIONS.items()}
+
+# Assembled responses by (section, etag, unchanged) of each part, which fully
+# determine the body; reused so a repeat request is not hashed or compressed again.
+MAX_ASSEMBLED = 64
+_assembled: Dict[Tuple, CachedContent] = {}
+
+
+async def _load_section(name: str) -> CachedContent:
+    repository, order = SECTIONS[name]
+    cards = await repository.cards()
+    for card in cards:
+        for field, default in _DEFAULTS[name].items():
+            if card.get(field) is None:
+                card[field] = default
+    # The whole collection, like the default list it stands in for.
+    items = card_index.sort_cards(cards, order.lstrip('-'), order.startswith('-'))
+    return render(items, projection_adapter, trusted=True)
+
+
+async def _section(name: str) -> CachedContent:
+    return await read_cache.get_or_load((name, 'list', 'bootstrap'), lambda: _load_section(name))
+
+
+def _parse_known(known: Optional[str]) -> Dict[str, str]:
+    """"projects:abc,writings:def" -> {"projects": "abc", "writings": "def"}"""
+    etags = {}
+    for item in (known or "").split(","):
+        name, _, etag = item.partition(":")
+        if etag:
+            etags[name.strip()] = etag.strip().strip('"')
+    return etags
+
+
+def _assemble(key: Tuple, contents) -> CachedContent:
+    # Sections are spliced in as already-serialized bytes rather than re-encoded.
+    parts = []
+    for (name, etag, unchanged), content in zip(key, contents):
+        etag = etag.strip('"')
+        head = b'%s:{"etag":%s,' % (json.dumps(name).encode(), json.dumps(etag).encode())
+        if unchanged:
+            parts.append(head + b'"unchanged":true}')
+        else:
+            parts.append(head + b'"items":' + content.body + b'}')
+    body = b"{" + b",".join(parts) + b"}"
+    # The parts' own etags already identify the body; no need to hash it again.
+    etag = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    return CachedContent(None, body, etag=etag)
+
+
+@router.get("/")
+async def read_bootstrap(request: Request, sections: Optional[str] = None, known: Optional[str] = None):
+    names = [name.strip() for name in sections.split(",") if name.strip()] if sections else list(SECTIONS)
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    names = list(dict.fromkeys(names))
+    contents = await asyncio.gather(*(_section(name) for name in names))
+
+    client_etags = _parse_known(known)
+    key = tuple(
+        (name, content.etag, client_etags.get(name) == content.etag.strip('"'))
+        for name, content in zip(names, contents)
+    )
+    assembled = _assembled.get(key)
+    if assembled is None:
+        if len(_assembled) >= MAX_ASSEMBLED:
+            _assembled.clear()
+        assembled = _assembled[key] = _assemble(key, contents)
+    return conditional_response(request, assembled, CACHE_CONTROL[u'bootstrap'])
+
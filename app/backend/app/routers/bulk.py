@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Tuple
+from app.dependencies import get_current_user
+from app.repository import notify_written
+from app.services import bulk
+from app.services.explanation_jobs import pregeneration_queue
+
+router = APIRouter()
+
+def _check_collection(collection: str):
+    if collection not in bulk.BULK_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown collection '{collection}'")
+
+async def _after_import(collection: str, saved: List[Tuple[str, Dict[str, Any]]]):
+    # The same follow-up the single-item handlers do after a committed write.
+    for doc_id, data in saved:
+        notify_written(collection, doc_id, data)
+        if collection == u'projects':
+            await pregeneration_queue.enqueue(doc_id)
+
+@router.post("/{collection}")
+async def import_collection(collection: str, request: Request, user=Depends(get_current_user)):
+    """
+    Create or replace documents from an NDJSON body (one document per line,
+    `id` optional). Returns created/updated/failed counts and a result per line.
+    """
+    _check_collection(collection)
+    return await bulk.import_lines(collection, request.stream(), on_commit=_after_import)
+
+@router.get("/{collection}")
+async def export_collection(collection: str, user=Depends(get_current_user)):
+    """Stream every document of `collection` as NDJSON."""
+    _check_collection(collection)
+    return StreamingResponse(
+        bulk.export_lines(collection),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection}.ndjson"'},
+    )
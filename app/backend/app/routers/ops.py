@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.core import compression
+from app.core.cache import read_cache
+from app.core.auth_cache import token_cache
+from app.core.limiter import limiter
+from app.dependencies import get_current_user
+from app.repository import repository_metrics
+from app.services import explanation_jobs, gemini
+from app.services.email_outbox import email_outbox
+from app.services.facets import facet_index
+from app.services.message_ingest import message_buffer
+from app.services.search import search_index
+
+router = APIRouter()
+
+@router.get("/cache")
+def read_cache_stats(user=Depends(get_current_user)):
+    return read_cache.stats()
+
+@router.get("/explanations")
+def read_pregeneration_stats(user=Depends(get_current_user)):
+    return explanation_jobs.pregeneration_queue.stats()
+
+@router.get("/explanations/{project_id}")
+async def read_pregeneration_status(project_id: str, user=Depends(get_current_user)):
+    job = await explanation_jobs.status(project_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No explanation job for this project")
+    return job
+
+@router.get("/models")
+def read_model_stats(user=Depends(get_current_user)):
+    return gemini.model_stats()
+
+@router.get("/email")
+def read_email_outbox_stats(user=Depends(get_current_user)):
+    return email_outbox.stats()
+
+@router.get("/messages")
+def read_message_ingest_stats(user=Depends(get_current_user)):
+    return message_buffer.stats()
+
+@router.get("/auth")
+def read_token_cache_stats(user=Depends(get_current_user)):
+    return token_cache.stats()
+
+@router.get("/rate-limits")
+def read_rate_limit_stats(user=Depends(get_current_user)):
+    return limiter.stats()
+
+@router.get("/search")
+def read_search_index_stats(user=Depends(get_current_user)):
+    return search_index.stats()
+
+@router.get("/facets")
+def read_facet_index_stats(user=Depends(get_current_user)):
+    return facet_index.stats()
+
+@router.get("/compression")
+def read_compression_stats(user=Depends(get_current_user)):
+    return compression.stats()
+
+@router.get("/repositories")
+def read_repository_stats(user=Depends(get_current_user)):
+    return repository_metrics.stats()
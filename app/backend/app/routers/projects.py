@@ -1,88 +1,122 @@
-from fastapi import APIRouter, HTTPException, Depends
+import anyio
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.models.content import Project, ProjectCreate
-from app.core.firebase import db
+from app.core.http_cache import CACHE_CONTROL, conditional_response
+from app.core.limiter import rate_limit
+from app.core.pagination import MAX_PAGE_SIZE, PageParams
+from app.core.sse import sse_event
 from app.dependencies import get_current_user
-from datetime import datetime
+from app.repository import Repository
+from app.services.explanation_jobs import pregeneration_queue
 from pydantic import BaseModel
 
 router = APIRouter()
 
+repository = Repository(u'projects', Project, not_found="Project not found")
+
 @router.post("/", response_model=Project)
-def create_project(project: ProjectCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'projects').document()
-    project_dict = project.dict()
-    project_dict['id'] = doc_ref.id
-    # Ensure date fields are serialized if needed, but Pydantic handles datetimes well typically.
-    # Firestore stores them as Timestamps.
-    doc_ref.set(project_dict)
+async def create_project(project: ProjectCreate, user=Depends(get_current_user)):
+    project_dict = await repository.create(repository.serialize(project, repository.new_id()))
+    await pregeneration_queue.enqueue(project_dict['id'])
     return project_dict
 
 @router.get("/", response_model=List[Project])
-def read_projects():
-    docs = db.collection(u'projects').stream()
-    return [doc.to_dict() for doc in docs]
+async def read_projects(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='title',
+        sortable=(u'title', u'slug', u'status'),
+        selectable=list(Project.model_fields),
+    )
+    content = await repository.cached_list(page)
+    return conditional_response(request, content, CACHE_CONTROL[u'projects'])
 
 @router.get("/slug/{slug}", response_model=Project)
-def read_project_by_slug(slug: str):
-    docs = db.collection(u'projects').where(u'slug', u'==', slug).stream()
-    for doc in docs:
-        return doc.to_dict()
-    raise HTTPException(status_code=404, detail="Project not found")
+async def read_project_by_slug(slug: str, request: Request):
+    content = await repository.cached_by_slug(slug)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return conditional_response(request, content, CACHE_CONTROL[u'projects'])
 
 @router.get("/{project_id}", response_model=Project)
-def read_project(project_id: str):
-    doc_ref = db.collection(u'projects').document(project_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        raise HTTPException(status_code=404, detail="Project not found")
+async def read_project(project_id: str, request: Request):
+    content = await repository.cached_or_404(project_id)
+    return conditional_response(request, content, CACHE_CONTROL[u'projects'])
 
 class ExplainRequest(BaseModel):
     persona: str
 
-@router.post("/slug/{slug}/explain")
+@router.post("/slug/{slug}/explain", dependencies=[Depends(rate_limit("explain"))])
 async def explain_project(slug: str, request: ExplainRequest):
     """
     Generate an AI explanation for a project based on a persona.
     """
-    # 1. Fetch Project Data (Reuse Firestore logic)
-    project_data = None
-    docs = db.collection(u'projects').where(u'slug', u'==', slug).stream()
-    for doc in docs:
-        project_data = doc.to_dict()
-        break
+    # 1. Fetch Project Data (shares the cached slug lookup with the detail page)
+    content = await repository.cached_by_slug(slug)
     
-    if not project_data:
+    if not content:
          raise HTTPException(status_code=404, detail="Project not found")
+    project_data = content.data
     
-    # 2. Call Gemini Service
-    from app.services.gemini import generate_project_explanation
-    explanation = generate_project_explanation(project_data, request.persona)
+    # 2. Serve from the explanation cache, calling Gemini on a miss
+    from app.services.explanations import get_explanation
+    from app.services.gemini import ExplanationError
+    try:
+        explanation, cached = await get_explanation(project_data, request.persona)
+    except ExplanationError as e:
+        return {"explanation": str(e), "cached": False}
     
-    return {"explanation": explanation}
+    return {"explanation": explanation, "cached": cached}
+
+@router.get("/slug/{slug}/explain/stream", dependencies=[Depends(rate_limit("explain"))])
+async def stream_project_explanation(slug: str, persona: str = "recruiter"):
+    """
+    Stream an AI explanation as Server-Sent Events: `chunk` events carry
+    {"text": ...}, then `done` ({"cached": bool}) or `failed` ({"detail": ...}).
+    If the client disconnects the upstream generation is cancelled.
+    """
+    content = await repository.cached_by_slug(slug)
+    if not content:
+         raise HTTPException(status_code=404, detail="Project not found")
+
+    from app.services.explanations import open_stream
+    from app.services.gemini import ExplanationError
+    cached, chunks = await open_stream(content.data, persona)
+
+    async def events():
+        try:
+            async for text in chunks:
+                yield sse_event("chunk", {"text": text})
+            yield sse_event("done", {"cached": cached})
+        except ExplanationError as e:
+            yield sse_event("failed", {"detail": str(e)})
+        finally:
+            # Starlette cancels this generator on disconnect; close upstream regardless.
+            with anyio.CancelScope(shield=True):
+                await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put("/{project_id}", response_model=Project)
-def update_project(project_id: str, project: ProjectCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'projects').document(project_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    project_dict = project.dict()
-    project_dict['id'] = project_id
-    doc_ref.set(project_dict, merge=True)
+async def update_project(project_id: str, project: ProjectCreate, user=Depends(get_current_user)):
+    project_dict = await repository.update(project_id, repository.serialize(project, project_id))
+    await pregeneration_queue.enqueue(project_id)
     return project_dict
 
 @router.delete("/{project_id}")
-def delete_project(project_id: str, user=Depends(get_current_user)):
+async def delete_project(project_id: str, user=Depends(get_current_user)):
     print(f"Attempting to delete project: {project_id} by user: {user['uid']}")
-    doc_ref = db.collection(u'projects').document(project_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        print(f"Project not found: {project_id}")
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    doc_ref.delete()
+    await repository.delete(project_id)
     return {"message": "Project deleted successfully"}
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.services.search import SEARCH_FIELDS, search_index
+
+router = APIRouter()
+
+MAX_RESULTS = 50
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    collections: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+):
+    """
+    Ranked full-text search. The last word also matches as a prefix, and each
+    hit carries HTML snippets with the matched words wrapped in <mark>.
+    `collections` is a comma-separated subset of projects, writings, vault.
+    """
+    wanted = [c.strip() for c in collections.split(",") if c.strip()] if collections else None
+    unknown = sorted(set(wanted or ()) - set(SEARCH_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+    total, results = await search_index.search(q, wanted, limit)
+    return {"query": q, "total": total, "results": results}
@@ -1,51 +1,46 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Request, Query
+from typing import List, Optional
 from app.models.content import System, SystemCreate
-from app.core.firebase import db
+from app.core.http_cache import CACHE_CONTROL, conditional_response
+from app.core.pagination import MAX_PAGE_SIZE, PageParams
 from app.dependencies import get_current_user
+from app.repository import Repository
 
 router = APIRouter()
 
+repository = Repository(u'systems', System, not_found="System not found")
+
 @router.post("/", response_model=System)
-def create_system(system: SystemCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'systems').document()
-    system_dict = system.dict()
-    system_dict['id'] = doc_ref.id
-    doc_ref.set(system_dict)
-    return system_dict
+async def create_system(system: SystemCreate, user=Depends(get_current_user)):
+    return await repository.create(repository.serialize(system, repository.new_id()))
 
 @router.get("/", response_model=List[System])
-def read_systems():
-    docs = db.collection(u'systems').stream()
-    return [doc.to_dict() for doc in docs]
+async def read_systems(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='name',
+        sortable=(u'name', u'category'),
+        selectable=list(System.model_fields),
+    )
+    content = await repository.cached_list(page)
+    return conditional_response(request, content, CACHE_CONTROL[u'systems'])
 
 @router.get("/{system_id}", response_model=System)
-def read_system(system_id: str):
-    doc_ref = db.collection(u'systems').document(system_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        raise HTTPException(status_code=404, detail="System not found")
+async def read_system(system_id: str, request: Request):
+    content = await repository.cached_or_404(system_id)
+    return conditional_response(request, content, CACHE_CONTROL[u'systems'])
 
 @router.put("/{system_id}", response_model=System)
-def update_system(system_id: str, system: SystemCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'systems').document(system_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="System not found")
-    
-    system_dict = system.dict()
-    system_dict['id'] = system_id
-    doc_ref.set(system_dict, merge=True)
-    return system_dict
+async def update_system(system_id: str, system: SystemCreate, user=Depends(get_current_user)):
+    return await repository.update(system_id, repository.serialize(system, system_id))
 
 @router.delete("/{system_id}")
-def delete_system(system_id: str, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'systems').document(system_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="System not found")
-    
-    doc_ref.delete()
+async def delete_system(system_id: str, user=Depends(get_current_user)):
+    await repository.delete(system_id)
     return {"message": "System deleted successfully"}
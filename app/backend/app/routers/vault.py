@@ -1,51 +1,60 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Request, Query
+from typing import List, Optional
 from app.models.content import VaultEntry, VaultEntryCreate
-from app.core.firebase import db
+from app.core.http_cache import CACHE_CONTROL, conditional_response
+from app.core.pagination import MAX_PAGE_SIZE, PageParams
 from app.dependencies import get_current_user
+from app.repository import Repository
+from app.services import facets
+from app.services.facets import facet_index
 
 router = APIRouter()
 
+repository = Repository(u'vault', VaultEntry, not_found="Vault entry not found")
+
 @router.post("/", response_model=VaultEntry)
-def create_vault_entry(entry: VaultEntryCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'vault').document()
-    entry_dict = entry.dict()
-    entry_dict['id'] = doc_ref.id
-    doc_ref.set(entry_dict)
-    return entry_dict
+async def create_vault_entry(entry: VaultEntryCreate, user=Depends(get_current_user)):
+    return await repository.create(repository.serialize(entry, repository.new_id()))
 
 @router.get("/", response_model=List[VaultEntry])
-def read_vault_entries():
-    docs = db.collection(u'vault').stream()
-    return [doc.to_dict() for doc in docs]
+async def read_vault_entries(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[str] = None,
+):
+    """`category=a,b` matches either category; `tags=x,y` requires both tags."""
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='title',
+        sortable=(u'title', u'category'),
+        selectable=list(VaultEntry.model_fields),
+    )
+    filters = facets.parse_filters({"category": category, "tags": tags})
+    if filters:
+        content = await repository.cached_filtered(filters, page)
+    else:
+        content = await repository.cached_list(page)
+    return conditional_response(request, content, CACHE_CONTROL[u'vault'])
+
+@router.get("/_facets")
+async def read_vault_facets(category: Optional[str] = None, tags: Optional[str] = None):
+    """Entry counts per category and tag within the given selection."""
+    return await facet_index.summary(u'vault', facets.parse_filters({"category": category, "tags": tags}))
 
 @router.get("/{entry_id}", response_model=VaultEntry)
-def read_vault_entry(entry_id: str):
-    doc_ref = db.collection(u'vault').document(entry_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        raise HTTPException(status_code=404, detail="Vault entry not found")
+async def read_vault_entry(entry_id: str, request: Request):
+    content = await repository.cached_or_404(entry_id)
+    return conditional_response(request, content, CACHE_CONTROL[u'vault'])
 
 @router.put("/{entry_id}", response_model=VaultEntry)
-def update_vault_entry(entry_id: str, entry: VaultEntryCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'vault').document(entry_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Vault entry not found")
-    
-    entry_dict = entry.dict()
-    entry_dict['id'] = entry_id
-    doc_ref.set(entry_dict, merge=True)
-    return entry_dict
+async def update_vault_entry(entry_id: str, entry: VaultEntryCreate, user=Depends(get_current_user)):
+    return await repository.update(entry_id, repository.serialize(entry, entry_id))
 
 @router.delete("/{entry_id}")
-def delete_vault_entry(entry_id: str, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'vault').document(entry_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Vault entry not found")
-    
-    doc_ref.delete()
+async def delete_vault_entry(entry_id: str, user=Depends(get_current_user)):
+    await repository.delete(entry_id)
     return {"message": "Vault entry deleted successfully"}
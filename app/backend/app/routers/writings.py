@@ -1,67 +1,67 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from typing import List, Optional
 from app.models.content import Writing, WritingCreate
-from app.core.firebase import db
+from app.core.http_cache import CACHE_CONTROL, conditional_response
+from app.core.pagination import MAX_PAGE_SIZE, PageParams
 from app.dependencies import get_current_user
+from app.repository import Repository
+from app.services import facets
+from app.services.facets import facet_index
 
 router = APIRouter()
 
+repository = Repository(u'writings', Writing, not_found="Writing not found")
+
 @router.post("/", response_model=Writing)
-def create_writing(writing: WritingCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'writings').document()
-    writing_dict = writing.dict()
-    writing_dict['id'] = doc_ref.id
-    # Ensure datetime is serializable
-    if writing_dict.get('publishedAt'):
-         writing_dict['publishedAt'] = writing_dict['publishedAt'].isoformat()
-    doc_ref.set(writing_dict)
-    return writing_dict
+async def create_writing(writing: WritingCreate, user=Depends(get_current_user)):
+    return await repository.create(repository.serialize(writing, repository.new_id()))
 
 @router.get("/", response_model=List[Writing])
-def read_writings():
-    docs = db.collection(u'writings').stream()
-    items = []
-    for doc in docs:
-        item = doc.to_dict()
-        items.append(item)
-    return items
+async def read_writings(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Optional[str] = None,
+    fields: Optional[str] = None,
+    tags: Optional[str] = None,
+    series: Optional[str] = None,
+):
+    """`tags=x,y` requires both tags; `series=a,b` matches either series."""
+    page = PageParams(
+        limit, cursor, order_by, fields,
+        default_order='-publishedAt',
+        sortable=(u'publishedAt', u'title', u'readingTime'),
+        selectable=list(Writing.model_fields),
+    )
+    filters = facets.parse_filters({"tags": tags, "series": series})
+    if filters:
+        content = await repository.cached_filtered(filters, page)
+    else:
+        content = await repository.cached_list(page)
+    return conditional_response(request, content, CACHE_CONTROL[u'writings'])
+
+@router.get("/_facets")
+async def read_writing_facets(tags: Optional[str] = None, series: Optional[str] = None):
+    """Writing counts per tag and series within the given selection."""
+    return await facet_index.summary(u'writings', facets.parse_filters({"tags": tags, "series": series}))
 
 @router.get("/id/{writing_id}", response_model=Writing)
-def read_writing_by_id(writing_id: str):
-    doc_ref = db.collection(u'writings').document(writing_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    raise HTTPException(status_code=404, detail="Writing not found")
+async def read_writing_by_id(writing_id: str, request: Request):
+    content = await repository.cached_or_404(writing_id)
+    return conditional_response(request, content, CACHE_CONTROL[u'writings'])
 
 @router.get("/{slug}", response_model=Writing)
-def read_writing_by_slug(slug: str):
-    docs = db.collection(u'writings').where(u'slug', u'==', slug).stream()
-    for doc in docs:
-        return doc.to_dict()
-    raise HTTPException(status_code=404, detail="Writing not found")
+async def read_writing_by_slug(slug: str, request: Request):
+    content = await repository.cached_by_slug(slug)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Writing not found")
+    return conditional_response(request, content, CACHE_CONTROL[u'writings'])
 
 @router.put("/{writing_id}", response_model=Writing)
-def update_writing(writing_id: str, writing: WritingCreate, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'writings').document(writing_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Writing not found")
-    
-    writing_dict = writing.dict()
-    writing_dict['id'] = writing_id
-    if writing_dict.get('publishedAt'):
-         writing_dict['publishedAt'] = writing_dict['publishedAt'].isoformat()
-         
-    doc_ref.set(writing_dict, merge=True)
-    return writing_dict
+async def update_writing(writing_id: str, writing: WritingCreate, user=Depends(get_current_user)):
+    return await repository.update(writing_id, repository.serialize(writing, writing_id))
 
 @router.delete("/{writing_id}")
-def delete_writing(writing_id: str, user=Depends(get_current_user)):
-    doc_ref = db.collection(u'writings').document(writing_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Writing not found")
-    
-    doc_ref.delete()
+async def delete_writing(writing_id: str, user=Depends(get_current_user)):
+    await repository.delete(writing_id)
     return {"message": "Writing deleted successfully"}
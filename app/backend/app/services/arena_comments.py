@@ -0,0 +1,154 @@
+"""
+Arena comments, one document each under `arena/{thread_id}/comments`.
+
+Appending a comment is a single-document create plus an `Increment` of the
+thread's `commentCount`, committed in one WriteBatch; the thread document
+itself never holds the comments. Threads written before this layout keep
+them in an embedded `responses` array until `migrate` moves them out;
+`migrate_all` also gives old threads the counter fields they lack, since
+listings ordered by a counter leave out documents without it.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud import firestore
+from pydantic import ValidationError
+
+from app.core.batching import MAX_BATCH_WRITES
+from app.core.firebase import async_db
+from app.models.content import ArenaComment
+
+logger = logging.getLogger(__name__)
+
+COMMENTS_COLLECTION = u'comments'
+
+
+def _thread_ref(thread_id: str):
+    return async_db.collection(u'arena').document(thread_id)
+
+
+def comments_ref(thread_id: str):
+    return _thread_ref(thread_id).collection(COMMENTS_COLLECTION)
+
+
+def new_comment(content: str, author: str) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "content": content,
+        "author": author,
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def embedded_id(thread_id: str, index: int) -> str:
+    """Stable id for the `index`-th embedded response of a thread that did not carry one."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"arena/{thread_id}/responses/{index}"))
+
+
+def stage_add(batch, thread_id: str, comment: Dict[str, Any]):
+    """Stage the comment and the count bump; the update fails the batch if the thread is gone."""
+    batch.create(comments_ref(thread_id).document(comment["id"]), comment)
+    batch.update(_thread_ref(thread_id), {u'commentCount': firestore.Increment(1)})
+
+
+async def delete_all(thread_id: str) -> int:
+    """Delete every comment of a thread. Returns how many there were."""
+    deleted = 0
+    batch = async_db.batch()
+    pending = 0
+    async for doc in comments_ref(thread_id).select([]).stream():
+        batch.delete(doc.reference)
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            await batch.commit()
+            deleted += pending
+            batch = async_db.batch()
+            pending = 0
+    if pending:
+        await batch.commit()
+        deleted += pending
+    return deleted
+
+
+def _legacy_comment(thread_id: str, index: int, response: Any, created_at: Any) -> Optional[Dict[str, Any]]:
+    """An embedded response as a comment document, with the fields old entries lack filled in; None if unusable."""
+    if not isinstance(response, dict):
+        return None
+    comment = dict(response)
+    if not comment.get("id"):
+        comment["id"] = embedded_id(thread_id, index)
+    if not comment.get("author"):
+        comment["author"] = "Anonymous"
+    if comment.get("content") is None:
+        comment["content"] = ""
+    # Comments are listed by createdAt, which leaves out documents without one.
+    if not comment.get("createdAt"):
+        comment["createdAt"] = created_at
+    try:
+        ArenaComment(**comment)
+    except ValidationError:
+        return None
+    return comment
+
+
+async def migrate(thread_id: str, responses: List[Dict[str, Any]], published_at: Any = None) -> Tuple[int, int]:
+    """
+    Move a thread's embedded `responses` into its comments subcollection.
+    Comments keep their ids (or get one derived from their position), so
+    running it again after a partial failure does not duplicate them;
+    `commentCount` is recomputed from the result. Entries missing a
+    createdAt take the thread's `published_at`; entries that still do not
+    make a valid comment are logged and dropped. Returns (moved, skipped).
+    """
+    existing = {doc.id async for doc in comments_ref(thread_id).select([]).stream()}
+    created_at = published_at or datetime.utcnow().isoformat() + "Z"
+    comments = []
+    for index, response in enumerate(responses):
+        comment = _legacy_comment(thread_id, index, response, created_at)
+        if comment is None:
+            logger.warning("Dropping invalid response %d of arena thread %s: %r", index, thread_id, response)
+            continue
+        comments.append(comment)
+    total = len(existing | {comment["id"] for comment in comments})
+
+    # The thread update goes in the last batch, so `responses` is only
+    # dropped once every comment has been written.
+    chunks = [comments[start:start + MAX_BATCH_WRITES - 1] for start in range(0, len(comments), MAX_BATCH_WRITES - 1)]
+    for number, chunk in enumerate(chunks or [[]], 1):
+        batch = async_db.batch()
+        for comment in chunk:
+            batch.set(comments_ref(thread_id).document(comment["id"]), comment)
+        if number >= len(chunks):
+            batch.update(_thread_ref(thread_id), {u'responses': firestore.DELETE_FIELD, u'commentCount': total})
+        await batch.commit()
+    return len(comments), len(responses) - len(comments)
+
+
+async def _backfill_counters(thread_id: str, data: Dict[str, Any], count_comments: bool) -> bool:
+    """Set likes/dislikes to 0 and (if `count_comments`) commentCount to the stored comments where missing."""
+    missing = {field: 0 for field in (u'likes', u'dislikes') if data.get(field) is None}
+    if count_comments and data.get(u'commentCount') is None:
+        missing[u'commentCount'] = len([doc async for doc in comments_ref(thread_id).select([]).stream()])
+    if missing:
+        await _thread_ref(thread_id).update(missing)
+    return bool(missing)
+
+
+async def migrate_all() -> Dict[str, int]:
+    threads = 0
+    moved = 0
+    skipped = 0
+    backfilled = 0
+    async for doc in async_db.collection(u'arena').stream():
+        data = doc.to_dict()
+        responses = data.get(u'responses')
+        if responses is not None:
+            thread_moved, thread_skipped = await migrate(doc.id, responses, data.get(u'publishedAt'))
+            moved += thread_moved
+            skipped += thread_skipped
+            threads += 1
+        # migrate() has already written commentCount.
+        backfilled += await _backfill_counters(doc.id, data, count_comments=responses is None)
+    return {"threads": threads, "comments": moved, "skipped": skipped, "backfilled": backfilled}
@@ -0,0 +1,104 @@
+"""
+Base class for the in-memory indexes built from Firestore in the background.
+
+`start()` runs `rebuild()` at startup and then every `rebuild_interval`
+seconds, so writes made through other instances show up too; this instance's
+write handlers keep the live structure current through `upsert`/`remove`.
+Subclasses say how to build an empty structure, fill it from a scan and apply
+one document to it.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundIndex:
+    name = "index"
+
+    def __init__(self, rebuild_interval: float = 600.0):
+        self.rebuild_interval = rebuild_interval
+        self._current = self._empty()
+        self._ready: Optional[asyncio.Event] = None
+        self._tasks = BackgroundTasks()
+        self._building = False
+        # Writes that land while a rebuild streams the collections, replayed on top of it.
+        self._writes: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        self._counters = {"builds": 0, "build_errors": 0, "queries": 0, "updates": 0}
+
+    def _empty(self):
+        raise NotImplementedError
+
+    async def _scan(self, target):
+        """Add every indexed document to `target`."""
+        raise NotImplementedError
+
+    def _add(self, target, collection: str, doc_id: str, data: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _remove(self, target, collection: str, doc_id: str):
+        raise NotImplementedError
+
+    def _size(self, target) -> int:
+        raise NotImplementedError
+
+    def upsert(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        self._counters["updates"] += 1
+        self._add(self._current, collection, doc_id, data)
+        if self._building:
+            self._writes[(collection, doc_id)] = data
+
+    def remove(self, collection: str, doc_id: str):
+        self._counters["updates"] += 1
+        self._remove(self._current, collection, doc_id)
+        if self._building:
+            self._writes[(collection, doc_id)] = None
+
+    async def rebuild(self) -> int:
+        """Replace the index with one built from a full scan. Returns the document count."""
+        self._building = True
+        self._writes = {}
+        try:
+            rebuilt = self._empty()
+            await self._scan(rebuilt)
+            for (collection, doc_id), data in self._writes.items():
+                if data is None:
+                    self._remove(rebuilt, collection, doc_id)
+                else:
+                    self._add(rebuilt, collection, doc_id, data)
+            self._current = rebuilt
+        finally:
+            self._building = False
+            self._writes = {}
+        self._counters["builds"] += 1
+        return self._size(rebuilt)
+
+    async def _wait_ready(self):
+        if self._ready is not None:
+            await self._ready.wait()
+        self._counters["queries"] += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                self._counters["build_errors"] += 1
+                logger.error("%s rebuild failed: %s", self.name, e)
+            # Serve whatever is indexed (possibly nothing) rather than hang requests.
+            self._ready.set()
+            await asyncio.sleep(self.rebuild_interval)
+
+    def start(self):
+        if not self._tasks:
+            self._ready = asyncio.Event()
+            self._tasks.spawn(self._run())
+
+    async def close(self):
+        await self._tasks.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, ready=self._ready is not None and self._ready.is_set())
@@ -0,0 +1,299 @@
+"""
+NDJSON import and export for every content collection.
+
+Import reads one JSON document per line and validates it against the
+collection's model; a line without an `id` gets a new one, a line with an
+`id` replaces that document. Lines are applied in chunks: one `get_all` for
+the chunk's existing documents (and slug owners), then WriteBatches of up to
+500 writes carrying the documents together with their card index and slug
+index changes. If a batch fails, its items are retried one by one so every
+line gets its own result:
+
+    {"line": 3, "id": "abc", "status": "created" | "updated" | "failed", "error": ...}
+
+Export streams the collection document by document, so memory use does not
+depend on its size. Arena threads are exported with their comments as
+`responses`, which import turns back into the comments subcollection, and
+with their shard totals folded into `likes`/`dislikes`; importing a thread
+deletes its counter shards so those totals are not counted twice.
+"""
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.batching import MAX_BATCH_WRITES
+from app.core.firebase import async_db
+from app.models.content import ArenaThread, Message, Project, System, VaultEntry, Writing
+from app.services import arena_comments, card_index, reactions, slug_index
+
+logger = logging.getLogger(__name__)
+
+BULK_MODELS = {
+    u'projects': Project,
+    u'writings': Writing,
+    u'systems': System,
+    u'vault': VaultEntry,
+    u'arena': ArenaThread,
+    u'messages': Message,
+}
+CHUNK_SIZE = 200
+# Firestore documents are capped at 1 MiB.
+MAX_LINE_BYTES = 1024 * 1024
+
+Op = Tuple[str, Any, Optional[Dict[str, Any]]]
+OnCommit = Callable[[str, List[Tuple[str, Dict[str, Any]]]], Awaitable[None]]
+
+
+class _Item:
+    __slots__ = ("line", "id", "data", "ops", "status", "error")
+
+    def __init__(self, line: int, doc_id: Optional[str] = None, data: Optional[Dict[str, Any]] = None):
+        self.line = line
+        self.id = doc_id
+        self.data = data
+        self.ops: List[Op] = []
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def fail(self, error: str):
+        self.status = u'failed'
+        self.error = error
+
+    def result(self) -> Dict[str, Any]:
+        result = {"line": self.line, "id": self.id, "status": self.status}
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a byte stream into (line number, line); None stands for a line over MAX_LINE_BYTES."""
+    buffer = b""
+    number = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            end = buffer.find(b"\n")
+            if end == -1:
+                if len(buffer) > MAX_LINE_BYTES:
+                    if not skipping:
+                        number += 1
+                        skipping = True
+                        yield number, None
+                    buffer = b""
+                break
+            line, buffer = buffer[:end], buffer[end + 1:]
+            if skipping:
+                skipping = False
+                continue
+            number += 1
+            yield number, line
+    if buffer and not skipping:
+        yield number + 1, buffer
+
+
+def _valid_id(doc_id: str) -> bool:
+    # "/" would address a nested document, "." and ".." are not valid document ids,
+    # and a leading "_" is reserved for routes such as /vault/_facets.
+    return "/" not in doc_id and doc_id not in (".", "..") and not doc_id.startswith("_")
+
+
+def _parse(collection: str, line: int, raw: Optional[bytes]) -> Optional[_Item]:
+    if raw is None:
+        item = _Item(line)
+        item.fail(f"Line is longer than {MAX_LINE_BYTES} bytes")
+        return item
+    if not raw.strip():
+        return None
+    try:
+        record = json.loads(raw)
+    except ValueError as e:
+        item = _Item(line)
+        item.fail(f"Invalid JSON: {e}")
+        return item
+    if not isinstance(record, dict):
+        item = _Item(line)
+        item.fail("Expected a JSON object")
+        return item
+    item = _Item(line, str(record["id"]) if record.get("id") else None)
+    if item.id is not None and not _valid_id(item.id):
+        item.fail(f"Invalid id '{item.id}'")
+        return item
+    try:
+        data = BULK_MODELS[collection](**dict(record, id=item.id or "")).model_dump(mode="json")
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+        item.fail(f"Invalid {collection} document: {problems}")
+        return item
+    if item.id is None:
+        item.id = data["id"] = async_db.collection(collection).document().id
+    item.data = data
+    return item
+
+
+async def _plan(collection: str, items: List[_Item], claimed: Dict[str, Optional[str]]):
+    """Read what the chunk replaces and stage every item's writes (or its failure)."""
+    collection_ref = async_db.collection(collection)
+    pending = [item for item in items if item.status is None]
+    existing = {
+        doc.id: doc.to_dict()
+        async for doc in async_db.get_all([collection_ref.document(item.id) for item in pending])
+        if doc.exists
+    }
+    owners: Dict[str, str] = {}
+    if collection in slug_index.SLUG_COLLECTIONS:
+        owners = await slug_index.owners(collection, [item.data["slug"] for item in pending if item.data.get("slug")])
+
+    for item in pending:
+        previous = existing.get(item.id)
+        item.status = u'updated' if previous is not None else u'created'
+        if collection in slug_index.SLUG_COLLECTIONS:
+            slug = item.data.get("slug")
+            if not slug_index.is_valid(slug or ""):
+                item.fail(f"Invalid slug '{slug}'")
+                continue
+            owner = claimed[slug] if slug in claimed else owners.get(slug)
+            if owner is not None and owner != item.id:
+                item.fail(f"Slug '{slug}' is already in use")
+                continue
+            claimed[slug] = item.id
+            item.ops.append(("set", slug_index.slug_ref(collection, slug), {u'id': item.id}))
+            previous_slug = (previous or {}).get("slug")
+            if previous_slug and previous_slug != slug and claimed.get(previous_slug, item.id) == item.id:
+                claimed[previous_slug] = None
+                item.ops.append(("delete", slug_index.slug_ref(collection, previous_slug), None))
+        if collection == u'arena':
+            _plan_thread(item)
+            if previous is not None:
+                # The imported counters are complete; shards left in place would be added on top.
+                item.ops.extend(("delete", ref, None) for ref in await reactions.shard_refs(item.id))
+        item.ops.append(("set", collection_ref.document(item.id), item.data))
+
+
+def _plan_thread(item: _Item):
+    # Like create_thread: embedded responses become comment documents.
+    responses = item.data.pop("responses", None) or []
+    for index, response in enumerate(responses):
+        comment = {**arena_comments.new_comment(response.get("content", ""), response.get("author", "Anonymous")), **response}
+        if not response.get("id"):
+            # Re-importing the same line must overwrite these comments, not add more.
+            comment["id"] = arena_comments.embedded_id(item.id, index)
+        item.ops.append(("set", arena_comments.comments_ref(item.id).document(comment["id"]), comment))
+    if responses:
+        item.data["commentCount"] = len(responses)
+
+
+def _stage(batch, ops: List[Op]):
+    for kind, ref, data in ops:
+        if kind == "set":
+            batch.set(ref, data)
+        else:
+            batch.delete(ref)
+
+
+async def _commit(collection: str, items: List[_Item]):
+    """Commit `items` in one batch (plus their card index entries); raises on failure."""
+    batch = async_db.batch()
+    for item in items:
+        _stage(batch, item.ops)
+    if collection in card_index.CARD_FIELDS:
+        card_index.stage_upsert_many(batch, collection, {item.id: item.data for item in items})
+    await batch.commit()
+
+
+async def _write(collection: str, items: List[_Item]):
+    budget = MAX_BATCH_WRITES - 1
+    groups: List[List[_Item]] = [[]]
+    used = 0
+    for item in items:
+        if len(item.ops) > budget:
+            # A thread with hundreds of comments: write the comments ahead, the thread last.
+            extra = item.ops[:-budget]
+            item.ops = item.ops[-budget:]
+            for start in range(0, len(extra), MAX_BATCH_WRITES):
+                batch = async_db.batch()
+                _stage(batch, extra[start:start + MAX_BATCH_WRITES])
+                try:
+                    await batch.commit()
+                except Exception as e:
+                    item.fail(str(e))
+                    break
+            if item.status == u'failed':
+                continue
+        if used + len(item.ops) > budget:
+            groups.append([])
+            used = 0
+        groups[-1].append(item)
+        used += len(item.ops)
+
+    for group in groups:
+        if not group:
+            continue
+        try:
+            await _commit(collection, group)
+        except Exception as e:
+            logger.warning("Bulk batch of %d %s failed (%s); retrying item by item", len(group), collection, e)
+            for item in group:
+                try:
+                    await _commit(collection, [item])
+                except Exception as item_error:
+                    item.fail(str(item_error))
+
+
+async def import_lines(
+    collection: str, chunks: AsyncIterator[bytes], on_commit: Optional[OnCommit] = None
+) -> Dict[str, Any]:
+    """Apply an NDJSON stream to `collection`. Returns the counts and one result per line."""
+    results: List[Dict[str, Any]] = []
+    counts = {u'created': 0, u'updated': 0, u'failed': 0}
+    claimed: Dict[str, Optional[str]] = {}
+
+    async def apply(items: List[_Item]):
+        await _plan(collection, items, claimed)
+        await _write(collection, [item for item in items if item.status != u'failed'])
+        saved = [(item.id, item.data) for item in items if item.status != u'failed']
+        if saved and on_commit is not None:
+            await on_commit(collection, saved)
+        for item in items:
+            counts[item.status] += 1
+            results.append(item.result())
+
+    chunk: List[_Item] = []
+    async for line, raw in iter_lines(chunks):
+        item = _parse(collection, line, raw)
+        if item is None:
+            continue
+        if item.id is not None and any(queued.id == item.id for queued in chunk):
+            # A batch must not write the same document twice; let the earlier line land first.
+            await apply(chunk)
+            chunk = []
+        chunk.append(item)
+        if len(chunk) == CHUNK_SIZE:
+            await apply(chunk)
+            chunk = []
+    if chunk:
+        await apply(chunk)
+    return dict(counts, collection=collection, results=results)
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def export_lines(collection: str) -> AsyncIterator[bytes]:
+    """Yield `collection` as NDJSON, one document at a time."""
+    async for doc in async_db.collection(collection).order_by(u'__name__').stream():
+        data = doc.to_dict()
+        data.setdefault("id", doc.id)
+        if collection == u'arena':
+            comments = [c.to_dict() async for c in arena_comments.comments_ref(doc.id).order_by(u'createdAt').stream()]
+            if comments:
+                data["responses"] = comments
+            reactions.apply_totals([data], await reactions.shard_totals(doc.id))
+        yield (json.dumps(data, default=_json_default, ensure_ascii=False) + "\n").encode("utf-8")
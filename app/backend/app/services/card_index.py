@@ -0,0 +1,151 @@
+"""
+Denormalized "card index" documents.
+
+Each content collection has one summary document in `card_indexes/{collection}`
+holding the lightweight fields its list views render, keyed by document id:
+
+    card_indexes/writings = {"items": {"<id>": {"id": ..., "title": ..., ...}}}
+
+The routers stage index changes in the same WriteBatch as the document write,
+so the index and the collection commit atomically. List requests that only ask
+for card fields are answered from this single document read.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from google.cloud import firestore
+
+from app.core.firebase import async_db
+from app.core.http_cache import CachedContent, render
+from app.core.pagination import MAX_PAGE_SIZE, PageParams, encode_cursor, page_headers, projection_adapter
+
+logger = logging.getLogger(__name__)
+
+INDEX_COLLECTION = u'card_indexes'
+
+CARD_FIELDS = {
+    u'projects': ["title", "slug", "thumbnail", "oneLiner", "techStack", "featured", "status"],
+    u'writings': ["title", "slug", "thumbnail", "excerpt", "tags", "series", "readingTime", "publishedAt"],
+    u'systems': ["name", "category", "logo", "usage"],
+    u'vault': ["title", "category", "tags"],
+}
+
+
+def _index_ref(collection: str):
+    return async_db.collection(INDEX_COLLECTION).document(collection)
+
+
+def card_for(collection: str, doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    card = {field: data.get(field) for field in CARD_FIELDS[collection]}
+    card["id"] = doc_id
+    return card
+
+
+def covers(collection: str, fields: Optional[List[str]]) -> bool:
+    """True when every requested field can be served from the card index."""
+    return bool(fields) and set(fields) <= set(CARD_FIELDS[collection]) | {"id"}
+
+
+def stage_upsert(batch, collection: str, doc_id: str, data: Dict[str, Any]):
+    batch.set(_index_ref(collection), {u'items': {doc_id: card_for(collection, doc_id, data)}}, merge=True)
+
+
+def stage_upsert_many(batch, collection: str, docs: Dict[str, Dict[str, Any]]):
+    """One index write for several documents (a batch may not write the index document twice)."""
+    items = {doc_id: card_for(collection, doc_id, data) for doc_id, data in docs.items()}
+    batch.set(_index_ref(collection), {u'items': items}, merge=True)
+
+
+def stage_delete(batch, collection: str, doc_id: str):
+    batch.set(_index_ref(collection), {u'items': {doc_id: firestore.DELETE_FIELD}}, merge=True)
+
+
+async def load_cards(collection: str) -> Optional[List[Dict[str, Any]]]:
+    """Return every card for `collection`, or None if the index has never been built."""
+    doc = await _index_ref(collection).get()
+    if not doc.exists:
+        return None
+    return list((doc.to_dict().get(u'items') or {}).values())
+
+
+def _rank(value: Any):
+    """Orders values of any type against each other the way Firestore does: by type first."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value if value.tzinfo else value.replace(tzinfo=timezone.utc))
+    if isinstance(value, str):
+        return (4, value)
+    return (5, repr(value))
+
+
+def _sort_key(field: str):
+    return lambda card: (_rank(card.get(field)), card["id"])
+
+
+def sort_cards(cards: List[Dict[str, Any]], order_field: str, descending: bool = False) -> List[Dict[str, Any]]:
+    return sorted(cards, key=_sort_key(order_field), reverse=descending)
+
+
+def page_cards(cards: List[Dict[str, Any]], params: PageParams):
+    """Apply the ordering, cursor, limit and projection of `params` in memory, like `fetch_page`."""
+    cards = sort_cards(cards, params.order_field, params.descending)
+    if params.cursor:
+        value, doc_id = params.cursor
+        marker = _sort_key(params.order_field)({params.order_field: value, "id": doc_id})
+        if params.descending:
+            cards = [c for c in cards if _sort_key(params.order_field)(c) < marker]
+        else:
+            cards = [c for c in cards if _sort_key(params.order_field)(c) > marker]
+
+    next_cursor = None
+    limit = params.limit or MAX_PAGE_SIZE
+    if len(cards) > limit:
+        cards = cards[:limit]
+        last = cards[-1]
+        next_cursor = encode_cursor([last.get(params.order_field), last["id"]])
+
+    if params.fields:
+        cards = [{field: card.get(field) for field in params.fields} for card in cards]
+    return cards, next_cursor
+
+
+async def render_cards(collection: str, params: PageParams) -> Optional[CachedContent]:
+    """Serve a card-only list page from the index document; None if it is missing."""
+    cards = await load_cards(collection)
+    if cards is None:
+        logger.warning("Card index for '%s' not built yet; run `python manage.py rebuild-card-index`", collection)
+        return None
+    items, next_cursor = page_cards(cards, params)
+    return render(items, projection_adapter, page_headers(next_cursor), trusted=True)
+
+
+async def _expected_cards(collection: str) -> Dict[str, Dict[str, Any]]:
+    return {
+        doc.id: card_for(collection, doc.id, doc.to_dict())
+        async for doc in async_db.collection(collection).stream()
+    }
+
+
+async def rebuild(collection: str) -> int:
+    """Recompute the index for `collection` from a full scan. Returns the card count."""
+    items = await _expected_cards(collection)
+    await _index_ref(collection).set({u'items': items})
+    return len(items)
+
+
+async def check(collection: str) -> Dict[str, List[str]]:
+    """Compare the index with the collection and report every discrepancy."""
+    expected, cards = await asyncio.gather(_expected_cards(collection), load_cards(collection))
+    indexed = {card["id"]: card for card in (cards or [])}
+    return {
+        "missing": sorted(set(expected) - set(indexed)),
+        "orphaned": sorted(set(indexed) - set(expected)),
+        "stale": sorted(doc_id for doc_id in set(expected) & set(indexed) if expected[doc_id] != indexed[doc_id]),
+    }
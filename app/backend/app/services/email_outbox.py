@@ -0,0 +1,181 @@
+"""
+Durable outbox for notification emails.
+
+A message to send is first written to `email_outbox/{id}`, ideally in the
+same WriteBatch as the record it notifies about, so it survives a restart
+between the request and the delivery. A background worker delivers due
+entries through the shared Formspree client:
+
+    {"subject": ..., "recipients": [...], "body": ...,
+     "attempts": 0, "nextAttemptAt": <datetime>, "leaseUntil": <datetime>,
+     "lastError": None, "createdAt": <datetime>}
+
+Delivered entries are deleted. Failures are retried with exponential
+backoff; after `max_attempts` (or a non-retryable error) the entry is moved to
+`email_dead_letters/{id}` for inspection.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from google.cloud import firestore
+
+from app.core.background import BackgroundTasks
+from app.core.email import EmailDeliveryError, email_service
+from app.core.firebase import async_db
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = u'email_outbox'
+DEAD_LETTER_COLLECTION = u'email_dead_letters'
+# An instance claims an entry for this long, so two instances never send it twice
+# unless the claiming one dies mid-delivery.
+LEASE = timedelta(minutes=2)
+
+
+def _outbox_ref(entry_id: Optional[str] = None):
+    collection = async_db.collection(OUTBOX_COLLECTION)
+    return collection.document(entry_id) if entry_id else collection.document()
+
+
+def stage(batch, subject: str, recipients: List[str], body: str) -> Optional[str]:
+    """Stage an outbox entry on `batch`; returns its id, or None if email is disabled."""
+    if not email_service.enabled:
+        return None
+    ref = _outbox_ref()
+    now = datetime.utcnow()
+    batch.set(ref, {
+        u'subject': subject,
+        u'recipients': recipients,
+        u'body': body,
+        u'attempts': 0,
+        u'nextAttemptAt': now,
+        u'leaseUntil': now,
+        u'lastError': None,
+        u'createdAt': now,
+    })
+    return ref.id
+
+
+@firestore.async_transactional
+async def _claim(transaction, ref, now: datetime) -> Optional[Dict[str, Any]]:
+    doc = await ref.get(transaction=transaction)
+    if not doc.exists:
+        return None
+    entry = doc.to_dict()
+    if _as_naive(entry.get(u'leaseUntil')) > now or _as_naive(entry.get(u'nextAttemptAt')) > now:
+        return None
+    transaction.update(ref, {u'leaseUntil': now + LEASE})
+    return entry
+
+
+def _as_naive(value) -> datetime:
+    # Firestore returns timezone-aware UTC timestamps; compare them as naive UTC.
+    if value is None:
+        return datetime.min
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+class EmailOutbox:
+    def __init__(
+        self,
+        poll_interval: float = 30.0,
+        batch_size: int = 20,
+        max_attempts: int = 6,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks = BackgroundTasks()
+        self._counters = {"sent": 0, "retried": 0, "dead": 0}
+
+    def notify(self):
+        """Wake the worker after staging entries, instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if not self._tasks and email_service.enabled:
+            self._wakeup = asyncio.Event()
+            self._tasks.spawn(self._run())
+
+    async def close(self):
+        await self._tasks.stop()
+        await email_service.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, running=bool(self._tasks))
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.drain() == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error("Email outbox pass failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self) -> int:
+        """Deliver up to `batch_size` due entries. Returns how many were attempted."""
+        now = datetime.utcnow()
+        due = []
+        async for doc in async_db.collection(OUTBOX_COLLECTION).order_by(u'nextAttemptAt').limit(self.batch_size).stream():
+            if _as_naive(doc.to_dict().get(u'nextAttemptAt')) > now:
+                break
+            due.append(doc.reference)
+        attempted = 0
+        for ref in due:
+            entry = await _claim(async_db.transaction(), ref, now)
+            if entry is None:
+                continue
+            attempted += 1
+            await self._deliver(ref, entry)
+        return attempted
+
+    async def _deliver(self, ref, entry: Dict[str, Any]):
+        try:
+            await email_service.deliver(entry[u'subject'], entry[u'recipients'], entry[u'body'])
+        except EmailDeliveryError as e:
+            attempts = entry.get(u'attempts', 0) + 1
+            if not e.retryable or attempts >= self.max_attempts:
+                await self._bury(ref, entry, attempts, str(e))
+                return
+            delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+            self._counters["retried"] += 1
+            await ref.update({
+                u'attempts': attempts,
+                u'lastError': str(e),
+                u'nextAttemptAt': datetime.utcnow() + timedelta(seconds=delay),
+                u'leaseUntil': datetime.utcnow(),
+            })
+            return
+        self._counters["sent"] += 1
+        await ref.delete()
+
+    async def _bury(self, ref, entry: Dict[str, Any], attempts: int, error: str):
+        logger.error("Giving up on email %s after %d attempts: %s", ref.id, attempts, error)
+        self._counters["dead"] += 1
+        batch = async_db.batch()
+        batch.set(async_db.collection(DEAD_LETTER_COLLECTION).document(ref.id), dict(
+            entry, attempts=attempts, lastError=error, failedAt=datetime.utcnow()
+        ))
+        batch.delete(ref)
+        await batch.commit()
+
+
+email_outbox = EmailOutbox(
+    poll_interval=float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "30")),
+    max_attempts=int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6")),
+    base_delay=float(os.getenv("EMAIL_OUTBOX_RETRY_DELAY", "30")),
+)
@@ -0,0 +1,171 @@
+"""
+Background pre-generation of project explanations.
+
+Saving a project enqueues it; workers then generate every persona's
+explanation into the explanation cache so visitors hit a warm entry. Work is
+bounded by `concurrency` workers and a shared `rate_per_minute` budget of
+Gemini calls. Each persona is retried with exponential backoff, and progress
+is recorded in `explanation_jobs/{project_id}`:
+
+    {"status": "queued" | "running" | "done" | "failed",
+     "personas": {"recruiter": "done", "engineer": "cached", ...},
+     "attempts": 2, "error": None, "updatedAt": ...}
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from app.core.background import BackgroundTasks
+from app.core.firebase import async_db
+from app.services import explanations
+from app.services.gemini import PERSONAS, ExplanationError, get_gemini_client
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = u'explanation_jobs'
+
+
+class _RateLimiter:
+    """Spaces calls at least 60 / rate_per_minute seconds apart."""
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PregenerationQueue:
+    def __init__(
+        self,
+        concurrency: int = 2,
+        rate_per_minute: float = 30,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._rate_per_minute = rate_per_minute
+        self._queue: Optional[asyncio.Queue] = None
+        self._limiter: Optional[_RateLimiter] = None
+        self._queued: Set[str] = set()
+        self._workers = BackgroundTasks()
+        self._counters = {"enqueued": 0, "done": 0, "failed": 0, "generated": 0, "retries": 0}
+
+    def _ensure_started(self):
+        # Created lazily so they bind to the running event loop.
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._limiter = _RateLimiter(self._rate_per_minute)
+
+    def start(self):
+        self._ensure_started()
+        while len(self._workers) < self.concurrency:
+            self._workers.spawn(self._work())
+
+    async def close(self):
+        """Stop the workers. Queued jobs stay `queued`; `manage.py warm-explanations` resumes them."""
+        await self._workers.stop()
+
+    async def enqueue(self, project_id: str):
+        if get_gemini_client() is None:
+            return
+        self._ensure_started()
+        if project_id in self._queued:
+            return
+        self._queued.add(project_id)
+        self._counters["enqueued"] += 1
+        await _set_status(project_id, {u'status': u'queued'})
+        self._queue.put_nowait(project_id)
+
+    async def join(self):
+        self._ensure_started()
+        await self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats["pending"] = self._queue.qsize() if self._queue is not None else 0
+        stats["workers"] = len(self._workers)
+        return stats
+
+    async def _work(self):
+        while True:
+            project_id = await self._queue.get()
+            # Saves that land while this job runs queue it again.
+            self._queued.discard(project_id)
+            try:
+                await self._run(project_id)
+            except Exception as e:
+                logger.error("Explanation job for %s crashed: %s", project_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, project_id: str):
+        doc = await async_db.collection(u'projects').document(project_id).get()
+        if not doc.exists:
+            await async_db.collection(JOBS_COLLECTION).document(project_id).delete()
+            return
+        project_data = doc.to_dict()
+        await _set_status(project_id, {u'status': u'running', u'slug': project_data.get('slug'), u'error': None})
+
+        results = await asyncio.gather(*(self._generate(project_id, project_data, p) for p in PERSONAS))
+        personas = {persona: result for persona, (result, _, _) in zip(PERSONAS, results)}
+        errors = [error for _, _, error in results if error]
+        failed = any(result == u'failed' for result in personas.values())
+        self._counters["failed" if failed else "done"] += 1
+        await _set_status(project_id, {
+            u'status': u'failed' if failed else u'done',
+            u'personas': personas,
+            u'attempts': max(attempts for _, attempts, _ in results),
+            u'error': errors[0] if errors else None,
+        })
+
+    async def _generate(self, project_id: str, project_data: Dict[str, Any], persona: str):
+        """Returns (result, attempts, error) for one persona."""
+        if await explanations.is_cached(project_data, persona):
+            return u'cached', 0, None
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            await self._limiter.wait()
+            try:
+                await explanations.get_explanation(project_data, persona)
+                self._counters["generated"] += 1
+                return u'done', attempt, None
+            except ExplanationError as e:
+                error = str(e)
+                if attempt < self.max_attempts:
+                    self._counters["retries"] += 1
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+        logger.error("Giving up on %s explanation for %s: %s", persona, project_id, error)
+        return u'failed', self.max_attempts, error
+
+
+async def _set_status(project_id: str, fields: Dict[str, Any]):
+    fields = dict(fields, updatedAt=datetime.utcnow())
+    try:
+        await async_db.collection(JOBS_COLLECTION).document(project_id).set(fields, merge=True)
+    except Exception as e:
+        logger.error("Failed to record explanation job status for %s: %s", project_id, e)
+
+
+async def status(project_id: str) -> Optional[Dict[str, Any]]:
+    doc = await async_db.collection(JOBS_COLLECTION).document(project_id).get()
+    return doc.to_dict() if doc.exists else None
+
+
+pregeneration_queue = PregenerationQueue(
+    concurrency=int(os.getenv("EXPLAIN_PREGEN_CONCURRENCY", "2")),
+    rate_per_minute=float(os.getenv("EXPLAIN_PREGEN_RATE_PER_MINUTE", "30")),
+    max_attempts=int(os.getenv("EXPLAIN_PREGEN_MAX_ATTEMPTS", "3")),
+)
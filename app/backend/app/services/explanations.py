@@ -0,0 +1,155 @@
+"""
+Content-addressed cache for AI project explanations.
+
+An explanation is identified by the project slug, the persona, the model and
+a hash of the rendered prompt. The prompt embeds every project field the
+persona uses, so editing one of those fields yields a new key and the old
+entry is simply never asked for again; nothing has to be invalidated.
+
+Results are stored in the `explanations` collection and kept in an in-process
+LRU in front of it. Concurrent requests for the same key share one load.
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from app.core.cache import ReadCache
+from app.core.firebase import async_db
+from app.services.gemini import (
+    PRIMARY_MODEL,
+    build_prompt,
+    generate_explanation,
+    generate_explanation_stream,
+    normalize_persona,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPLANATIONS_COLLECTION = u'explanations'
+# Cached text is replayed to streaming clients in pieces of this many characters.
+REPLAY_CHUNK_SIZE = 512
+
+# Keys are content hashes, so an entry can only become unused, never wrong.
+explanation_cache = ReadCache(
+    max_entries=int(os.getenv("EXPLANATION_CACHE_MAX_ENTRIES", "256")),
+    default_ttl=float(os.getenv("EXPLANATION_CACHE_TTL", "86400")),
+    stale_ttl=0,
+)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(slug: str, persona: str, model: str, prompt: str) -> str:
+    return _sha256("\n".join((slug, persona, model, _sha256(prompt))))
+
+
+def _resolve(project_data: Dict[str, Any], persona: str) -> Tuple[str, str, str, str]:
+    persona = normalize_persona(persona)
+    prompt = build_prompt(project_data, persona)
+    slug = project_data.get('slug') or project_data.get('id') or ''
+    return cache_key(slug, persona, PRIMARY_MODEL, prompt), slug, persona, prompt
+
+
+async def _stored(key: str):
+    doc = await async_db.collection(EXPLANATIONS_COLLECTION).document(key).get()
+    return dict(doc.to_dict(), generated=False) if doc.exists else None
+
+
+async def _save(key: str, slug: str, persona: str, prompt: str, text: str, model: str) -> Dict[str, Any]:
+    record = {
+        "slug": slug,
+        "persona": persona,
+        "model": model,
+        "promptHash": _sha256(prompt),
+        "explanation": text,
+        "createdAt": datetime.utcnow(),
+    }
+    try:
+        await async_db.collection(EXPLANATIONS_COLLECTION).document(key).set(record)
+    except Exception as e:
+        # Still worth answering; the next miss regenerates.
+        logger.error("Failed to store explanation %s: %s", key, e)
+    return dict(record, generated=True)
+
+
+async def _load(key: str, slug: str, persona: str, prompt: str) -> Dict[str, Any]:
+    record = await _stored(key)
+    if record is not None:
+        return record
+    text, model = await generate_explanation(prompt)
+    if model != PRIMARY_MODEL:
+        # Keys name the primary model; a fallback answer is served once, never stored.
+        return {"explanation": text, "model": model, "generated": True}
+    return await _save(key, slug, persona, prompt, text, model)
+
+
+async def get_explanation(project_data: Dict[str, Any], persona: str) -> Tuple[str, bool]:
+    """
+    Return (explanation, cached) for a project and persona. `cached` is False
+    only for the request whose miss triggered the generation. Identical
+    requests arriving while it runs (same slug, persona and project fields)
+    wait for that one upstream call instead of starting their own. Raises
+    ExplanationError when generation fails; failures and fallback-model
+    answers are never cached.
+    """
+    key, slug, persona, prompt = _resolve(project_data, persona)
+    triggered = False
+
+    async def load():
+        nonlocal triggered
+        triggered = True
+        return await _load(key, slug, persona, prompt)
+
+    entry_key = (EXPLANATIONS_COLLECTION, "doc", key)
+    record = await explanation_cache.get_or_load(entry_key, load)
+    if record.get("model") != PRIMARY_MODEL:
+        explanation_cache.discard(entry_key)
+    return record["explanation"], not (triggered and record["generated"])
+
+
+async def is_cached(project_data: Dict[str, Any], persona: str) -> bool:
+    """True if the current explanation is already in memory or Firestore."""
+    key = _resolve(project_data, persona)[0]
+    if explanation_cache.peek((EXPLANATIONS_COLLECTION, "doc", key)) is not None:
+        return True
+    return await _stored(key) is not None
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    for start in range(0, len(text), REPLAY_CHUNK_SIZE):
+        yield text[start:start + REPLAY_CHUNK_SIZE]
+
+
+async def open_stream(project_data: Dict[str, Any], persona: str) -> Tuple[bool, AsyncIterator[str]]:
+    """
+    Return (cached, chunks) for a streaming explanation. A cached explanation
+    is replayed from memory or Firestore; otherwise Gemini's chunks are
+    relayed as they arrive and the full text is cached once the stream
+    completes. A stream abandoned half way, or answered by the fallback
+    model, stores nothing.
+    """
+    key, slug, persona, prompt = _resolve(project_data, persona)
+    entry_key = (EXPLANATIONS_COLLECTION, "doc", key)
+    record = explanation_cache.peek(entry_key) or await _stored(key)
+    if record is not None:
+        explanation_cache.put(entry_key, record)
+        return True, _replay(record["explanation"])
+
+    async def relay():
+        upstream = generate_explanation_stream(prompt)
+        parts = []
+        model = PRIMARY_MODEL
+        try:
+            async for text, model in upstream:
+                parts.append(text)
+                yield text
+        finally:
+            await upstream.aclose()
+        if parts and model == PRIMARY_MODEL:
+            explanation_cache.put(entry_key, await _save(key, slug, persona, prompt, "".join(parts), model))
+
+    return False, relay()
@@ -0,0 +1,180 @@
+"""
+Facet index for browsing the vault and writings by category, tag and series.
+
+Every document gets a bit position per collection, and each facet value maps
+to an int bitset of the documents carrying it:
+
+    vault.tags["kafka"] = 0b1011  ->  documents at positions 0, 1 and 3
+
+Filtering is a bitwise AND/OR over those sets, and facet counts are popcounts
+of each value's set intersected with the current selection, so neither scans
+a document. Several values of a list facet (tags) must all match; several
+values of a single-valued facet (category, series) are alternatives.
+
+`facet_index` is built from Firestore at startup, updated by this instance's
+write handlers and rebuilt every `FACET_REBUILD_INTERVAL` seconds so writes
+made through other instances show up too.
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.firebase import async_db
+from app.services.background_index import BackgroundIndex
+
+# Facet fields per collection: "all" for list fields, "any" for single values.
+FACET_FIELDS = {
+    u'vault': {"category": "any", "tags": "all"},
+    u'writings': {"tags": "all", "series": "any"},
+}
+
+Filters = Dict[str, List[str]]
+
+
+def parse_filters(params: Dict[str, Optional[str]]) -> Filters:
+    """{"tags": "a,b", "category": None} -> {"tags": ["a", "b"]}"""
+    filters = {}
+    for field, raw in params.items():
+        values = [value.strip() for value in (raw or "").split(",") if value.strip()]
+        if values:
+            filters[field] = values
+    return filters
+
+
+def cache_key(filters: Filters) -> Tuple:
+    return tuple(sorted((field, tuple(sorted(values))) for field, values in filters.items()))
+
+
+def _values(data: Dict[str, Any], field: str) -> Tuple[str, ...]:
+    value = data.get(field)
+    if value is None or value == "":
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(dict.fromkeys(str(item) for item in value))
+    return (str(value),)
+
+
+class _Facets:
+    """Bitsets for one collection."""
+
+    def __init__(self, fields: Dict[str, str]):
+        self.fields = fields
+        self.positions: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.free: List[int] = []
+        self.everything = 0
+        self.bits: Dict[str, Dict[str, int]] = {field: {} for field in fields}
+        # What each document was indexed under, to clear its bits on update/delete.
+        self.indexed: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+
+    def add(self, doc_id: str, data: Dict[str, Any]):
+        self.remove(doc_id)
+        position = self.free.pop() if self.free else len(self.ids)
+        if position == len(self.ids):
+            self.ids.append(doc_id)
+        else:
+            self.ids[position] = doc_id
+        self.positions[doc_id] = position
+        bit = 1 << position
+        self.everything |= bit
+        values = {field: _values(data, field) for field in self.fields}
+        for field, field_values in values.items():
+            sets = self.bits[field]
+            for value in field_values:
+                sets[value] = sets.get(value, 0) | bit
+        self.indexed[doc_id] = values
+
+    def remove(self, doc_id: str):
+        position = self.positions.pop(doc_id, None)
+        if position is None:
+            return
+        mask = ~(1 << position)
+        self.everything &= mask
+        for field, field_values in self.indexed.pop(doc_id).items():
+            sets = self.bits[field]
+            for value in field_values:
+                remaining = sets[value] & mask
+                if remaining:
+                    sets[value] = remaining
+                else:
+                    del sets[value]
+        self.ids[position] = None
+        self.free.append(position)
+
+    def select(self, filters: Filters) -> int:
+        selection = self.everything
+        for field, values in filters.items():
+            sets = self.bits[field]
+            if self.fields[field] == "all":
+                for value in values:
+                    selection &= sets.get(value, 0)
+            else:
+                either = 0
+                for value in values:
+                    either |= sets.get(value, 0)
+                selection &= either
+        return selection
+
+    def ids_of(self, selection: int) -> List[str]:
+        ids = []
+        while selection:
+            low = selection & -selection
+            ids.append(self.ids[low.bit_length() - 1])
+            selection ^= low
+        return ids
+
+    def counts(self, selection: int) -> Dict[str, Dict[str, int]]:
+        counts = {}
+        for field, sets in self.bits.items():
+            field_counts = {value: (bits & selection).bit_count() for value, bits in sets.items()}
+            counts[field] = dict(sorted(
+                ((value, count) for value, count in field_counts.items() if count),
+                key=lambda item: (-item[1], item[0]),
+            ))
+        return counts
+
+
+class FacetIndex(BackgroundIndex):
+    name = "Facet index"
+
+    def _empty(self) -> Dict[str, _Facets]:
+        return {collection: _Facets(fields) for collection, fields in FACET_FIELDS.items()}
+
+    async def _scan(self, target: Dict[str, _Facets]):
+        for collection, fields in FACET_FIELDS.items():
+            async for doc in async_db.collection(collection).select(list(fields)).stream():
+                target[collection].add(doc.id, doc.to_dict())
+
+    def _add(self, target: Dict[str, _Facets], collection: str, doc_id: str, data: Dict[str, Any]):
+        target[collection].add(doc_id, data)
+
+    def _remove(self, target: Dict[str, _Facets], collection: str, doc_id: str):
+        target[collection].remove(doc_id)
+
+    def _size(self, target: Dict[str, _Facets]) -> int:
+        return sum(len(facets.positions) for facets in target.values())
+
+    async def select(self, collection: str, filters: Filters) -> List[str]:
+        """Ids of the documents matching every filter."""
+        await self._wait_ready()
+        facets = self._current[collection]
+        return facets.ids_of(facets.select(filters))
+
+    async def summary(self, collection: str, filters: Filters) -> Dict[str, Any]:
+        """Match count plus, per facet, how many matching documents carry each value."""
+        await self._wait_ready()
+        facets = self._current[collection]
+        selection = facets.select(filters)
+        return {"total": selection.bit_count(), "facets": facets.counts(selection)}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            super().stats(),
+            documents={collection: len(facets.positions) for collection, facets in self._current.items()},
+            values={
+                collection: {field: len(sets) for field, sets in facets.bits.items()}
+                for collection, facets in self._current.items()
+            },
+        )
+
+
+facet_index = FacetIndex(rebuild_interval=float(os.getenv("FACET_REBUILD_INTERVAL", "600")))
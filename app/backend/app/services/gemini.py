@@ -1,21 +1,44 @@
 from google import genai
+import asyncio
+import logging
 import os
+import time
+from typing import AsyncIterator, Tuple
 from dotenv import load_dotenv
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Per model call; the long-form personas can take a while to finish.
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+
+_client = None
 
 def get_gemini_client():
+    # One client (and its connection pool) for the whole process.
+    global _client
     if not GEMINI_API_KEY:
         return None
-    return genai.Client(api_key=GEMINI_API_KEY)
+    if _client is None:
+        _client = genai.Client(api_key=GEMINI_API_KEY)
+    return _client
 
-def generate_project_explanation(project_data: dict, persona: str) -> str:
-    client = get_gemini_client()
-    if not client:
-        return "Gemini API Key is missing. Please configure it in the backend."
+PRIMARY_MODEL = 'gemini-2.0-flash'
+FALLBACK_MODEL = 'gemini-1.5-flash'
+PERSONAS = ("recruiter", "engineer", "architect")
 
+class ExplanationError(Exception):
+    """Generation failed; the message is safe to show to the visitor."""
+
+def normalize_persona(persona: str) -> str:
+    # Unknown personas get the recruiter prompt.
+    return persona if persona in PERSONAS else "recruiter"
+
+def build_prompt(project_data: dict, persona: str) -> str:
     prompts = {
         "recruiter": f"""
         You are an expert Technical Recruiter. Explain the following project in a way that highlights its business value and technical complexity in under 30 seconds (maximum 100 words).
@@ -53,23 +76,159 @@ def generate_project_explanation(project_data: dict, persona: str) -> str:
         """
     }
 
-    prompt = prompts.get(persona, prompts["recruiter"])
-    
-    # Try gemini-2.0-flash first
+    return prompts[normalize_persona(persona)]
+
+MODELS = (PRIMARY_MODEL, FALLBACK_MODEL)
+# Seconds to wait on the primary before also asking the fallback (first
+# answer wins); 0 disables hedging.
+GEMINI_HEDGE_AFTER = float(os.getenv("GEMINI_HEDGE_AFTER", "0"))
+
+breakers = {
+    model: CircuitBreaker(
+        window=int(os.getenv("GEMINI_BREAKER_WINDOW", "20")),
+        min_calls=int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5")),
+        failure_rate=float(os.getenv("GEMINI_BREAKER_FAILURE_RATE", "0.5")),
+        cooldown=float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30")),
+    )
+    for model in MODELS
+}
+# Latency of successful generate_content calls, per model.
+latencies = {model: LatencyHistogram() for model in MODELS}
+
+def model_stats():
+    return {model: {"breaker": breakers[model].snapshot(), "latency": latencies[model].snapshot()} for model in MODELS}
+
+async def _generate(client, model: str, prompt: str) -> str:
+    """One timed call; the caller must have been let through by breakers[model].allow()."""
+    started = time.monotonic()
     try:
-        response = client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=prompt
+        response = await asyncio.wait_for(
+            client.aio.models.generate_content(model=model, contents=prompt),
+            timeout=GEMINI_TIMEOUT,
         )
-        return response.text
-    except Exception as e:
-        print(f"Gemini 2.0 Flash failed: {e}. Falling back to 1.5 Flash.")
-        # Fallback to gemini-1.5-flash
+    except asyncio.CancelledError:
+        breakers[model].record_cancelled()
+        raise
+    except asyncio.TimeoutError:
+        breakers[model].record_failure()
+        raise TimeoutError(f"{model} did not answer within {GEMINI_TIMEOUT:g}s")
+    except Exception:
+        breakers[model].record_failure()
+        raise
+    breakers[model].record_success()
+    latencies[model].observe(time.monotonic() - started)
+    return response.text
+
+async def _hedged(client, prompt: str) -> Tuple[str, str]:
+    """
+    Run the primary; if it has not answered after GEMINI_HEDGE_AFTER seconds,
+    start the fallback as well and return whichever succeeds first. A primary
+    failure before the hedge fires is raised so the caller falls back as usual.
+    """
+    primary = asyncio.ensure_future(_generate(client, PRIMARY_MODEL, prompt))
+    tasks = {primary: PRIMARY_MODEL}
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=GEMINI_HEDGE_AFTER)
+        if done or not breakers[FALLBACK_MODEL].allow():
+            return await primary, PRIMARY_MODEL
+        tasks[asyncio.ensure_future(_generate(client, FALLBACK_MODEL, prompt))] = FALLBACK_MODEL
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), tasks[task]
+                error = task.exception()
+        raise ExplanationError(f"Error generating explanation (hedged): {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def generate_explanation(prompt: str) -> Tuple[str, str]:
+    """
+    Generate text for `prompt`, falling back to the older model once.
+    Models whose circuit breaker is open are skipped without a call.
+    Returns (text, model) and raises ExplanationError instead of returning
+    an error message, so callers can tell results from failures.
+    """
+    client = get_gemini_client()
+    if not client:
+        raise ExplanationError("Gemini API Key is missing. Please configure it in the backend.")
+
+    # Try gemini-2.0-flash first
+    if breakers[PRIMARY_MODEL].allow():
         try:
-            response = client.models.generate_content(
-                model='gemini-1.5-flash',
-                contents=prompt
+            if GEMINI_HEDGE_AFTER > 0:
+                return await _hedged(client, prompt)
+            return await _generate(client, PRIMARY_MODEL, prompt), PRIMARY_MODEL
+        except ExplanationError:
+            raise
+        except Exception as e:
+            last_error = e
+            logger.warning("Gemini 2.0 Flash failed: %s. Falling back to 1.5 Flash.", e)
+    else:
+        last_error = f"{PRIMARY_MODEL} circuit is open"
+
+    # Fallback to gemini-1.5-flash
+    if not breakers[FALLBACK_MODEL].allow():
+        raise ExplanationError(f"Error generating explanation (after fallback): {last_error}; {FALLBACK_MODEL} circuit is open")
+    try:
+        return await _generate(client, FALLBACK_MODEL, prompt), FALLBACK_MODEL
+    except Exception as e2:
+         raise ExplanationError(f"Error generating explanation (after fallback): {str(e2)}")
+
+async def generate_explanation_stream(prompt: str) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Stream (text, model) chunks for `prompt`. The fallback model is only
+    tried if the primary fails before its first chunk; once text has been
+    sent a failure ends the stream with ExplanationError. Closing the
+    generator closes the upstream stream.
+    """
+    client = get_gemini_client()
+    if not client:
+        raise ExplanationError("Gemini API Key is missing. Please configure it in the backend.")
+
+    last_error = None
+    for model in MODELS:
+        if not breakers[model].allow():
+            last_error = f"{model} circuit is open"
+            continue
+        stream = None
+        try:
+            stream = await asyncio.wait_for(
+                client.aio.models.generate_content_stream(model=model, contents=prompt),
+                timeout=GEMINI_TIMEOUT,
             )
-            return response.text
-        except Exception as e2:
-             return f"Error generating explanation (after fallback): {str(e2)}"
+            first = await asyncio.wait_for(stream.__anext__(), timeout=GEMINI_TIMEOUT)
+            breakers[model].record_success()
+            break
+        except StopAsyncIteration:
+            breakers[model].record_success()
+            return
+        except asyncio.CancelledError:
+            breakers[model].record_cancelled()
+            raise
+        except Exception as e:
+            breakers[model].record_failure()
+            last_error = e if not isinstance(e, asyncio.TimeoutError) else f"{model} did not answer within {GEMINI_TIMEOUT:g}s"
+            logger.warning("Gemini stream from %s failed: %s", model, last_error)
+            if stream is not None:
+                await stream.aclose()
+    else:
+        raise ExplanationError(f"Error generating explanation (after fallback): {last_error}")
+
+    try:
+        if first.text:
+            yield first.text, model
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=GEMINI_TIMEOUT)
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                raise ExplanationError(f"Explanation stream interrupted: {e or type(e).__name__}")
+            if chunk.text:
+                yield chunk.text, model
+    finally:
+        await stream.aclose()
@@ -0,0 +1,96 @@
+"""
+Group commit for contact messages.
+
+`create_message` hands the message to `message_buffer.submit` and waits for
+it to be committed before answering. Messages that arrive within `window`
+seconds of each other share one WriteBatch (each message together with its
+email outbox entry); a batch is committed early once `max_batch` messages are
+waiting. A failed commit fails every request in that batch, so nothing is
+acknowledged that is not in Firestore and nothing is kept in memory to retry.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.background import BackgroundTasks
+from app.core.batching import MAX_BATCH_WRITES
+from app.core.firebase import async_db
+from app.services import email_outbox
+
+logger = logging.getLogger(__name__)
+
+# Each message is two writes (message + outbox entry).
+MAX_BATCH_MESSAGES = MAX_BATCH_WRITES // 2
+
+Email = Tuple[str, List[str], str]
+_Pending = Tuple[Dict[str, Any], Optional[Email], asyncio.Future]
+
+
+class MessageIngestBuffer:
+    def __init__(self, window: float = 0.01, max_batch: int = MAX_BATCH_MESSAGES):
+        self.window = window
+        self.max_batch = min(max_batch, MAX_BATCH_MESSAGES)
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._background = BackgroundTasks()
+        self._counters = {"accepted": 0, "written": 0, "batches": 0, "failed": 0}
+
+    async def submit(self, message: Dict[str, Any], email: Optional[Email] = None):
+        """Commit `message` (and its notification as (subject, recipients, body)); raises if the commit fails."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message, email, future))
+        self._counters["accepted"] += 1
+        if len(self._pending) >= self.max_batch:
+            self._background.spawn(self.flush())
+        elif self._timer is None:
+            self._timer = self._background.spawn(self._flush_after_window())
+        # A client that disconnects must not cancel the commit of the others' batch.
+        await asyncio.shield(future)
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Commit everything waiting now, in batches of at most `max_batch` messages."""
+        while self._pending:
+            chunk, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            batch = async_db.batch()
+            for message, email, _ in chunk:
+                batch.set(async_db.collection(u'messages').document(message['id']), message)
+                if email is not None:
+                    email_outbox.stage(batch, *email)
+            try:
+                await batch.commit()
+            except Exception as e:
+                logger.error("Failed to write a batch of %d messages: %s", len(chunk), e)
+                self._counters["failed"] += len(chunk)
+                for _, _, future in chunk:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._counters["written"] += len(chunk)
+            self._counters["batches"] += 1
+            for _, _, future in chunk:
+                if not future.done():
+                    future.set_result(None)
+            email_outbox.email_outbox.notify()
+
+    async def close(self):
+        """Commit whatever is still waiting for its window."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+        await self._background.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, waiting=len(self._pending), window=self.window)
+
+
+message_buffer = MessageIngestBuffer(
+    window=float(os.getenv("MESSAGE_BATCH_WINDOW", "0.01")),
+    max_batch=int(os.getenv("MESSAGE_BATCH_MAX", str(MAX_BATCH_MESSAGES))),
+)
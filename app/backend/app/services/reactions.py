@@ -0,0 +1,162 @@
+"""
+Like/dislike counters for Arena threads.
+
+Clicks are aggregated in memory and flushed as atomic `Increment` writes, one
+WriteBatch per flush, either every `flush_interval` seconds or as soon as
+`flush_threshold` clicks are pending. With `shards` > 0 increments land on a
+random `arena/{id}/counter_shards/{n}` document instead of the thread itself,
+so a hot thread is not limited by Firestore's per-document write rate; reads
+add the shard totals to the thread's own counters.
+"""
+import asyncio
+import logging
+import os
+import random
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from google.api_core import exceptions
+from google.cloud import firestore
+
+from app.core.background import BackgroundTasks
+from app.core.batching import MAX_BATCH_WRITES
+from app.core.cache import read_cache
+from app.core.firebase import async_db
+
+logger = logging.getLogger(__name__)
+
+REACTION_FIELDS = (u'likes', u'dislikes')
+SHARD_COLLECTION = u'counter_shards'
+
+
+def _thread_ref(thread_id: str):
+    return async_db.collection(u'arena').document(thread_id)
+
+
+class ReactionBuffer:
+    def __init__(self, flush_interval: float = 1.0, flush_threshold: int = 100, shards: int = 0):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.shards = shards
+        self._pending: Dict[str, Counter] = defaultdict(Counter)
+        self._pending_total = 0
+        self._flush_lock = asyncio.Lock()
+        self._loop = BackgroundTasks()
+        self._background = BackgroundTasks()
+
+    def add(self, thread_id: str, field: str, amount: int = 1):
+        self._pending[thread_id][field] += amount
+        self._pending_total += amount
+        if self._pending_total >= self.flush_threshold:
+            self._background.spawn(self.flush())
+
+    def pending(self, thread_id: str, field: str) -> int:
+        return self._pending.get(thread_id, Counter())[field]
+
+    async def flush(self):
+        async with self._flush_lock:
+            pending, self._pending, self._pending_total = self._pending, defaultdict(Counter), 0
+            if not pending:
+                return
+            try:
+                await self._write(pending)
+            except Exception as e:
+                # Keep the clicks for the next flush rather than dropping them.
+                logger.error("Failed to flush arena reactions: %s", e)
+                for thread_id, counts in pending.items():
+                    self._pending[thread_id].update(counts)
+                    self._pending_total += sum(counts.values())
+                return
+            for thread_id in pending:
+                read_cache.invalidate(u'arena', thread_id)
+
+    async def _write(self, pending: Dict[str, Counter]):
+        items = list(pending.items())
+        for start in range(0, len(items), MAX_BATCH_WRITES):
+            chunk = items[start:start + MAX_BATCH_WRITES]
+            batch = async_db.batch()
+            for thread_id, counts in chunk:
+                self._stage(batch, thread_id, counts)
+            try:
+                await batch.commit()
+            except exceptions.NotFound:
+                # A thread was deleted since the click; apply the rest one by one.
+                for thread_id, counts in chunk:
+                    single = async_db.batch()
+                    self._stage(single, thread_id, counts)
+                    try:
+                        await single.commit()
+                    except exceptions.NotFound:
+                        logger.warning("Dropping reactions for deleted thread %s", thread_id)
+
+    def _stage(self, batch, thread_id: str, counts: Counter):
+        increments = {field: firestore.Increment(amount) for field, amount in counts.items() if amount}
+        if self.shards:
+            shard = _thread_ref(thread_id).collection(SHARD_COLLECTION).document(str(random.randrange(self.shards)))
+            batch.set(shard, increments, merge=True)
+        else:
+            batch.update(_thread_ref(thread_id), increments)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if not self._loop:
+            self._loop.spawn(self._run())
+
+    async def close(self):
+        """Stop the periodic flusher and write out everything still pending."""
+        await self._loop.stop()
+        await self._background.wait()
+        await self.flush()
+
+
+async def shard_totals(thread_id: Optional[str] = None) -> Dict[str, Counter]:
+    """Sum counter shards per thread (all threads with one collection-group query)."""
+    totals: Dict[str, Counter] = defaultdict(Counter)
+    if not reaction_buffer.shards:
+        return totals
+    if thread_id is not None:
+        shards = _thread_ref(thread_id).collection(SHARD_COLLECTION).stream()
+    else:
+        shards = async_db.collection_group(SHARD_COLLECTION).stream()
+    async for shard in shards:
+        parent_id = shard.reference.parent.parent.id
+        data = shard.to_dict()
+        for field in REACTION_FIELDS:
+            totals[parent_id][field] += data.get(field, 0)
+    return totals
+
+
+def apply_totals(threads: Iterable[dict], totals: Dict[str, Counter], fields: Optional[List[str]] = None) -> List[dict]:
+    """Add shard totals to each thread's counters (only the projected ones, if `fields` is given)."""
+    counted = [field for field in REACTION_FIELDS if fields is None or field in fields]
+    threads = list(threads)
+    for thread in threads:
+        extra = totals.get(thread.get('id'))
+        if extra:
+            for field in counted:
+                thread[field] = (thread.get(field) or 0) + extra[field]
+    return threads
+
+
+async def shard_refs(thread_id: str) -> list:
+    """A thread's counter shard documents (none while sharding is off)."""
+    if not reaction_buffer.shards:
+        return []
+    return [shard.reference async for shard in _thread_ref(thread_id).collection(SHARD_COLLECTION).stream()]
+
+
+async def delete_shards(batch, thread_id: str):
+    """Stage deletion of a thread's counter shards."""
+    for ref in await shard_refs(thread_id):
+        batch.delete(ref)
+
+
+reaction_buffer = ReactionBuffer(
+    flush_interval=float(os.getenv("ARENA_REACTION_FLUSH_INTERVAL", "1.0")),
+    flush_threshold=int(os.getenv("ARENA_REACTION_FLUSH_THRESHOLD", "100")),
+    shards=int(os.getenv("ARENA_COUNTER_SHARDS", "0")),
+)
@@ -0,0 +1,64 @@
+"""
+Full-text search over projects, writings and the vault.
+
+`search_index` is built from Firestore at startup and kept current by the
+create/update/delete handlers of this instance. Other instances pick up those
+writes on the next periodic rebuild (`SEARCH_REBUILD_INTERVAL` seconds).
+"""
+import asyncio
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.firebase import async_db
+from app.core.text_index import InvertedIndex
+from app.services.background_index import BackgroundIndex
+
+# Indexed fields and their weight per collection.
+SEARCH_FIELDS = {
+    u'projects': {"title": 2.0, "oneLiner": 1.5, "overview": 1.0},
+    u'writings': {"title": 2.0, "excerpt": 1.5, "content": 1.0},
+    u'vault': {"title": 2.0, "tags": 1.5, "content": 1.0},
+}
+YIELD_EVERY = 100
+
+
+class SearchIndex(BackgroundIndex):
+    """The Firestore-backed index served by /api/v1/search."""
+
+    name = "Search index"
+
+    @property
+    def index(self) -> InvertedIndex:
+        return self._current
+
+    def _empty(self) -> InvertedIndex:
+        return InvertedIndex(SEARCH_FIELDS)
+
+    async def _scan(self, target: InvertedIndex):
+        indexed = 0
+        for collection in SEARCH_FIELDS:
+            async for doc in async_db.collection(collection).stream():
+                target.add(collection, doc.id, doc.to_dict())
+                indexed += 1
+                if indexed % YIELD_EVERY == 0:
+                    # Indexing is CPU work; let requests through between slices.
+                    await asyncio.sleep(0)
+
+    def _add(self, target: InvertedIndex, collection: str, doc_id: str, data: Dict[str, Any]):
+        target.add(collection, doc_id, data)
+
+    def _remove(self, target: InvertedIndex, collection: str, doc_id: str):
+        target.remove(collection, doc_id)
+
+    def _size(self, target: InvertedIndex) -> int:
+        return len(target)
+
+    async def search(self, query: str, collections: Optional[Iterable[str]] = None, limit: int = 20):
+        await self._wait_ready()
+        return self.index.search(query, collections, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), documents=len(self.index), terms=self.index.term_count)
+
+
+search_index = SearchIndex(rebuild_interval=float(os.getenv("SEARCH_REBUILD_INTERVAL", "600")))
@@ -0,0 +1,120 @@
+"""
+Slug -> document id index for collections addressed by slug.
+
+Each slug owns one document in `{collection}_slugs/{slug}` holding the id of
+the content document, so resolving a slug is a direct key fetch rather than a
+`where('slug', '==', ...)` query. Reserving the slug document inside the same
+transaction as the content write is what makes slugs unique.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+
+from app.core.batching import MAX_BATCH_WRITES
+from app.core.firebase import async_db
+
+logger = logging.getLogger(__name__)
+
+SLUG_COLLECTIONS = (u'projects', u'writings')
+
+
+def slug_ref(collection: str, slug: str):
+    return async_db.collection(f"{collection}_slugs").document(slug)
+
+
+def is_valid(slug: str) -> bool:
+    # Slugs become document ids, which cannot contain '/' or be '.' / '..'; a leading '_'
+    # is reserved for routes such as /writings/_facets (and covers Firestore's '__').
+    return bool(slug) and "/" not in slug and slug not in (".", "..") and not slug.startswith("_")
+
+
+def validate(slug: str):
+    if not is_valid(slug):
+        raise HTTPException(status_code=400, detail=f"Invalid slug '{slug}'")
+
+
+async def resolve(collection: str, slug: str) -> Optional[str]:
+    """Return the id of the document owning `slug`, or None."""
+    if is_valid(slug):
+        entry = await slug_ref(collection, slug).get()
+        if entry.exists:
+            return entry.to_dict().get(u'id')
+    # Documents written before the index was backfilled.
+    async for doc in async_db.collection(collection).where(u'slug', u'==', slug).limit(1).stream():
+        return doc.id
+    return None
+
+
+async def owner(transaction, collection: str, slug: str) -> Optional[str]:
+    """
+    Read, within `transaction`, the id of the document currently owning `slug`.
+    This is the read half of a claim and must complete before any write is
+    staged on the transaction (Firestore requires reads first).
+    """
+    entry = await slug_ref(collection, slug).get(transaction=transaction)
+    if entry.exists:
+        return entry.to_dict().get(u'id')
+    # Not indexed yet: fall back to the collection itself.
+    query = async_db.collection(collection).where(u'slug', u'==', slug).limit(1)
+    async for doc in query.stream(transaction=transaction):
+        return doc.id
+    return None
+
+
+async def owners(collection: str, slugs: Iterable[str]) -> Dict[str, str]:
+    """Owners of several indexed slugs in one read (outside a transaction; for bulk imports)."""
+    refs = [slug_ref(collection, slug) for slug in set(slugs) if is_valid(slug)]
+    if not refs:
+        return {}
+    return {entry.id: entry.to_dict().get(u'id') async for entry in async_db.get_all(refs) if entry.exists}
+
+
+def stage_claim(
+    transaction,
+    collection: str,
+    slug: str,
+    doc_id: str,
+    current_owner: Optional[str],
+    previous_slug: Optional[str] = None,
+):
+    """
+    Point `slug` at `doc_id` and release `previous_slug` within `transaction`.
+    Raises 409 if `current_owner` (from `owner`) is another document.
+    """
+    if current_owner is not None and current_owner != doc_id:
+        raise HTTPException(status_code=409, detail=f"Slug '{slug}' is already in use")
+    transaction.set(slug_ref(collection, slug), {u'id': doc_id})
+    if previous_slug and previous_slug != slug:
+        transaction.delete(slug_ref(collection, previous_slug))
+
+
+def stage_release(transaction, collection: str, slug: Optional[str]):
+    if slug:
+        transaction.delete(slug_ref(collection, slug))
+
+
+async def backfill(collection: str) -> Dict[str, int]:
+    """Create index entries for every existing document. Reports duplicate slugs."""
+    owners: Dict[str, str] = {}
+    duplicates = 0
+    batch = async_db.batch()
+    pending = 0
+    async for doc in async_db.collection(collection).stream():
+        slug = doc.to_dict().get(u'slug')
+        if not slug:
+            continue
+        if slug in owners:
+            duplicates += 1
+            logger.warning("Duplicate slug '%s' in %s: %s and %s; keeping %s", slug, collection, owners[slug], doc.id, owners[slug])
+            continue
+        owners[slug] = doc.id
+        batch.set(slug_ref(collection, slug), {u'id': doc.id})
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            await batch.commit()
+            batch = async_db.batch()
+            pending = 0
+    if pending:
+        await batch.commit()
+    return {"indexed": len(owners), "duplicates": duplicates}
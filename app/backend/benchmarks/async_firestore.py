@@ -0,0 +1,97 @@
+"""
+Before/after concurrency benchmark for the async Firestore data path.
+
+Models one Firestore round trip per request with a fixed latency and compares:
+
+  sync      `def` handler doing a blocking call (the old routers; runs in
+            Starlette's threadpool, 40 threads by default)
+  loop      `async def` handler doing a blocking call on the event loop
+            (the old messages.create_message)
+  async     `async def` handler awaiting a non-blocking call (the new routers)
+
+Runs in-process through httpx's ASGI transport, so no server or network is needed.
+
+Usage:
+    python benchmarks/async_firestore.py [--latency 0.05] [--requests 400] [--json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_handler():
+        time.sleep(latency)
+        return {"ok": True}
+
+    @app.get("/loop")
+    async def loop_handler():
+        time.sleep(latency)
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_handler():
+        await asyncio.sleep(latency)
+        return {"ok": True}
+
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def main(args):
+    app = build_app(args.latency)
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in args.concurrency:
+            for path in ("/sync", "/loop", "/async"):
+                results.append(await drive(client, path, args.requests, concurrency))
+
+    if args.json:
+        print(json.dumps({"latency_s": args.latency, "results": results}, indent=2))
+        return
+    print(f"Simulated Firestore latency: {args.latency * 1000:.0f} ms per call")
+    print(f"{'handler':<8} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for row in results:
+        print(f"{row['path'][1:]:<8} {row['concurrency']:>5} {row['throughput_rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per simulated Firestore call")
+    parser.add_argument("--requests", type=int, default=400, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""
+Bytes on the wire and CPU per request for a large list response.
+
+Builds a writings list like GET /api/v1/writings/ (markdown bodies of a few
+KB each) and measures, per request:
+
+  stock json     jsonable_encoder + json.dumps, identity (the old JSONResponse path)
+  orjson         jsonable_encoder + orjson.dumps, identity (ORJSONResponse)
+  cached         a CachedContent body (serialized once), identity
+  gzip           compressing that body on every request (the middleware path)
+  gzip cached    the compressed body kept on the cache entry
+  br, br cached  the same with brotli, when the package is installed
+
+CPU is process time, so it reflects work done rather than scheduling noise.
+
+Usage:
+    python benchmarks/compression.py [--items 50] [--words 900] [--requests 200] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core import compression  # noqa: E402
+from app.core.http_cache import render  # noqa: E402
+from app.models.content import Writing  # noqa: E402
+
+WORDS = (
+    "kafka partition consumer offset replica broker latency throughput cache shard index query "
+    "request response handler batch commit transaction schema migration deploy container service "
+    "the a of to in and is for with on that this it as be by"
+).split()
+
+
+def make_writings(rng: random.Random, count: int, words: int):
+    start = datetime(2023, 1, 1)
+    writings = []
+    for i in range(count):
+        paragraphs = []
+        remaining = words
+        while remaining > 0:
+            size = min(remaining, rng.randint(40, 120))
+            paragraphs.append(" ".join(rng.choice(WORDS) for _ in range(size)).capitalize() + ".")
+            remaining -= size
+        content = "\n\n".join(f"## Section {n}\n\n{p}" if n % 3 == 0 else p for n, p in enumerate(paragraphs))
+        writings.append({
+            "id": f"writing-{i}",
+            "title": f"Notes on {rng.choice(WORDS)} {rng.choice(WORDS)}",
+            "slug": f"notes-{i}",
+            "thumbnail": f"https://example.com/{i}.png",
+            "excerpt": " ".join(rng.choice(WORDS) for _ in range(30)),
+            "content": content,
+            "readingTime": words // 200,
+            "tags": rng.sample(WORDS[:20], 3),
+            "series": None,
+            "canonicalUrl": None,
+            "publishedAt": (start + timedelta(days=i)).isoformat(),
+        })
+    return writings
+
+
+def measure(fn, requests: int):
+    fn()  # warm up (and fill any cache)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    size = 0
+    for _ in range(requests):
+        size = len(fn())
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    return {
+        "bytes": size,
+        "cpu_us_per_request": round(cpu / requests * 1e6, 1),
+        "wall_us_per_request": round(wall / requests * 1e6, 1),
+    }
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    writings = make_writings(rng, args.items, args.words)
+    adapter = TypeAdapter(List[Writing])
+    models = adapter.validate_python(writings)
+    content = render(writings, adapter)
+
+    scenarios = {
+        "stock json": lambda: json.dumps(jsonable_encoder(models)).encode("utf-8"),
+        "orjson": lambda: orjson.dumps(jsonable_encoder(models)),
+        "cached": lambda: content.body,
+    }
+    for encoding in compression.supported_encodings():
+        name = "gzip" if encoding == "gzip" else "br"
+        scenarios[name] = lambda encoding=encoding: compression.compress(content.body, encoding)
+        scenarios[f"{name} cached"] = lambda encoding=encoding: content.encoded(encoding)
+    results = {name: measure(fn, args.requests) for name, fn in scenarios.items()}
+
+    if args.json:
+        print(json.dumps({"items": args.items, "words": args.words, "results": results}, indent=2))
+        return
+    if compression.brotli is None:
+        print("brotli not installed; br scenarios skipped")
+    print(f"{args.items} writings of ~{args.words} words")
+    print(f"{'scenario':<12} {'bytes':>10} {'cpu us/req':>11} {'wall us/req':>12}")
+    for name, row in results.items():
+        print(f"{name:<12} {row['bytes']:>10} {row['cpu_us_per_request']:>11} {row['wall_us_per_request']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="writings in the list")
+    parser.add_argument("--words", type=int, default=900, help="words per writing body")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    main(parser.parse_args())
@@ -0,0 +1,487 @@
+"""
+Throughput and latency of every API endpoint, offline and reproducible.
+
+Runs the real `main:app` in-process (httpx over ASGI, no sockets) against
+`fake_firestore`, an in-memory stand-in for `app.core.firebase`, with Gemini
+and Formspree stubbed out, so it needs no credentials and no network. Each
+Firestore call, Gemini call and Formspree post waits a configurable latency,
+so the numbers show how well the app overlaps I/O rather than how fast the
+fake is. Admin auth is overridden and the rate limits are lifted.
+
+The store is seeded through the bulk import endpoint (so card, slug, search
+and facet indexes are built the way the app builds them) and explanations
+are pre-generated, as they are in production after a project is saved.
+Then each scenario (one endpoint, see --list) is run at every concurrency
+level: a short warm-up, then --requests requests from that many concurrent
+clients. Reads run before writes. After each run the email outbox, reaction
+buffer and pre-generation queue are drained, so a write's deferred work is
+counted against the run that caused it and does not leak into the next one.
+
+Per scenario and level it reports throughput, p50/p95/p99/max latency, the
+status codes seen, and Firestore calls, document reads and document writes
+per request. Seed data and request order depend only on --seed: with --json,
+the output of two commits can be diffed directly. Timings vary from run to
+run; the status codes and per-request Firestore counts should not.
+
+Usage:
+    python benchmarks/load.py [--concurrency 1,10,50] [--requests 200]
+        [--firestore-latency 0.005] [--gemini-latency 0.4] [--email-latency 0.1]
+        [--only 'projects.*,arena.like'] [--list] [--json]
+"""
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+
+import fake_firestore  # noqa: E402
+
+WORDS = (
+    "kafka partition consumer offset replica broker latency throughput cache shard index query "
+    "request response handler batch commit transaction schema migration deploy container service"
+).split()
+CATEGORIES = ["databases", "queues", "observability", "networking", "storage"]
+SERIES = [None, "scaling", "reliability"]
+
+Value = Union[None, str, bytes, Dict[str, Any], Callable[[int], Any]]
+
+
+class StubGemini:
+    """Stands in for `genai.Client`: `client.aio.models.generate_content[_stream]`."""
+
+    def __init__(self, latency: float, chunks: int = 8):
+        self.latency = latency
+        self.chunks = chunks
+        self.calls = 0
+        self.aio = SimpleNamespace(models=self)
+
+    @staticmethod
+    def _text(prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return " ".join(WORDS[byte % len(WORDS)] for byte in digest * 12)
+
+    async def generate_content(self, model: str, contents: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=self._text(contents))
+
+    async def generate_content_stream(self, model: str, contents: str):
+        self.calls += 1
+        text = self._text(contents)
+        size = -(-len(text) // self.chunks)
+        latency = self.latency
+
+        async def stream():
+            for start in range(0, len(text), size):
+                await asyncio.sleep(latency / self.chunks)
+                yield SimpleNamespace(text=text[start:start + size])
+
+        return stream()
+
+
+class StubFormspree:
+    """An httpx transport answering every Formspree post with 200 after `latency`."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.posts = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.posts += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={"ok": True})
+
+
+class Scenario:
+    """
+    One endpoint. `path` and `body` are values or functions of a sequence
+    number that is unique across every request of the run; `prepare` runs
+    before the scenario with the number of requests it is about to make.
+    """
+
+    def __init__(self, name: str, method: str, path: Value, body: Value = None,
+                 headers: Optional[Dict[str, str]] = None, prepare: Optional[Callable[[int], Awaitable[None]]] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+        self.prepare = prepare
+        self.writes = method != "GET"
+
+    def request(self, seq: int) -> Dict[str, Any]:
+        path = self.path(seq) if callable(self.path) else self.path
+        body = self.body(seq) if callable(self.body) else self.body
+        request = {"method": self.method, "url": path, "headers": self.headers}
+        if isinstance(body, (str, bytes)):
+            request["content"] = body
+        elif body is not None:
+            request["json"] = body
+        return request
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_project(rng: random.Random, n: int) -> Dict[str, Any]:
+    return {
+        "title": f"Project {text(rng, 2)}", "slug": f"project-{n}", "thumbnail": f"https://example.com/p/{n}.png",
+        "oneLiner": text(rng, 12), "techStack": rng.sample(WORDS, 4), "featured": n % 5 == 0,
+        "overview": text(rng, 200), "hld": text(rng, 150), "lld": text(rng, 150),
+        "architectureDecisions": text(rng, 100), "failurePoints": text(rng, 80),
+    }
+
+
+def make_writing(rng: random.Random, n: int) -> Dict[str, Any]:
+    return {
+        "title": f"Notes on {text(rng, 2)}", "slug": f"writing-{n}", "thumbnail": f"https://example.com/w/{n}.png",
+        "excerpt": text(rng, 30), "content": text(rng, 900), "readingTime": 5, "tags": rng.sample(WORDS[:8], 3),
+        "series": SERIES[n % len(SERIES)], "publishedAt": (datetime(2023, 1, 1) + timedelta(days=n)).isoformat(),
+    }
+
+
+def make_system(rng: random.Random, n: int) -> Dict[str, Any]:
+    return {
+        "name": f"System {n}", "category": CATEGORIES[n % len(CATEGORIES)], "logo": f"https://example.com/s/{n}.svg",
+        "usage": text(rng, 40), "whyChosen": text(rng, 40), "whereItBreaks": text(rng, 40),
+    }
+
+
+def make_vault(rng: random.Random, n: int) -> Dict[str, Any]:
+    return {
+        "title": f"Vault {text(rng, 3)} {n}", "category": CATEGORIES[n % len(CATEGORIES)],
+        "tags": rng.sample(WORDS[:8], 2), "content": text(rng, 300),
+    }
+
+
+def make_thread(rng: random.Random, n: int, comments: int = 0) -> Dict[str, Any]:
+    thread = {
+        "title": f"Debate {text(rng, 3)}", "content": text(rng, 120),
+        "publishedAt": (datetime(2024, 1, 1) + timedelta(hours=n)).isoformat(),
+    }
+    if comments:
+        thread["responses"] = [{"content": text(rng, 25), "author": f"reader-{c}"} for c in range(comments)]
+    return thread
+
+
+MAKERS = {
+    "projects": make_project, "writings": make_writing, "systems": make_system,
+    "vault": make_vault, "arena": make_thread,
+}
+
+
+class Harness:
+    """The app, its stubs and the seeded data shared by the scenarios."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        os.environ["GEMINI_API_KEY"] = "benchmark"
+        os.environ["FORMSPREE_ENDPOINT"] = "https://formspree.invalid/f/benchmark"
+        # Explanations are pre-generated while seeding; don't throttle that.
+        os.environ["EXPLAIN_PREGEN_RATE_PER_MINUTE"] = "0"
+        self.store = fake_firestore.install(seed=args.seed)
+
+        from main import app, lifespan
+        from app.core.auth_cache import signing_keys
+        from app.core.email import email_service
+        from app.core.limiter import limiter
+        from app.dependencies import get_current_user
+        from app.services import gemini
+
+        self.app = app
+        self.lifespan = lifespan
+        self.gemini = StubGemini(args.gemini_latency)
+        gemini._client = self.gemini
+        self.formspree = StubFormspree(args.email_latency)
+        email_service._client = httpx.AsyncClient(transport=httpx.MockTransport(self.formspree))
+        app.dependency_overrides[get_current_user] = lambda: {"uid": "benchmark"}
+        signing_keys.prefetch = lambda: None
+        limiter.limits = {name: (10 ** 9, period) for name, (_, period) in limiter.limits.items()}
+
+        self.seq = itertools.count()
+        self.ids: Dict[str, List[str]] = {}
+        self.docs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    async def settle(self):
+        """Finish the work requests deferred: buffered reactions, email, explanations."""
+        from app.services.email_outbox import email_outbox
+        from app.services.explanation_jobs import pregeneration_queue
+        from app.services.reactions import reaction_buffer
+
+        await reaction_buffer.flush()
+        while await email_outbox.drain():
+            pass
+        latency, self.gemini.latency = self.gemini.latency, 0.0
+        try:
+            await pregeneration_queue.join()
+        finally:
+            self.gemini.latency = latency
+
+    async def seed(self, client: httpx.AsyncClient):
+        sizes = {
+            "projects": self.args.projects, "writings": self.args.writings, "systems": self.args.systems,
+            "vault": self.args.vault, "arena": self.args.threads,
+        }
+        for collection, count in sizes.items():
+            docs = []
+            for n in range(count):
+                if collection == "arena":
+                    doc = make_thread(self.rng, n, self.args.comments)
+                else:
+                    doc = MAKERS[collection](self.rng, n)
+                docs.append(dict(doc, id=f"{collection}-{n}"))
+            body = "".join(json.dumps(doc) + "\n" for doc in docs)
+            response = await client.post(f"/api/v1/bulk/{collection}", content=body)
+            result = response.json()
+            if response.status_code != 200 or result["failed"]:
+                sys.exit(f"Seeding {collection} failed: {response.status_code} {response.text[:500]}")
+            self.ids[collection] = [doc["id"] for doc in docs]
+            self.docs[collection] = {doc["id"]: doc for doc in docs}
+        await self.settle()
+
+    def scenarios(self, client: httpx.AsyncClient) -> List[Scenario]:
+        ids, docs = self.ids, self.docs
+
+        def pick(collection: str, attribute: str = "id"):
+            # Resolved per request: the ids are only known once the store is seeded.
+            return lambda seq: docs[collection][ids[collection][seq % len(ids[collection])]][attribute]
+
+        project_id, project_slug = pick("projects"), pick("projects", "slug")
+        writing_id, writing_slug = pick("writings"), pick("writings", "slug")
+        thread_id = pick("arena")
+        personas = ("recruiter", "engineer", "architect")
+
+        not_modified = Scenario("projects.list.304", "GET", "/api/v1/projects/")
+
+        async def send_etag(_count: int):
+            etag = (await client.get("/api/v1/projects/")).headers.get("etag", "")
+            not_modified.headers = {"If-None-Match": etag}
+
+        not_modified.prepare = send_etag
+
+        scenarios = [
+            Scenario("root", "GET", "/"),
+            Scenario("projects.list", "GET", "/api/v1/projects/"),
+            not_modified,
+            Scenario("projects.page", "GET", "/api/v1/projects/?limit=10&fields=title,slug,thumbnail,oneLiner,techStack"),
+            Scenario("projects.get", "GET", lambda seq: f"/api/v1/projects/{project_id(seq)}"),
+            Scenario("projects.slug", "GET", lambda seq: f"/api/v1/projects/slug/{project_slug(seq)}"),
+            Scenario("projects.explain", "POST", lambda seq: f"/api/v1/projects/slug/{project_slug(seq)}/explain",
+                     body=lambda seq: {"persona": personas[seq % len(personas)]}),
+            Scenario("projects.explain.stream", "GET",
+                     lambda seq: f"/api/v1/projects/slug/{project_slug(seq)}/explain/stream?persona={personas[seq % len(personas)]}"),
+            Scenario("writings.list", "GET", "/api/v1/writings/"),
+            Scenario("writings.page", "GET", "/api/v1/writings/?limit=10&order_by=-publishedAt"),
+            Scenario("writings.filtered", "GET", lambda seq: f"/api/v1/writings/?tags={WORDS[seq % 8]}"),
+            Scenario("writings.facets", "GET", lambda seq: f"/api/v1/writings/_facets?series={SERIES[1 + seq % 2]}"),
+            Scenario("writings.get", "GET", lambda seq: f"/api/v1/writings/id/{writing_id(seq)}"),
+            Scenario("writings.slug", "GET", lambda seq: f"/api/v1/writings/{writing_slug(seq)}"),
+            Scenario("systems.list", "GET", "/api/v1/systems/"),
+            Scenario("systems.get", "GET", lambda seq: f"/api/v1/systems/{pick('systems')(seq)}"),
+            Scenario("vault.list", "GET", "/api/v1/vault/"),
+            Scenario("vault.filtered", "GET", lambda seq: f"/api/v1/vault/?category={CATEGORIES[seq % len(CATEGORIES)]}"),
+            Scenario("vault.facets", "GET", lambda seq: f"/api/v1/vault/_facets?tags={WORDS[seq % 8]}"),
+            Scenario("vault.get", "GET", lambda seq: f"/api/v1/vault/{pick('vault')(seq)}"),
+            Scenario("arena.list", "GET", "/api/v1/arena/"),
+            Scenario("arena.get", "GET", lambda seq: f"/api/v1/arena/{thread_id(seq)}"),
+            Scenario("arena.comments", "GET", lambda seq: f"/api/v1/arena/{thread_id(seq)}/comments?limit=20"),
+            Scenario("search", "GET", lambda seq: f"/api/v1/search/?q={WORDS[seq % len(WORDS)]}+{WORDS[(seq * 7) % len(WORDS)][:3]}"),
+            Scenario("bootstrap", "GET", "/api/v1/bootstrap/"),
+            Scenario("bulk.export", "GET", "/api/v1/bulk/writings"),
+        ]
+        for name in ("cache", "explanations", "models", "email", "messages", "auth", "rate-limits",
+                     "search", "facets", "compression", "repositories"):
+            scenarios.append(Scenario(f"ops.{name}", "GET", f"/api/v1/ops/{name}"))
+        scenarios.append(Scenario("ops.explanations.project", "GET",
+                                  lambda seq: f"/api/v1/ops/explanations/{project_id(seq)}"))
+
+        # Writes, after every read.
+        scenarios += [
+            Scenario("arena.like", "POST", lambda seq: f"/api/v1/arena/{thread_id(seq)}/like"),
+            Scenario("arena.dislike", "POST", lambda seq: f"/api/v1/arena/{thread_id(seq)}/dislike"),
+            Scenario("arena.comment", "POST", lambda seq: f"/api/v1/arena/{thread_id(seq)}/comment",
+                     body=lambda seq: {"content": f"Comment {seq}", "author": "benchmark"}),
+            Scenario("messages.create", "POST", "/api/v1/messages/", body=lambda seq: {
+                "name": "Benchmark", "email": f"reader{seq}@example.com", "type": "mentoring",
+                "message": f"Message {seq}",
+            }),
+        ]
+        for collection, make in MAKERS.items():
+            scenarios += self._write_scenarios(client, collection, make)
+        scenarios.append(Scenario("bulk.import", "POST", "/api/v1/bulk/vault", body=lambda seq: "".join(
+            json.dumps(dict(make_vault(random.Random(seq), seq), id=f"bulk-{seq}-{n}")) + "\n" for n in range(20)
+        )))
+        return scenarios
+
+    def _write_scenarios(self, client: httpx.AsyncClient, collection: str, make) -> List[Scenario]:
+        base = f"/api/v1/{collection}"
+        pool: List[str] = []
+
+        def new_doc(seq: int) -> Dict[str, Any]:
+            # Slugs are unique per request; the content only depends on seq.
+            doc = make(random.Random(seq), seq)
+            if "slug" in doc:
+                doc["slug"] = f"bench-{collection}-{seq}"
+            return doc
+
+        def updated(seq: int) -> Dict[str, Any]:
+            doc_id = self.ids[collection][seq % len(self.ids[collection])]
+            doc = {key: value for key, value in self.docs[collection][doc_id].items() if key not in ("id", "responses")}
+            return dict(doc, title=f"Revised {seq}") if "title" in doc else dict(doc, usage=f"Revised {seq}")
+
+        async def create_pool(count: int):
+            for _ in range(count):
+                response = await client.post(f"{base}/", json=new_doc(next(self.seq)))
+                pool.append(response.json()["id"])
+
+        return [
+            Scenario(f"{collection}.create", "POST", f"{base}/", body=new_doc),
+            Scenario(f"{collection}.update", "PUT",
+                     lambda seq: f"{base}/{self.ids[collection][seq % len(self.ids[collection])]}", body=updated),
+            Scenario(f"{collection}.delete", "DELETE", lambda seq: f"{base}/{pool.pop()}", prepare=create_pool),
+        ]
+
+    async def run(self, client: httpx.AsyncClient, scenario: Scenario, concurrency: int) -> Dict[str, Any]:
+        warmup, total = self.args.warmup, self.args.requests
+        if scenario.prepare is not None:
+            await scenario.prepare(warmup + total)
+            await self.settle()
+
+        async def drive(count: int, latencies: Optional[List[float]], statuses: Dict[str, int]):
+            remaining = iter(range(count))
+
+            async def worker():
+                for _ in remaining:
+                    request = scenario.request(next(self.seq))
+                    started = time.perf_counter()
+                    response = await client.request(**request)
+                    await response.aread()
+                    elapsed = time.perf_counter() - started
+                    if latencies is not None:
+                        latencies.append(elapsed)
+                    statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        await drive(warmup, None, {})
+        await self.settle()
+        self.store.reset_counters()
+        latencies: List[float] = []
+        statuses: Dict[str, int] = {}
+        started = time.perf_counter()
+        await drive(total, latencies, statuses)
+        wall = time.perf_counter() - started
+        if scenario.writes:
+            # Count the writes' deferred work (buffer flushes, outbox delivery) too.
+            await self.settle()
+        counts = self.store.stats()
+        await self.settle()
+
+        latencies.sort()
+
+        def percentile(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 2)
+
+        return {
+            "throughput_rps": round(total / wall, 1),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(latencies[-1] * 1000, 2),
+            "errors": sum(count for status, count in statuses.items() if int(status) >= 400),
+            "statuses": dict(sorted(statuses.items())),
+            "firestore_calls_per_request": round(counts["calls"] / total, 2),
+            "reads_per_request": round(counts["reads"] / total, 2),
+            "writes_per_request": round(counts["writes"] / total, 2),
+        }
+
+    async def main(self) -> Dict[str, Any]:
+        levels = [int(level) for level in self.args.concurrency.split(",")]
+        patterns = [pattern.strip() for pattern in self.args.only.split(",")] if self.args.only else None
+        results: Dict[str, Dict[str, Any]] = {}
+        async with self.lifespan(self.app):
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+                scenarios = self.scenarios(client)
+                if self.args.list:
+                    print("\n".join(scenario.name for scenario in scenarios))
+                    return {}
+                await self.seed(client)
+                self.store.latency = self.args.firestore_latency
+                self.store.jitter = self.args.jitter
+                for scenario in scenarios:
+                    if patterns and not any(fnmatch.fnmatch(scenario.name, pattern) for pattern in patterns):
+                        continue
+                    results[scenario.name] = {}
+                    for level in levels:
+                        results[scenario.name][str(level)] = await self.run(client, scenario, level)
+                        if not self.args.json:
+                            print(format_row(scenario.name, level, results[scenario.name][str(level)]), flush=True)
+        return {
+            "config": {key: value for key, value in vars(self.args).items() if key not in ("json", "list")},
+            "results": results,
+            "totals": {"documents": len(self.store.docs), "gemini_calls": self.gemini.calls, "formspree_posts": self.formspree.posts},
+        }
+
+
+HEADER = (f"{'scenario':<28} {'conc':>4} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>6} {'fs calls':>8} {'reads':>7} {'writes':>7}")
+
+
+def format_row(name: str, level: int, row: Dict[str, Any]) -> str:
+    return (f"{name:<28} {level:>4} {row['throughput_rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+            f"{row['p99_ms']:>8} {row['errors']:>6} {row['firestore_calls_per_request']:>8} "
+            f"{row['reads_per_request']:>7} {row['writes_per_request']:>7}")
+
+
+def main(args):
+    if args.json:
+        # The app logs with print(); keep stdout for the report.
+        with contextlib.redirect_stdout(sys.stderr):
+            report = asyncio.run(Harness(args).main())
+        print(json.dumps(report, indent=2))
+        return
+    harness = Harness(args)
+    if not args.list:
+        print(f"firestore {args.firestore_latency * 1000:g} ms, gemini {args.gemini_latency * 1000:g} ms, "
+              f"formspree {args.email_latency * 1000:g} ms per call; {args.requests} requests per run")
+        print(HEADER)
+    asyncio.run(harness.main())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests before each run")
+    parser.add_argument("--firestore-latency", type=float, default=0.005, help="seconds per Firestore call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction applied to Firestore latency")
+    parser.add_argument("--gemini-latency", type=float, default=0.4, help="seconds per Gemini call")
+    parser.add_argument("--email-latency", type=float, default=0.1, help="seconds per Formspree post")
+    parser.add_argument("--projects", type=int, default=30)
+    parser.add_argument("--writings", type=int, default=60)
+    parser.add_argument("--systems", type=int, default=20)
+    parser.add_argument("--vault", type=int, default=80)
+    parser.add_argument("--threads", type=int, default=20, help="arena threads")
+    parser.add_argument("--comments", type=int, default=30, help="comments per arena thread")
+    parser.add_argument("--only", help="comma-separated scenario names or glob patterns")
+    parser.add_argument("--list", action="store_true", help="print the scenario names and exit")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    main(parser.parse_args())
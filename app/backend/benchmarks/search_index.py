@@ -0,0 +1,125 @@
+"""
+Query latency benchmark for the in-process search index.
+
+Builds an InvertedIndex over synthetic projects, writings and vault entries
+whose words follow a Zipf-like distribution, then times queries of each kind:
+
+  rare      one uncommon term
+  common    one very common term (long postings list)
+  multi     three terms
+  prefix    a two or three letter prefix, expanded against the vocabulary
+  cold      the same prefixes with the per-term score cache emptied first
+  update    re-indexing one document (what a create/update handler pays)
+
+Usage:
+    python benchmarks/search_index.py [--docs 10000] [--queries 500] [--json]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.text_index import InvertedIndex  # noqa: E402
+
+# Same shape as app.services.search.SEARCH_FIELDS, which needs Firestore to import.
+FIELDS = {
+    "projects": {"title": 2.0, "oneLiner": 1.5, "overview": 1.0},
+    "writings": {"title": 2.0, "excerpt": 1.5, "content": 1.0},
+    "vault": {"title": 2.0, "tags": 1.5, "content": 1.0},
+}
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zen", "pri", "sto", "gra", "fle", "dex", "bin", "cor"]
+
+
+def build_vocabulary(rng: random.Random, size: int):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_text(rng: random.Random, vocabulary, cum_weights, length: int) -> str:
+    return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=length))
+
+
+def make_documents(rng: random.Random, count: int, vocabulary, cum_weights):
+    docs = []
+    for i in range(count):
+        collection = ("projects", "writings", "vault")[i % 3]
+        title = make_text(rng, vocabulary, cum_weights, 5).title()
+        if collection == "projects":
+            data = {"title": title, "slug": f"p-{i}", "oneLiner": make_text(rng, vocabulary, cum_weights, 15),
+                    "overview": make_text(rng, vocabulary, cum_weights, 200)}
+        elif collection == "writings":
+            data = {"title": title, "slug": f"w-{i}", "excerpt": make_text(rng, vocabulary, cum_weights, 30),
+                    "content": make_text(rng, vocabulary, cum_weights, 800)}
+        else:
+            data = {"title": title, "tags": rng.choices(vocabulary[:200], k=4),
+                    "content": make_text(rng, vocabulary, cum_weights, 150)}
+        docs.append((collection, f"doc-{i}", data))
+    return docs
+
+
+def measure(fn, repeat: int):
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    vocabulary = build_vocabulary(rng, args.vocabulary)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    docs = make_documents(rng, args.docs, vocabulary, cum_weights)
+
+    index = InvertedIndex(FIELDS)
+    start = time.perf_counter()
+    for collection, doc_id, data in docs:
+        index.add(collection, doc_id, data)
+    build_s = time.perf_counter() - start
+
+    rare = vocabulary[len(vocabulary) // 2:]
+    queries = {
+        "rare": lambda i: index.search(rare[i % len(rare)]),
+        "common": lambda i: index.search(vocabulary[i % 5]),
+        "multi": lambda i: index.search(make_text(rng, vocabulary, cum_weights, 3)),
+        "prefix": lambda i: index.search(vocabulary[i % len(vocabulary)][:2 + i % 2]),
+        "cold": lambda i: (index._score_cache.clear(), index.search(vocabulary[i % len(vocabulary)][:2 + i % 2])),
+        "update": lambda i: index.add(*docs[i % len(docs)]),
+    }
+    results = {name: measure(fn, args.queries) for name, fn in queries.items()}
+
+    if args.json:
+        print(json.dumps({
+            "docs": len(index), "terms": index.term_count, "build_s": round(build_s, 2), "results": results,
+        }, indent=2))
+        return
+    print(f"Indexed {len(index)} documents, {index.term_count} terms in {build_s:.2f} s")
+    print(f"{'query':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        print(f"{name:<8} {row['mean_ms']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000, help="documents to index")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="distinct words")
+    parser.add_argument("--queries", type=int, default=500, help="runs per query kind")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    main(parser.parse_args())
@@ -0,0 +1,128 @@
+"""
+Per-item cost of turning Firestore documents into response bytes.
+
+For lists of 1k and 10k projects and writings, times:
+
+  response_model    what FastAPI does when a handler returns the list:
+                    validate, jsonable_encoder, then encode (orjson)
+  validate + dump   `render` with a model TypeAdapter: validate, then dump_json
+  model_construct   model_construct, then dump_json (the textbook trusted path)
+  trusted           `TrustedRenderer`: shape the dicts to the model, then orjson
+  cards validated   a card projection through `render` (List[Dict[str, Any]])
+  cards trusted     the same projection with `trusted=True`
+
+Every path must produce the same JSON as "validate + dump"; the run stops
+if one does not.
+
+Usage:
+    python benchmarks/serialization.py [--sizes 1000,10000] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.http_cache import TrustedRenderer, render  # noqa: E402
+from app.core.pagination import projection_adapter  # noqa: E402
+from app.models.content import Project, Writing  # noqa: E402
+
+WORDS = "kafka redis cache shard index query batch commit schema deploy service latency".split()
+# Same as app.services.card_index.CARD_FIELDS, which needs Firestore to import.
+CARD_FIELDS = {
+    "projects": ["title", "slug", "thumbnail", "oneLiner", "techStack", "featured", "status"],
+    "writings": ["title", "slug", "thumbnail", "excerpt", "tags", "series", "readingTime", "publishedAt"],
+}
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_projects(rng: random.Random, count: int):
+    # Stored documents omit defaulted fields now and then, as older ones do.
+    return [
+        {
+            "id": f"project-{i}", "title": text(rng, 3), "slug": f"project-{i}", "thumbnail": f"/img/{i}.png",
+            "oneLiner": text(rng, 12), "techStack": rng.sample(WORDS, 4), "overview": text(rng, 120),
+            **({"featured": True, "status": "draft"} if i % 4 == 0 else {}),
+        }
+        for i in range(count)
+    ]
+
+
+def make_writings(rng: random.Random, count: int):
+    start = datetime(2023, 1, 1)
+    return [
+        {
+            "id": f"writing-{i}", "title": text(rng, 5), "slug": f"writing-{i}", "thumbnail": f"/img/{i}.png",
+            "excerpt": text(rng, 30), "content": text(rng, 150), "readingTime": 3, "tags": rng.sample(WORDS, 3),
+            "series": None, "canonicalUrl": None, "publishedAt": (start + timedelta(hours=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {}
+    for collection, model, make in (("projects", Project, make_projects), ("writings", Writing, make_writings)):
+        adapter = TypeAdapter(List[model])
+        renderer = TrustedRenderer(model)
+        for size in sizes:
+            docs = make(rng, size)
+            cards = [{field: doc.get(field) for field in CARD_FIELDS[collection] + ["id"]} for doc in docs]
+            reference = render(docs, adapter).body
+            scenarios = {
+                "response_model": lambda: orjson.dumps(jsonable_encoder(adapter.validate_python(docs))),
+                "validate + dump": lambda: render(docs, adapter).body,
+                "model_construct": lambda: adapter.dump_json([model.model_construct(**doc) for doc in docs], warnings=False),
+                "trusted": lambda: renderer.render(docs).body,
+                "cards validated": lambda: render(cards, projection_adapter).body,
+                "cards trusted": lambda: render(cards, projection_adapter, trusted=True).body,
+            }
+            for name in ("response_model", "model_construct", "trusted"):
+                if json.loads(scenarios[name]()) != json.loads(reference):
+                    sys.exit(f"{name} output differs from validate + dump for {collection}")
+            if scenarios["cards trusted"]() != scenarios["cards validated"]():
+                sys.exit(f"cards trusted output differs for {collection}")
+            results[f"{collection} x{size}"] = {
+                name: round(best_of(fn, args.repeat) / size * 1e6, 2) for name, fn in scenarios.items()
+            }
+
+    if args.json:
+        print(json.dumps({"unit": "us per item", "results": results}, indent=2))
+        return
+    names = list(next(iter(results.values())))
+    print("microseconds per item (best of %d)" % args.repeat)
+    print(f"{'':<18}" + "".join(f"{name:>17}" for name in names))
+    for label, row in results.items():
+        print(f"{label:<18}" + "".join(f"{row[name]:>17}" for name in names))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated list sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario; the fastest counts")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    main(parser.parse_args())
@@ -1,22 +1,48 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import projects, writings, systems, vault, arena
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from fastapi.responses import ORJSONResponse
+from app.routers import projects, writings, systems, vault, arena, search
+from app.core.compression import CompressionMiddleware
 from app.core.limiter import limiter
+from contextlib import asynccontextmanager
+from app.services.reactions import reaction_buffer
+from app.services.explanation_jobs import pregeneration_queue
+from app.services.email_outbox import email_outbox
+from app.services.message_ingest import message_buffer
+from app.core.auth_cache import signing_keys
+from app.services.search import search_index
+from app.services.facets import facet_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reaction_buffer.start()
+    pregeneration_queue.start()
+    email_outbox.start()
+    signing_keys.start()
+    limiter.start()
+    search_index.start()
+    facet_index.start()
+    yield
+    # Write out buffered arena reactions and any contact messages still in their batch window.
+    await reaction_buffer.close()
+    await message_buffer.close()
+    await pregeneration_queue.close()
+    await email_outbox.close()
+    await signing_keys.close()
+    await limiter.close()
+    await search_index.close()
+    await facet_index.close()
+
 
 app = FastAPI(
     title="Portfolio System API",
     description="Backend API for Sahil Sharma's Portfolio System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Add Rate Limiting Middleware
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
 # CORS Configuration
 # Read from env or use default local development origins
 import os
@@ -46,7 +72,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+# Cached reads compress (and keep) their own bodies; this covers everything else.
+app.add_middleware(CompressionMiddleware)
 
 # Include Routers
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["Projects"])
@@ -54,8 +83,15 @@ app.include_router(writings.router, prefix="/api/v1/writings", tags=["Writings"]
 app.include_router(systems.router, prefix="/api/v1/systems", tags=["Systems"])
 app.include_router(vault.router, prefix="/api/v1/vault", tags=["Vault"])
 app.include_router(arena.router, prefix="/api/v1/arena", tags=["Arena"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["Search"])
 from app.routers import messages
 app.include_router(messages.router, prefix="/api/v1/messages", tags=["Messages"])
+from app.routers import ops
+app.include_router(ops.router, prefix="/api/v1/ops", tags=["Ops"])
+from app.routers import bulk
+app.include_router(bulk.router, prefix="/api/v1/bulk", tags=["Bulk"])
+from app.routers import bootstrap
+app.include_router(bootstrap.router, prefix="/api/v1/bootstrap", tags=["Bootstrap"])
 
 
 @app.get("/")
@@ -0,0 +1,164 @@
+"""
+Maintenance commands for the Portfolio System backend.
+
+Usage:
+    python manage.py rebuild-card-index [collection ...]
+    python manage.py check-card-index [collection ...]
+    python manage.py backfill-slug-index [collection ...]
+    python manage.py migrate-arena-comments
+    python manage.py warm-explanations [--concurrency N] [--rate-per-minute N]
+    python manage.py export COLLECTION [--output FILE]
+    python manage.py import COLLECTION FILE
+"""
+import argparse
+import asyncio
+import sys
+
+
+async def rebuild_card_index(args):
+    from app.services import card_index
+
+    for collection in args.collections or list(card_index.CARD_FIELDS):
+        count = await card_index.rebuild(collection)
+        print(f"Rebuilt card index for '{collection}': {count} cards")
+    return 0
+
+
+async def check_card_index(args):
+    from app.services import card_index
+
+    healthy = True
+    for collection in args.collections or list(card_index.CARD_FIELDS):
+        report = await card_index.check(collection)
+        problems = {kind: ids for kind, ids in report.items() if ids}
+        if problems:
+            healthy = False
+            print(f"[FAIL] {collection}: " + "; ".join(f"{kind}={', '.join(ids)}" for kind, ids in problems.items()))
+        else:
+            print(f"[PASS] {collection}: card index consistent")
+    return 0 if healthy else 1
+
+
+async def backfill_slug_index(args):
+    from app.services import slug_index
+
+    clean = True
+    for collection in args.collections or list(slug_index.SLUG_COLLECTIONS):
+        result = await slug_index.backfill(collection)
+        print(f"Indexed {result['indexed']} slugs for '{collection}' ({result['duplicates']} duplicates skipped)")
+        clean = clean and not result["duplicates"]
+    return 0 if clean else 1
+
+
+async def migrate_arena_comments(args):
+    from app.services import arena_comments
+
+    result = await arena_comments.migrate_all()
+    print(f"Moved {result['comments']} comments out of {result['threads']} threads")
+    print(f"Backfilled counters on {result['backfilled']} threads")
+    if result["skipped"]:
+        print(f"Dropped {result['skipped']} invalid responses (logged above)")
+        return 1
+    return 0
+
+
+async def warm_explanations(args):
+    from app.core.firebase import async_db
+    from app.services.explanation_jobs import PregenerationQueue
+    from app.services.gemini import get_gemini_client
+
+    if get_gemini_client() is None:
+        print("GEMINI_API_KEY is not set; nothing to warm")
+        return 1
+    queue = PregenerationQueue(concurrency=args.concurrency, rate_per_minute=args.rate_per_minute)
+    queue.start()
+    async for doc in async_db.collection(u'projects').select([]).stream():
+        await queue.enqueue(doc.id)
+    await queue.join()
+    await queue.close()
+    stats = queue.stats()
+    print(f"Warmed {stats['done']} projects ({stats['generated']} explanations generated, {stats['failed']} projects failed)")
+    return 0 if not stats["failed"] else 1
+
+
+async def export_collection(args):
+    from app.services import bulk
+
+    if args.collection not in bulk.BULK_MODELS:
+        print(f"Unknown collection '{args.collection}'; expected one of {', '.join(bulk.BULK_MODELS)}")
+        return 1
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    count = 0
+    try:
+        async for line in bulk.export_lines(args.collection):
+            output.write(line)
+            count += 1
+    finally:
+        if args.output:
+            output.close()
+    print(f"Exported {count} documents from '{args.collection}'", file=sys.stderr)
+    return 0
+
+
+async def import_collection(args):
+    from app.services import bulk
+
+    if args.collection not in bulk.BULK_MODELS:
+        print(f"Unknown collection '{args.collection}'; expected one of {', '.join(bulk.BULK_MODELS)}")
+        return 1
+    async def chunks():
+        with open(args.file, "rb") as source:
+            while True:
+                chunk = source.read(64 * 1024)
+                if not chunk:
+                    return
+                yield chunk
+
+    summary = await bulk.import_lines(args.collection, chunks())
+    for result in summary["results"]:
+        if result["status"] == "failed":
+            print(f"line {result['line']}: {result['error']}")
+    print(f"Imported into '{args.collection}': {summary['created']} created, {summary['updated']} updated, {summary['failed']} failed")
+    return 0 if not summary["failed"] else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Portfolio System maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-card-index", help="Recompute card index documents from the collections")
+    rebuild.add_argument("collections", nargs="*")
+    rebuild.set_defaults(handler=rebuild_card_index)
+
+    check = commands.add_parser("check-card-index", help="Report card index entries that are missing, orphaned or stale")
+    check.add_argument("collections", nargs="*")
+    check.set_defaults(handler=check_card_index)
+
+    slugs = commands.add_parser("backfill-slug-index", help="Create slug index entries for existing documents")
+    slugs.add_argument("collections", nargs="*")
+    slugs.set_defaults(handler=backfill_slug_index)
+
+    comments = commands.add_parser("migrate-arena-comments", help="Move embedded arena responses into comment subcollections and backfill thread counters")
+    comments.set_defaults(handler=migrate_arena_comments)
+
+    warm = commands.add_parser("warm-explanations", help="Pre-generate every persona explanation for every project")
+    warm.add_argument("--concurrency", type=int, default=2)
+    warm.add_argument("--rate-per-minute", type=float, default=30)
+    warm.set_defaults(handler=warm_explanations)
+
+    export = commands.add_parser("export", help="Write a collection as NDJSON")
+    export.add_argument("collection")
+    export.add_argument("--output", help="file to write (default: stdout)")
+    export.set_defaults(handler=export_collection)
+
+    load = commands.add_parser("import", help="Create or replace documents from an NDJSON file")
+    load.add_argument("collection")
+    load.add_argument("file")
+    load.set_defaults(handler=import_collection)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Unit tests run against the in-memory Firestore stand-in in fake_firestore.py,
+installed before anything imports the app. Run them from app/backend:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import fake_firestore  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+_store = fake_firestore.install()
+
+
+@pytest.fixture
+def store():
+    """The shared in-memory store, emptied for each test."""
+    _store.docs.clear()
+    _store.reset_counters()
+    _store.latency = 0.0
+    return _store
+
+
+@pytest.fixture
+def client(store):
+    """The app (without its background workers) with admin auth granted and fresh caches."""
+    from app.core.cache import read_cache
+    from app.core.limiter import limiter
+    from app.dependencies import get_current_user
+    from main import app
+
+    read_cache.clear()
+    limiter._windows.clear()
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "admin"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,500 @@
+"""
+In-memory stand-in for the clients in `app.core.firebase`, for the unit tests
+and benchmarks/load.py.
+
+`install()` registers a replacement `app.core.firebase` module exposing `db`
+and `async_db` over one shared document store, so it must run before
+anything imports the app. It covers the API surface the app uses: document
+get/set/create/update/delete (with exists preconditions), where/order_by/
+limit/start_after/select queries, collection groups, get_all, batches and
+`async_transactional` transactions, plus the Increment, ArrayUnion,
+ArrayRemove, DELETE_FIELD and SERVER_TIMESTAMP transforms.
+
+Every async call (one per document read, query, get_all or commit) first
+sleeps the configured latency, optionally jittered with a seeded RNG, so the
+app's I/O overlap shows up the way it would against Firestore. The sync `db`
+client does not wait. The store counts calls, document reads and document
+writes.
+
+Transactions are not isolated: reads see the latest data and commits never
+abort. That is enough for timing, not for testing contention.
+"""
+import asyncio
+import copy
+import random
+import sys
+import types
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1 import transforms
+
+
+class Store:
+    """Documents keyed by path, the latency model and the counters."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.reads = 0
+        self.writes = 0
+
+    async def call(self):
+        self.calls += 1
+        if self.latency > 0:
+            delay = self.latency
+            if self.jitter:
+                delay *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            await asyncio.sleep(delay)
+
+    def reset_counters(self):
+        self.calls = self.reads = self.writes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": len(self.docs), "calls": self.calls, "reads": self.reads, "writes": self.writes}
+
+
+def _apply(existing: Optional[Dict[str, Any]], data: Dict[str, Any], merge: bool) -> Dict[str, Any]:
+    out = copy.deepcopy(existing) if merge and existing is not None else {}
+    for key, value in data.items():
+        path = key.split(".") if merge else [key]
+        target = out
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+        field = path[-1]
+        if value is transforms.DELETE_FIELD:
+            target.pop(field, None)
+        elif value is transforms.SERVER_TIMESTAMP:
+            target[field] = datetime.now(timezone.utc)
+        elif isinstance(value, transforms.Increment):
+            target[field] = target.get(field, 0) + value.value
+        elif isinstance(value, transforms.ArrayUnion):
+            current = list(target.get(field) or [])
+            target[field] = current + [item for item in value.values if item not in current]
+        elif isinstance(value, transforms.ArrayRemove):
+            target[field] = [item for item in target.get(field) or [] if item not in value.values]
+        elif merge and isinstance(value, dict):
+            current = target.get(field)
+            target[field] = _apply(current if isinstance(current, dict) else None, value, True)
+        else:
+            target[field] = copy.deepcopy(value)
+    return out
+
+
+class ExistsOption:
+    def __init__(self, exists: bool):
+        self.exists = exists
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field: str):
+        return (self._data or {}).get(field)
+
+
+# ---------------------------------------------------------------- sync client
+
+
+class DocumentReference:
+    def __init__(self, store: Store, path: str):
+        self._store = store
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> "CollectionReference":
+        return CollectionReference(self._store, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name: str) -> "CollectionReference":
+        return CollectionReference(self._store, f"{self.path}/{name}")
+
+    def _read(self, field_paths: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        self._store.reads += 1
+        data = self._store.docs.get(self.path)
+        if data is not None and field_paths is not None:
+            return {field: copy.deepcopy(data[field]) for field in field_paths if field in data}
+        return copy.deepcopy(data)
+
+    def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        return DocumentSnapshot(self, self._read(field_paths))
+
+    def set(self, data, merge=False):
+        _commit(self._store, [("set", self, data, merge)])
+
+    def create(self, data):
+        _commit(self._store, [("create", self, data, None)])
+
+    def update(self, data, option=None):
+        _commit(self._store, [("update", self, data, None)])
+
+    def delete(self, option=None):
+        _commit(self._store, [("delete", self, None, option)])
+
+
+def _commit(store: Store, ops: List[Tuple[str, Any, Any, Any]]):
+    # Check every precondition first so a failing batch writes nothing.
+    staged: Dict[str, bool] = {}
+    for kind, ref, _, option in ops:
+        exists = staged.get(ref.path, ref.path in store.docs)
+        if kind == "create" and exists:
+            raise AlreadyExists(f"Document already exists: {ref.path}")
+        if kind == "update" and not exists:
+            raise NotFound(f"No document to update: {ref.path}")
+        if kind == "delete" and isinstance(option, ExistsOption) and option.exists and not exists:
+            raise NotFound(f"No document to delete: {ref.path}")
+        staged[ref.path] = kind != "delete"
+    for kind, ref, data, option in ops:
+        store.writes += 1
+        if kind == "delete":
+            store.docs.pop(ref.path, None)
+        else:
+            merge = kind == "update" or (kind == "set" and bool(option))
+            store.docs[ref.path] = _apply(store.docs.get(ref.path), data, merge)
+
+
+def _order_key(value):
+    # Firestore orders null before every other value.
+    return (0, 0) if value is None else (1, value)
+
+
+class Query:
+    def __init__(self, store: Store, path: str, group: bool = False, filters=(), orders=(),
+                 limit=None, cursor=None, fields=None):
+        self._store = store
+        self._path = path
+        self._group = group
+        self._filters = list(filters)
+        self._orders = list(orders)
+        self._limit = limit
+        self._cursor = cursor
+        self._fields = fields
+
+    def _copy(self, **changes) -> "Query":
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     cursor=self._cursor, fields=self._fields)
+        state.update(changes)
+        return self._query_type(self._store, self._path, self._group, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path, direction="ASCENDING") -> "Query":
+        return self._copy(orders=self._orders + [(field_path, str(direction).upper().startswith("DESC"))])
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+
+    def start_after(self, cursor) -> "Query":
+        return self._copy(cursor=cursor)
+
+    def select(self, field_paths) -> "Query":
+        return self._copy(fields=list(field_paths))
+
+    def _members(self) -> List[Tuple[str, Dict[str, Any]]]:
+        if self._group:
+            return [(path, data) for path, data in self._store.docs.items() if path.split("/")[-2] == self._path]
+        prefix = self._path + "/"
+        return [
+            (path, data) for path, data in self._store.docs.items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+
+    @staticmethod
+    def _value(path: str, data: Dict[str, Any], field: str):
+        return path.rsplit("/", 1)[-1] if field == "__name__" else data.get(field)
+
+    def _matches(self, path: str, data: Dict[str, Any]) -> bool:
+        for field, op, expected in self._filters:
+            value = self._value(path, data, field)
+            if op == "==":
+                ok = value == expected
+            elif op == "!=":
+                ok = value is not None and value != expected
+            elif op == "in":
+                ok = value in expected
+            elif op == "not-in":
+                ok = value is not None and value not in expected
+            elif op == "array_contains":
+                ok = isinstance(value, list) and expected in value
+            elif op == "array_contains_any":
+                ok = isinstance(value, list) and any(item in value for item in expected)
+            elif value is None:
+                ok = False
+            else:
+                ok = {"<": value < expected, "<=": value <= expected,
+                      ">": value > expected, ">=": value >= expected}[op]
+            if not ok:
+                return False
+        return True
+
+    def _after_cursor(self, path: str, data: Dict[str, Any]) -> bool:
+        cursor = self._cursor
+        if isinstance(cursor, DocumentSnapshot):
+            cursor = dict(cursor._data or {}, __name__=cursor.id)
+        for field, descending in self._orders or [("__name__", False)]:
+            value = self._value(path, data, field)
+            mark = cursor.get(field)
+            if hasattr(mark, "id"):
+                mark = mark.id
+            if value == mark:
+                continue
+            return _order_key(value) < _order_key(mark) if descending else _order_key(value) > _order_key(mark)
+        return False
+
+    def _results(self) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = sorted(row for row in self._members() if self._matches(*row))
+        for field, descending in reversed(self._orders):
+            # Firestore leaves out documents missing an order_by field.
+            rows = [row for row in rows if field == "__name__" or field in row[1]]
+            rows.sort(key=lambda row: _order_key(self._value(row[0], row[1], field)), reverse=descending)
+        if self._cursor is not None:
+            rows = [row for row in rows if self._after_cursor(*row)]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return rows
+
+    def _snapshots(self, make_ref) -> List[DocumentSnapshot]:
+        snapshots = []
+        for path, data in self._results():
+            self._store.reads += 1
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            snapshots.append(DocumentSnapshot(make_ref(self._store, path), copy.deepcopy(data)))
+        return snapshots
+
+    def stream(self, transaction=None):
+        return iter(self._snapshots(DocumentReference))
+
+    def get(self, transaction=None) -> List[DocumentSnapshot]:
+        return self._snapshots(DocumentReference)
+
+
+# Narrowing a query returns the same flavour (sync or async) of query.
+Query._query_type = Query
+
+
+class CollectionReference(Query):
+    def __init__(self, store: Store, path: str):
+        super().__init__(store, path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> Optional[DocumentReference]:
+        return DocumentReference(self._store, self.path.rsplit("/", 1)[0]) if "/" in self.path else None
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._store, f"{self.path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+    def list_documents(self) -> List[DocumentReference]:
+        return [DocumentReference(self._store, path) for path, _ in sorted(self._members())]
+
+
+class WriteBatch:
+    def __init__(self, store: Store):
+        self._store = store
+        self._ops: List[Tuple[str, Any, Any, Any]] = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, document_data, merge))
+        return self
+
+    def create(self, reference, document_data):
+        self._ops.append(("create", reference, document_data, None))
+        return self
+
+    def update(self, reference, field_updates, option=None):
+        self._ops.append(("update", reference, field_updates, None))
+        return self
+
+    def delete(self, reference, option=None):
+        self._ops.append(("delete", reference, None, option))
+        return self
+
+    def __len__(self):
+        return len(self._ops)
+
+    def _apply(self):
+        ops, self._ops = self._ops, []
+        _commit(self._store, ops)
+        return []
+
+    def commit(self, *args, **kwargs):
+        return self._apply()
+
+
+class Client:
+    def __init__(self, store: Store):
+        self._store = store
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self._store, name)
+
+    def collection_group(self, collection_id: str) -> Query:
+        return Query(self._store, collection_id, group=True)
+
+    def document(self, path: str) -> DocumentReference:
+        return DocumentReference(self._store, path)
+
+    def collections(self) -> List[CollectionReference]:
+        return [CollectionReference(self._store, name) for name in sorted({p.split("/")[0] for p in self._store.docs})]
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self._store)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        return iter([ref.get(field_paths) for ref in references])
+
+    def write_option(self, exists=None, **kwargs) -> ExistsOption:
+        return ExistsOption(exists)
+
+
+# --------------------------------------------------------------- async client
+
+
+class AsyncDocumentReference(DocumentReference):
+    @property
+    def parent(self) -> "AsyncCollectionReference":
+        return AsyncCollectionReference(self._store, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name: str) -> "AsyncCollectionReference":
+        return AsyncCollectionReference(self._store, f"{self.path}/{name}")
+
+    async def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        await self._store.call()
+        return DocumentSnapshot(self, self._read(field_paths))
+
+    async def set(self, data, merge=False):
+        await self._store.call()
+        super().set(data, merge)
+
+    async def create(self, data):
+        await self._store.call()
+        super().create(data)
+
+    async def update(self, data, option=None):
+        await self._store.call()
+        super().update(data, option)
+
+    async def delete(self, option=None):
+        await self._store.call()
+        super().delete(option)
+
+
+class AsyncQuery(Query):
+    async def stream(self, transaction=None):
+        await self._store.call()
+        for snapshot in self._snapshots(AsyncDocumentReference):
+            yield snapshot
+
+    async def get(self, transaction=None) -> List[DocumentSnapshot]:
+        await self._store.call()
+        return self._snapshots(AsyncDocumentReference)
+
+
+AsyncQuery._query_type = AsyncQuery
+
+
+class AsyncCollectionReference(AsyncQuery, CollectionReference):
+    @property
+    def parent(self) -> Optional[AsyncDocumentReference]:
+        return AsyncDocumentReference(self._store, self.path.rsplit("/", 1)[0]) if "/" in self.path else None
+
+    def document(self, document_id: Optional[str] = None) -> AsyncDocumentReference:
+        return AsyncDocumentReference(self._store, f"{self.path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    async def add(self, data):
+        ref = self.document()
+        await ref.set(data)
+        return None, ref
+
+    async def list_documents(self):
+        await self._store.call()
+        for path, _ in sorted(self._members()):
+            yield AsyncDocumentReference(self._store, path)
+
+
+class AsyncWriteBatch(WriteBatch):
+    async def commit(self, *args, **kwargs):
+        await self._store.call()
+        return self._apply()
+
+
+class AsyncTransaction(AsyncWriteBatch):
+    """Buffers writes until commit, the way `firestore.async_transactional` drives it."""
+
+    _max_attempts = 1
+    _read_only = False
+    _id = None
+
+    def _clean_up(self):
+        self._ops = []
+        self._id = None
+
+    async def _begin(self, retry_id=None):
+        await self._store.call()
+        self._id = uuid.uuid4().bytes
+
+    async def _commit(self):
+        await self.commit()
+        self._clean_up()
+
+    async def _rollback(self):
+        self._clean_up()
+
+
+class AsyncClient(Client):
+    def collection(self, name: str) -> AsyncCollectionReference:
+        return AsyncCollectionReference(self._store, name)
+
+    def collection_group(self, collection_id: str) -> AsyncQuery:
+        return AsyncQuery(self._store, collection_id, group=True)
+
+    def document(self, path: str) -> AsyncDocumentReference:
+        return AsyncDocumentReference(self._store, path)
+
+    def batch(self) -> AsyncWriteBatch:
+        return AsyncWriteBatch(self._store)
+
+    def transaction(self, **kwargs) -> AsyncTransaction:
+        return AsyncTransaction(self._store)
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        references = list(references)
+        await self._store.call()
+        for ref in references:
+            yield DocumentSnapshot(ref, ref._read(field_paths))
+
+
+def install(latency: float = 0.0, jitter: float = 0.0, seed: int = 0) -> Store:
+    """Replace `app.core.firebase` with clients over a fresh store and return the store."""
+    if "app.core.firebase" in sys.modules and not getattr(sys.modules["app.core.firebase"], "FAKE", False):
+        raise RuntimeError("install() must run before anything imports app.core.firebase")
+    store = Store(latency, jitter, seed)
+    module = types.ModuleType("app.core.firebase")
+    module.FAKE = True
+    module.store = store
+    module.db = Client(store)
+    module.async_db = AsyncClient(store)
+    sys.modules["app.core.firebase"] = module
+    return store
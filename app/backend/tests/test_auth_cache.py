@@ -0,0 +1,75 @@
+import pytest
+from firebase_admin import auth
+
+from app.core import auth_cache
+from app.core.auth_cache import VerifiedTokenCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def firebase(monkeypatch, clock):
+    """Answers verify_id_token with `answer` (claims, or an exception to raise); counts the calls."""
+    state = {"calls": 0, "answer": {"uid": "admin", "exp": clock[0] + 3600}}
+
+    def verify_id_token(token, check_revoked=False):
+        assert check_revoked
+        state["calls"] += 1
+        if isinstance(state["answer"], Exception):
+            raise state["answer"]
+        return state["answer"]
+
+    monkeypatch.setattr(auth, "verify_id_token", verify_id_token)
+    return state
+
+
+def test_repeat_verifications_are_served_from_the_cache(firebase):
+    cache = VerifiedTokenCache()
+    assert cache.verify("token")["uid"] == "admin"
+    assert cache.verify("token")["uid"] == "admin"
+    assert firebase["calls"] == 1
+    assert cache.stats()["hits"] == 1
+    # Only the token's hash is kept.
+    assert "token" not in cache._entries
+
+
+def test_revocation_is_rechecked_after_the_interval(firebase, clock):
+    cache = VerifiedTokenCache(revocation_interval=300)
+    cache.verify("token")
+    clock[0] += 299
+    cache.verify("token")
+    assert firebase["calls"] == 1
+
+    clock[0] += 1
+    firebase["answer"] = auth.RevokedIdTokenError("revoked")
+    with pytest.raises(auth.RevokedIdTokenError):
+        cache.verify("token")
+    # A revoked token is not served from the cache afterwards either.
+    with pytest.raises(auth.RevokedIdTokenError):
+        cache.verify("token")
+    assert firebase["calls"] == 3 and cache.stats()["size"] == 0
+
+
+def test_entries_never_outlive_the_token(firebase, clock):
+    firebase["answer"] = {"uid": "admin", "exp": clock[0] + 60}
+    cache = VerifiedTokenCache(revocation_interval=300)
+    cache.verify("token")
+    clock[0] += 60
+    firebase["answer"] = auth.ExpiredIdTokenError("expired", None)
+    with pytest.raises(auth.ExpiredIdTokenError):
+        cache.verify("token")
+    assert firebase["calls"] == 2
+
+
+def test_least_recently_used_tokens_are_evicted(firebase):
+    cache = VerifiedTokenCache(max_entries=2)
+    for token in ("a", "b", "a", "c"):
+        cache.verify(token)
+    cache.verify("a")
+    assert firebase["calls"] == 3
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
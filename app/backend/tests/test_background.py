@@ -0,0 +1,41 @@
+import asyncio
+
+from app.core.background import BackgroundTasks
+
+
+def test_stop_cancels_running_tasks():
+    cancelled = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        tasks = BackgroundTasks()
+        tasks.spawn(forever())
+        tasks.spawn(forever())
+        await asyncio.sleep(0)
+        assert len(tasks) == 2
+        await tasks.stop()
+        return len(tasks)
+
+    assert asyncio.run(scenario()) == 0
+    assert cancelled == [True, True]
+
+
+def test_finished_tasks_drop_out_and_failures_do_not_escape_wait():
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        tasks = BackgroundTasks()
+        tasks.spawn(asyncio.sleep(0))
+        tasks.spawn(fail())
+        await tasks.wait()
+        await asyncio.sleep(0)
+        return len(tasks)
+
+    assert asyncio.run(scenario()) == 0
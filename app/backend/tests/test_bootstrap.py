@@ -0,0 +1,65 @@
+from app.services.card_index import CARD_FIELDS
+
+URL = "/api/v1/bootstrap/"
+
+
+def _project(doc_id, title, **fields):
+    return dict({
+        "id": doc_id, "title": title, "slug": doc_id, "thumbnail": "", "oneLiner": "", "techStack": [], "overview": "",
+    }, **fields)
+
+
+def _writing(doc_id, published_at):
+    return {
+        "id": doc_id, "title": doc_id, "slug": doc_id, "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "publishedAt": published_at,
+    }
+
+
+def _seed(store):
+    store.docs["projects/p2"] = _project("p2", "Raft", status="draft")
+    # Written before projects had a status.
+    store.docs["projects/p1"] = _project("p1", "Kafka")
+    store.docs["writings/w1"] = _writing("w1", "2024-01-01T00:00:00Z")
+    store.docs["writings/w2"] = _writing("w2", "2024-02-01T00:00:00Z")
+
+
+def test_sections_hold_ordered_cards_with_defaults(store, client):
+    _seed(store)
+    body = client.get(URL).json()
+    assert set(body) == {"projects", "writings", "systems"}
+    projects = body["projects"]["items"]
+    assert [p["id"] for p in projects] == ["p1", "p2"]
+    assert set(projects[0]) == set(CARD_FIELDS["projects"]) | {"id"}
+    assert [p["status"] for p in projects] == ["published", "draft"]
+    assert [w["id"] for w in body["writings"]["items"]] == ["w2", "w1"]
+    assert body["systems"]["items"] == []
+
+
+def test_known_sections_come_back_unchanged(store, client):
+    _seed(store)
+    first = client.get(URL, params={"sections": "projects,writings"}).json()
+    known = f"projects:{first['projects']['etag']},writings:stale"
+    body = client.get(URL, params={"sections": "projects,writings", "known": known}).json()
+    assert body["projects"] == {"etag": first["projects"]["etag"], "unchanged": True}
+    assert body["writings"]["items"] == first["writings"]["items"]
+
+
+def test_a_write_changes_only_its_section(store, client):
+    _seed(store)
+    first = client.get(URL).json()
+    response = client.get(URL)
+    assert client.get(URL, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    created = client.post("/api/v1/projects/", json=_project("p3", "Zookeeper"))
+    assert created.status_code == 200
+    second = client.get(URL, headers={"If-None-Match": response.headers["etag"]})
+    assert second.status_code == 200
+    body = second.json()
+    assert body["projects"]["etag"] != first["projects"]["etag"]
+    assert body["writings"]["etag"] == first["writings"]["etag"]
+    assert [p["title"] for p in body["projects"]["items"]][-1] == "Zookeeper"
+
+
+def test_unknown_sections_are_a_400(store, client):
+    assert client.get(URL, params={"sections": "projects,secrets"}).status_code == 400
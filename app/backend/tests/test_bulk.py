@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import bulk, reactions
+
+PUBLISHED = "2024-01-01T00:00:00Z"
+
+
+async def _chunks(*lines):
+    for line in lines:
+        yield (json.dumps(line) if isinstance(line, dict) else line).encode("utf-8") + b"\n"
+
+
+def _import(collection, *lines):
+    return asyncio.run(bulk.import_lines(collection, _chunks(*lines)))
+
+
+def _export(collection):
+    async def collect():
+        return [json.loads(line) async for line in bulk.export_lines(collection)]
+
+    return asyncio.run(collect())
+
+
+def _entry(doc_id, title="Kafka"):
+    return {"id": doc_id, "title": title, "category": "infra", "tags": ["kafka"], "content": "logs"}
+
+
+def _thread(doc_id, **fields):
+    return dict({"id": doc_id, "title": "Queues?", "content": "", "publishedAt": PUBLISHED}, **fields)
+
+
+def test_lines_are_created_updated_or_failed(store):
+    store.docs["vault/b"] = _entry("b")
+    report = _import("vault", _entry("a"), "", _entry("b", "Pulsar"), "{not json", {"id": "c"})
+    assert [(r["line"], r["status"]) for r in report["results"]] == [
+        (1, "created"), (3, "updated"), (4, "failed"), (5, "failed"),
+    ]
+    assert (report["created"], report["updated"], report["failed"]) == (1, 1, 2)
+    assert store.docs["vault/b"]["title"] == "Pulsar"
+    assert set(store.docs["card_indexes/vault"]["items"]) == {"a", "b"}
+
+
+@pytest.mark.parametrize("doc_id", ["a/b", "a/b/c", ".", "..", "_facets"])
+def test_ids_that_are_not_plain_document_ids_fail(store, doc_id):
+    report = _import("vault", _entry(doc_id))
+    assert report["results"] == [{"line": 1, "id": doc_id, "status": "failed", "error": f"Invalid id '{doc_id}'"}]
+    assert not any(path.startswith("vault/") for path in store.docs)
+
+
+def test_slug_conflicts_fail_per_line(store):
+    writing = {
+        "title": "Logs", "slug": "logs", "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "publishedAt": PUBLISHED,
+    }
+    report = _import("writings", dict(writing, id="w1"), dict(writing, id="w2"))
+    assert [r["status"] for r in report["results"]] == ["created", "failed"]
+    assert store.docs["writings_slugs/logs"] == {"id": "w1"}
+
+
+def test_export_round_trips_threads_with_their_comments(store):
+    _import("arena", _thread("t1", responses=[{"content": "yes"}, {"content": "no", "author": "Ada"}]))
+    exported = _export("arena")
+    assert [c["content"] for c in exported[0]["responses"]] == ["yes", "no"]
+    assert exported[0]["commentCount"] == 2
+
+    # Re-importing the export overwrites the same comments instead of adding more.
+    _import("arena", *exported)
+    comments = [path for path in store.docs if path.startswith("arena/t1/comments/")]
+    assert len(comments) == 2
+
+
+def test_reimported_shard_totals_are_not_counted_twice(store, monkeypatch):
+    monkeypatch.setattr(reactions.reaction_buffer, "shards", 2)
+    store.docs["arena/t1"] = _thread("t1", likes=1, dislikes=0, commentCount=0)
+    store.docs["arena/t1/counter_shards/0"] = {"likes": 2}
+    store.docs["arena/t1/counter_shards/1"] = {"likes": 3, "dislikes": 1}
+
+    exported = _export("arena")
+    assert (exported[0]["likes"], exported[0]["dislikes"]) == (6, 1)
+    _import("arena", *exported)
+    assert not any("/counter_shards/" in path for path in store.docs)
+    assert (_export("arena")[0]["likes"], _export("arena")[0]["dislikes"]) == (6, 1)
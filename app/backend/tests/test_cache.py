@@ -0,0 +1,140 @@
+import asyncio
+
+from app.core.cache import ReadCache
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = ReadCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        waiters = [asyncio.ensure_future(cache.get_or_load(("projects", "list"), loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(scenario())
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 4
+
+
+def test_hit_after_load():
+    async def scenario():
+        cache = ReadCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return len(calls)
+
+        first = await cache.get_or_load(("projects", "list"), loader)
+        second = await cache.get_or_load(("projects", "list"), loader)
+        return first, second, calls
+
+    first, second, calls = asyncio.run(scenario())
+    assert first == second == 1
+    assert len(calls) == 1
+
+
+def test_invalidate_drops_lists_and_the_one_document():
+    cache = ReadCache()
+    cache.put(("projects", "list"), "list")
+    cache.put(("projects", "doc", "a"), "a")
+    cache.put(("projects", "doc", "b"), "b")
+    cache.put(("writings", "list"), "other")
+
+    cache.invalidate("projects", "a")
+
+    assert cache.peek(("projects", "list")) is None
+    assert cache.peek(("projects", "doc", "a")) is None
+    assert cache.peek(("projects", "doc", "b")) == "b"
+    assert cache.peek(("writings", "list")) == "other"
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    async def scenario():
+        cache = ReadCache()
+        release = asyncio.Event()
+        versions = iter(["before", "after"])
+
+        async def loader():
+            value = next(versions)
+            if value == "before":
+                await release.wait()
+            return value
+
+        stale = asyncio.ensure_future(cache.get_or_load(("projects", "list"), loader))
+        await asyncio.sleep(0)
+        cache.invalidate("projects")
+        # Arrives after the write: must not join the pre-write load.
+        fresh = await cache.get_or_load(("projects", "list"), loader)
+        release.set()
+        return cache, await stale, fresh
+
+    cache, stale, fresh = asyncio.run(scenario())
+    assert stale == "before"
+    assert fresh == "after"
+    assert cache.peek(("projects", "list")) == "after"
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def scenario():
+        cache = ReadCache(default_ttl=0, stale_ttl=60)
+        cache.put(("projects", "list"), "old")
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return "new"
+
+        served = [await cache.get_or_load(("projects", "list"), loader) for _ in range(3)]
+        await asyncio.sleep(0)
+        return cache, served, calls
+
+    cache, served, calls = asyncio.run(scenario())
+    assert served == ["old"] * 3
+    assert len(calls) == 1
+    assert cache.stats()["stale_hits"] == 3
+
+
+def test_failed_load_is_not_cached():
+    async def scenario():
+        cache = ReadCache()
+        attempts = []
+
+        async def loader():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        try:
+            await cache.get_or_load(("projects", "list"), loader)
+        except RuntimeError:
+            pass
+        return cache, await cache.get_or_load(("projects", "list"), loader)
+
+    cache, value = asyncio.run(scenario())
+    assert value == "ok"
+    assert cache.stats()["load_errors"] == 1
+
+
+def test_lru_eviction():
+    cache = ReadCache(max_entries=2)
+    cache.put(("projects", "doc", "a"), "a")
+    cache.put(("projects", "doc", "b"), "b")
+    cache.peek(("projects", "doc", "a"))
+    cache.put(("projects", "doc", "c"), "c")
+
+    assert cache.peek(("projects", "doc", "b")) is None
+    assert cache.peek(("projects", "doc", "a")) == "a"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,55 @@
+import manage
+
+from app.services.card_index import INDEX_COLLECTION
+
+INDEX = INDEX_COLLECTION + "/"
+
+
+def _entry(doc_id, title, **fields):
+    return dict({"id": doc_id, "title": title, "category": "infra", "tags": ["kafka"], "content": "logs"}, **fields)
+
+
+def test_rebuild_indexes_every_document(store, capsys):
+    store.docs["vault/a"] = _entry("a", "Kafka")
+    store.docs["vault/b"] = _entry("b", "Raft", category="db")
+
+    assert manage.main(["rebuild-card-index", "vault"]) == 0
+    assert "Rebuilt card index for 'vault': 2 cards" in capsys.readouterr().out
+    assert store.docs[INDEX + "vault"]["items"] == {
+        "a": {"id": "a", "title": "Kafka", "category": "infra", "tags": ["kafka"]},
+        "b": {"id": "b", "title": "Raft", "category": "db", "tags": ["kafka"]},
+    }
+
+
+def test_rebuild_drops_cards_of_deleted_documents(store):
+    store.docs["vault/a"] = _entry("a", "Kafka")
+    store.docs[INDEX + "vault"] = {"items": {"gone": {"id": "gone", "title": "Old"}}}
+    manage.main(["rebuild-card-index", "vault"])
+    assert list(store.docs[INDEX + "vault"]["items"]) == ["a"]
+
+
+def test_check_reports_missing_orphaned_and_stale_cards(store, capsys):
+    store.docs["vault/a"] = _entry("a", "Kafka")
+    store.docs["vault/b"] = _entry("b", "Raft")
+    manage.main(["rebuild-card-index", "vault"])
+    assert manage.main(["check-card-index", "vault"]) == 0
+    assert "[PASS] vault" in capsys.readouterr().out
+
+    # Writes that bypassed the repository leave the index behind.
+    store.docs["vault/a"]["title"] = "Pulsar"
+    store.docs["vault/c"] = _entry("c", "Paxos")
+    del store.docs["vault/b"]
+    assert manage.main(["check-card-index", "vault"]) == 1
+    assert "[FAIL] vault: missing=c; orphaned=b; stale=a" in capsys.readouterr().out
+
+
+def test_card_projections_are_served_from_the_index(store, client):
+    store.docs["vault/a"] = _entry("a", "Kafka")
+    manage.main(["rebuild-card-index", "vault"])
+    # Only the index knows this document, so a hit proves the collection was not queried.
+    store.docs[INDEX + "vault"]["items"]["z"] = {"id": "z", "title": "Indexed", "category": "db", "tags": []}
+
+    cards = client.get("/api/v1/vault/", params={"fields": "title,category"}).json()
+    assert [card["id"] for card in cards] == ["z", "a"]
+    full = client.get("/api/v1/vault/", params={"fields": "title,content"}).json()
+    assert [item["id"] for item in full] == ["a"]
@@ -0,0 +1,81 @@
+import pytest
+
+from app.core import circuit_breaker
+from app.core.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = CircuitBreaker(window=10, min_calls=5, failure_rate=0.5)
+    _fail(breaker, 4)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_opens_at_failure_rate_and_rejects(clock):
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_rate=0.5, cooldown=30)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    snapshot = breaker.snapshot()
+    assert snapshot["rejected"] == 1 and snapshot["opened"] == 1
+    assert snapshot["retry_in"] == 30
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.75)
+    _fail(breaker, 2)
+    for _ in range(4):
+        breaker.allow()
+        breaker.record_success()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, cooldown=30)
+    _fail(breaker, 2)
+    clock[0] += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_restarts_the_cooldown(clock):
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, cooldown=30)
+    _fail(breaker, 2)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, cooldown=30)
+    _fail(breaker, 2)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.allow()
@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+    ("identity", None),
+])
+def test_choose_encoding_without_brotli(monkeypatch, accept, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(accept) == expected
+
+
+def test_brotli_wins_when_installed_and_preferred(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, min_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("x" * 1000)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("x" * 10)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_buffered_responses():
+    client = _app()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "x" * 1000
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_cached_reads_are_compressed_once_per_encoding(store, client, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    store.docs["vault/a"] = {"id": "a", "title": "Kafka", "category": "infra", "tags": [], "content": "log " * 500}
+    # httpx asks for gzip unless told otherwise.
+    plain = client.get("/api/v1/vault/a", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    before = compression.stats()
+
+    for _ in range(2):
+        response = client.get("/api/v1/vault/a", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+        assert response.content == plain.content
+
+    after = compression.stats()
+    assert after["compressed"] - before["compressed"] == 1
+    assert after["cached_hits"] - before["cached_hits"] == 1
+    # The gzip ETag validates too.
+    etag = response.headers["etag"]
+    assert client.get("/api/v1/vault/a", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.email import EmailDeliveryError
+from app.core.firebase import async_db
+from app.services import email_outbox
+from app.services.email_outbox import LEASE, EmailOutbox
+
+OUTBOX = "email_outbox/"
+
+
+@pytest.fixture
+def deliveries(monkeypatch):
+    """Outcomes to answer deliveries with, in order (None = delivered); records what was sent."""
+    outcomes = []
+    sent = []
+
+    async def deliver(subject, recipients, body):
+        sent.append(subject)
+        outcome = outcomes.pop(0) if outcomes else None
+        if outcome is not None:
+            raise outcome
+
+    monkeypatch.setattr(email_outbox.email_service, "deliver", deliver)
+    return outcomes, sent
+
+
+def _entry(store, entry_id, **fields):
+    now = datetime.utcnow() - timedelta(seconds=1)
+    store.docs[OUTBOX + entry_id] = dict({
+        "subject": entry_id, "recipients": ["a@example.com"], "body": "hi",
+        "attempts": 0, "nextAttemptAt": now, "leaseUntil": now, "lastError": None, "createdAt": now,
+    }, **fields)
+
+
+def test_delivered_entries_are_deleted(store, deliveries):
+    _, sent = deliveries
+    _entry(store, "one")
+    _entry(store, "two")
+    assert asyncio.run(EmailOutbox().drain()) == 2
+    assert sorted(sent) == ["one", "two"]
+    assert not any(path.startswith(OUTBOX) for path in store.docs)
+
+
+def test_leased_and_future_entries_are_skipped(store, deliveries):
+    _, sent = deliveries
+    later = datetime.utcnow() + timedelta(minutes=1)
+    _entry(store, "leased", leaseUntil=later)
+    _entry(store, "later", nextAttemptAt=later)
+    assert asyncio.run(EmailOutbox().drain()) == 0
+    assert sent == []
+
+
+def test_claim_takes_a_lease(store):
+    # The lease is what keeps a second instance from sending the same entry.
+    _entry(store, "one")
+    now = datetime.utcnow()
+
+    async def claim():
+        return await email_outbox._claim(async_db.transaction(), async_db.collection("email_outbox").document("one"), now)
+
+    assert asyncio.run(claim())["subject"] == "one"
+    assert store.docs[OUTBOX + "one"]["leaseUntil"] == now + LEASE
+    assert asyncio.run(claim()) is None
+
+
+def test_retryable_failures_back_off_exponentially(store, deliveries):
+    outcomes, _ = deliveries
+    outbox = EmailOutbox(base_delay=30, max_delay=3600, max_attempts=5)
+    _entry(store, "flaky")
+
+    delays = []
+    for _ in range(3):
+        outcomes.append(EmailDeliveryError("503", retryable=True))
+        before = datetime.utcnow()
+        assert asyncio.run(outbox.drain()) == 1
+        entry = store.docs[OUTBOX + "flaky"]
+        delays.append(round((entry["nextAttemptAt"] - before).total_seconds()))
+        # Due again now, so the next drain retries it.
+        entry["nextAttemptAt"] = datetime.utcnow() - timedelta(seconds=1)
+
+    assert delays == [30, 60, 120]
+    assert store.docs[OUTBOX + "flaky"]["attempts"] == 3
+    assert store.docs[OUTBOX + "flaky"]["lastError"] == "503"
+
+
+def test_backoff_is_capped(store, deliveries):
+    outcomes, _ = deliveries
+    outcomes.append(EmailDeliveryError("503"))
+    _entry(store, "flaky", attempts=8)
+    before = datetime.utcnow()
+    asyncio.run(EmailOutbox(base_delay=30, max_delay=600, max_attempts=20).drain())
+    delay = (store.docs[OUTBOX + "flaky"]["nextAttemptAt"] - before).total_seconds()
+    assert round(delay) == 600
+
+
+@pytest.mark.parametrize("attempts, retryable", [(0, False), (4, True)])
+def test_hopeless_entries_go_to_dead_letters(store, deliveries, attempts, retryable):
+    outcomes, _ = deliveries
+    outcomes.append(EmailDeliveryError("400 bad request", retryable=retryable))
+    _entry(store, "doomed", attempts=attempts)
+    outbox = EmailOutbox(max_attempts=5)
+    asyncio.run(outbox.drain())
+
+    assert OUTBOX + "doomed" not in store.docs
+    dead = store.docs["email_dead_letters/doomed"]
+    assert dead["attempts"] == attempts + 1 and dead["lastError"] == "400 bad request"
+    assert outbox.stats()["dead"] == 1
+
+
+def test_worker_drains_when_notified(store, deliveries, monkeypatch):
+    _, sent = deliveries
+    monkeypatch.setattr(email_outbox.email_service, "endpoint", "https://formspree.example")
+    outbox = EmailOutbox(poll_interval=3600)
+
+    async def scenario():
+        outbox.start()
+        await asyncio.sleep(0.01)
+        _entry(store, "late")
+        outbox.notify()
+        await asyncio.sleep(0.01)
+        running = outbox.stats()["running"]
+        await outbox.close()
+        return running
+
+    assert asyncio.run(scenario()) is True
+    assert sent == ["late"]
+    assert outbox.stats()["running"] is False
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.services import explanations
+from app.services.gemini import PRIMARY_MODEL, ExplanationError
+
+URL = "/api/v1/projects/slug/kafka/explain/stream"
+
+
+@pytest.fixture
+def project(store):
+    store.docs["projects/p1"] = {
+        "id": "p1", "title": "Kafka", "slug": "kafka", "thumbnail": "", "oneLiner": "", "techStack": [], "overview": "",
+    }
+    store.docs["projects_slugs/kafka"] = {"id": "p1"}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Chunks to stream; an exception in the list is raised at that point."""
+    chunks = []
+    closed = []
+
+    async def generate_explanation_stream(prompt):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk, PRIMARY_MODEL
+        finally:
+            closed.append(True)
+
+    explanations.explanation_cache.clear()
+    monkeypatch.setattr(explanations, "generate_explanation_stream", generate_explanation_stream)
+    return chunks, closed
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chunks_stream_as_events_then_replay_from_the_cache(project, client, upstream):
+    chunks, closed = upstream
+    chunks.extend(["Deep ", "dive"])
+    response = client.get(URL, params={"persona": "engineer"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in response.headers
+    assert _events(response) == [
+        ("chunk", {"text": "Deep "}), ("chunk", {"text": "dive"}), ("done", {"cached": False}),
+    ]
+    assert closed == [True]
+
+    assert _events(client.get(URL, params={"persona": "engineer"})) == [
+        ("chunk", {"text": "Deep dive"}), ("done", {"cached": True}),
+    ]
+
+
+def test_a_failure_mid_stream_ends_with_a_failed_event(store, project, client, upstream):
+    chunks, closed = upstream
+    chunks.extend(["Deep ", ExplanationError("upstream went away")])
+    assert _events(client.get(URL)) == [
+        ("chunk", {"text": "Deep "}), ("failed", {"detail": "upstream went away"}),
+    ]
+    assert closed == [True]
+    # A partial answer is not stored.
+    assert not any(path.startswith("explanations/") for path in store.docs)
+
+
+def test_unknown_projects_are_a_404(store, client, upstream):
+    assert client.get(URL).status_code == 404
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.services import explanation_jobs
+from app.services.explanation_jobs import PregenerationQueue
+from app.services.gemini import PERSONAS, ExplanationError
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Failures to answer generations with per persona (popped in order); records every call."""
+    failures = {}
+    calls = []
+
+    async def get_explanation(project_data, persona):
+        calls.append(persona)
+        if failures.get(persona):
+            raise ExplanationError(failures[persona].pop(0))
+        return f"{persona} text", False
+
+    async def is_cached(project_data, persona):
+        return False
+
+    monkeypatch.setattr(explanation_jobs, "get_gemini_client", lambda: object())
+    monkeypatch.setattr(explanation_jobs.explanations, "get_explanation", get_explanation)
+    monkeypatch.setattr(explanation_jobs.explanations, "is_cached", is_cached)
+    return failures, calls
+
+
+def _run(queue, *project_ids):
+    async def scenario():
+        # Queued before the workers start, so nothing is picked up in between.
+        for project_id in project_ids:
+            await queue.enqueue(project_id)
+        queue.start()
+        await queue.join()
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_saved_projects_get_every_persona_generated(store, gemini):
+    _, calls = gemini
+    store.docs["projects/p1"] = {"slug": "kafka"}
+    queue = PregenerationQueue(rate_per_minute=0)
+    _run(queue, "p1", "p1")
+
+    job = store.docs["explanation_jobs/p1"]
+    assert job["status"] == "done" and job["slug"] == "kafka"
+    assert job["personas"] == {persona: "done" for persona in PERSONAS}
+    # The second enqueue of a queued project is a no-op.
+    assert sorted(calls) == sorted(PERSONAS)
+    assert queue.stats()["enqueued"] == 1 and queue.stats()["workers"] == 0
+
+
+def test_failures_are_retried_then_recorded(store, gemini):
+    failures, _ = gemini
+    store.docs["projects/p1"] = {"slug": "kafka"}
+    persona = PERSONAS[0]
+    failures[persona] = ["503", "503", "503"]
+    queue = PregenerationQueue(rate_per_minute=0, max_attempts=3, retry_delay=0)
+    _run(queue, "p1")
+
+    job = store.docs["explanation_jobs/p1"]
+    assert job["status"] == "failed" and job["personas"][persona] == "failed"
+    assert job["attempts"] == 3 and job["error"] == "503"
+    assert queue.stats()["retries"] == 2
+
+
+def test_jobs_for_deleted_projects_are_dropped(store, gemini):
+    _, calls = gemini
+    _run(PregenerationQueue(rate_per_minute=0), "gone")
+    assert calls == [] and "explanation_jobs/gone" not in store.docs
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.services import explanations
+from app.services.gemini import FALLBACK_MODEL, PRIMARY_MODEL, ExplanationError
+
+PROJECT = {"id": "p1", "slug": "kafka", "title": "Kafka", "techStack": ["kafka"]}
+
+
+@pytest.fixture
+def gemini(store, monkeypatch):
+    """Answers generations with the (text, model) pairs or exceptions in `answers`, in order."""
+    answers = []
+    calls = []
+
+    async def generate_explanation(prompt):
+        calls.append(prompt)
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    async def generate_explanation_stream(prompt):
+        calls.append(prompt)
+        text, model = answers.pop(0)
+        middle = len(text) // 2
+        for chunk in (text[:middle], text[middle:]):
+            yield chunk, model
+
+    explanations.explanation_cache.clear()
+    monkeypatch.setattr(explanations, "generate_explanation", generate_explanation)
+    monkeypatch.setattr(explanations, "generate_explanation_stream", generate_explanation_stream)
+    return answers, calls
+
+
+def _stored(store):
+    return [data for path, data in store.docs.items() if path.startswith("explanations/")]
+
+
+def _explain(persona="engineer", project=PROJECT):
+    return asyncio.run(explanations.get_explanation(project, persona))
+
+
+def test_primary_answers_are_cached_by_content(store, gemini):
+    answers, calls = gemini
+    answers.append(("deep dive", PRIMARY_MODEL))
+    assert _explain() == ("deep dive", False)
+    assert _explain() == ("deep dive", True)
+    assert len(calls) == 1
+    assert [record["model"] for record in _stored(store)] == [PRIMARY_MODEL]
+
+    # Firestore answers once the in-process entry is gone.
+    explanations.explanation_cache.clear()
+    assert _explain() == ("deep dive", True) and len(calls) == 1
+    # Editing a field the prompt uses asks for a new explanation.
+    answers.append(("new dive", PRIMARY_MODEL))
+    assert _explain(project=dict(PROJECT, techStack=["pulsar"])) == ("new dive", False)
+
+
+def test_fallback_answers_are_served_but_not_cached(store, gemini):
+    answers, calls = gemini
+    answers.extend([("older model", FALLBACK_MODEL), ("primary", PRIMARY_MODEL)])
+    assert _explain() == ("older model", False)
+    assert _stored(store) == []
+    assert _explain() == ("primary", False)
+    assert len(calls) == 2
+
+
+def test_failures_are_not_cached(store, gemini):
+    answers, calls = gemini
+    answers.extend([ExplanationError("unavailable"), ("primary", PRIMARY_MODEL)])
+    with pytest.raises(ExplanationError):
+        _explain()
+    assert _explain() == ("primary", False)
+
+
+def test_concurrent_misses_share_one_generation(store, gemini):
+    answers, calls = gemini
+    answers.append(("deep dive", PRIMARY_MODEL))
+
+    async def scenario():
+        return await asyncio.gather(*(explanations.get_explanation(PROJECT, "engineer") for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert sorted(results) == [("deep dive", False), ("deep dive", True), ("deep dive", True)]
+    assert len(calls) == 1
+
+
+def _stream(persona="engineer"):
+    async def collect():
+        cached, chunks = await explanations.open_stream(PROJECT, persona)
+        return cached, [chunk async for chunk in chunks]
+
+    return asyncio.run(collect())
+
+
+def test_streams_store_only_complete_primary_answers(store, gemini):
+    answers, _ = gemini
+    answers.extend([("older model", FALLBACK_MODEL), ("deep dive", PRIMARY_MODEL)])
+    assert _stream() == (False, ["older", " model"])
+    assert _stored(store) == []
+    assert _stream() == (False, ["deep", " dive"])
+    assert _stream() == (True, ["deep dive"])
@@ -0,0 +1,80 @@
+import asyncio
+
+from app.services.facets import FacetIndex, _Facets, cache_key, parse_filters
+
+FIELDS = {"category": "any", "tags": "all"}
+
+
+def _facets(**docs):
+    facets = _Facets(FIELDS)
+    for doc_id, data in docs.items():
+        facets.add(doc_id, data)
+    return facets
+
+
+def _select(facets, **filters):
+    return sorted(facets.ids_of(facets.select(filters)))
+
+
+def test_parse_filters_and_cache_key():
+    filters = parse_filters({"tags": " b, a ,,", "category": None, "series": ""})
+    assert filters == {"tags": ["b", "a"]}
+    assert cache_key(filters) == cache_key({"tags": ["a", "b"]})
+
+
+def test_list_facets_need_every_value_and_single_facets_any():
+    facets = _facets(
+        a={"category": "infra", "tags": ["kafka", "queues"]},
+        b={"category": "infra", "tags": ["kafka"]},
+        c={"category": "db", "tags": ["queues"]},
+    )
+    assert _select(facets) == ["a", "b", "c"]
+    assert _select(facets, tags=["kafka", "queues"]) == ["a"]
+    assert _select(facets, category=["infra", "db"]) == ["a", "b", "c"]
+    assert _select(facets, category=["db"], tags=["queues"]) == ["c"]
+    assert _select(facets, tags=["unknown"]) == []
+
+
+def test_counts_are_within_the_selection():
+    facets = _facets(
+        a={"category": "infra", "tags": ["kafka", "queues"]},
+        b={"category": "infra", "tags": ["kafka"]},
+        c={"category": "db", "tags": ["queues"]},
+    )
+    counts = facets.counts(facets.select({"tags": ["kafka"]}))
+    assert counts == {"category": {"infra": 2}, "tags": {"kafka": 2, "queues": 1}}
+
+
+def test_update_and_remove_clear_old_bits_and_reuse_positions():
+    facets = _facets(a={"category": "infra", "tags": ["kafka"]}, b={"category": "db", "tags": []})
+    facets.add("a", {"category": "db", "tags": ["raft"]})
+    assert "kafka" not in facets.bits["tags"] and "infra" not in facets.bits["category"]
+    assert _select(facets, category=["db"]) == ["a", "b"]
+
+    position = facets.positions["b"]
+    facets.remove("b")
+    assert _select(facets) == ["a"]
+    facets.add("c", {"category": "db", "tags": ["raft"]})
+    assert facets.positions["c"] == position
+    assert _select(facets, tags=["raft"]) == ["a", "c"]
+
+
+def test_rebuild_replays_writes_made_while_it_streams(store):
+    store.docs["vault/a"] = {"category": "infra", "tags": ["kafka"]}
+    store.docs["vault/b"] = {"category": "db", "tags": ["raft"]}
+    store.latency = 0.001
+
+    async def scenario():
+        index = FacetIndex()
+        rebuild = asyncio.ensure_future(index.rebuild())
+        await asyncio.sleep(0)
+        assert index.stats()["builds"] == 0
+        # Lands while the scan runs: the rebuilt bitsets must still reflect it.
+        index.remove("vault", "b")
+        index.upsert("vault", "c", {"category": "infra", "tags": ["kafka"]})
+        await rebuild
+        return await index.select("vault", {"tags": ["kafka"]}), await index.summary("vault", {})
+
+    kafka, summary = asyncio.run(scenario())
+    assert sorted(kafka) == ["a", "c"]
+    assert summary == {"total": 2, "facets": {"category": {"infra": 2}, "tags": {"kafka": 2}}}
@@ -0,0 +1,35 @@
+from app.core.http_cache import CACHE_CONTROL
+
+URL = "/api/v1/vault/a"
+
+
+def _entry(title="Kafka"):
+    return {"id": "a", "title": title, "category": "infra", "tags": ["kafka"], "content": "logs"}
+
+
+def test_reads_carry_an_etag_and_cache_control(store, client):
+    store.docs["vault/a"] = _entry()
+    response = client.get(URL)
+    assert response.status_code == 200 and response.json()["title"] == "Kafka"
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == CACHE_CONTROL["vault"]
+    assert "last-modified" not in response.headers
+
+
+def test_matching_validators_get_a_304(store, client):
+    store.docs["vault/a"] = _entry()
+    etag = client.get(URL).headers["etag"]
+    for header in (etag, "W/" + etag, f'"other", {etag}', "*", etag[:-1] + '-gzip"'):
+        response = client.get(URL, headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+        assert response.content == b"" and response.headers["etag"] == etag
+    assert client.get(URL, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_writes_change_the_etag(store, client):
+    store.docs["vault/a"] = _entry()
+    etag = client.get(URL).headers["etag"]
+    assert client.put(URL, json=_entry("Pulsar")).status_code == 200
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["title"] == "Pulsar"
+    assert response.headers["etag"] != etag
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.limiter import MemoryStorage, RateLimiter, parse_limit, storage_from_uri
+
+
+def test_parse_limit():
+    assert parse_limit("5/minute") == (5, 60.0)
+    assert parse_limit("100/10minutes") == (100, 600.0)
+    assert parse_limit(" 2 / second ") == (2, 1.0)
+    with pytest.raises(ValueError):
+        parse_limit("five per minute")
+
+
+def test_limit_within_one_window():
+    limiter = RateLimiter({"react": "3/minute"})
+    start = 6000.0  # the start of a window
+    assert [limiter.hit("react", "a", start + i) for i in range(3)] == [None, None, None]
+    retry_after = limiter.hit("react", "a", start + 3)
+    # The full window still weighs on the next one, so this can exceed a period.
+    assert retry_after is not None and 0 < retry_after <= 120
+    # Other clients have their own counters.
+    assert limiter.hit("react", "b", start + 3) is None
+
+
+def test_previous_window_decays():
+    limiter = RateLimiter({"react": "4/minute"})
+    start = 6000.0
+    for i in range(4):
+        assert limiter.hit("react", "a", start + i) is None
+    # Halfway through the next window the previous four count as two.
+    assert limiter.hit("react", "a", start + 90) is None
+    assert limiter.hit("react", "a", start + 90) is None
+    assert limiter.hit("react", "a", start + 90) is not None
+    # Two windows later nothing of it is left.
+    assert limiter.hit("react", "a", start + 180) is None
+
+
+def test_retry_after_is_when_a_hit_fits_again():
+    limiter = RateLimiter({"react": "2/minute"})
+    start = 6000.0
+    limiter.hit("react", "a", start)
+    limiter.hit("react", "a", start)
+    retry_after = limiter.hit("react", "a", start + 30)
+    assert retry_after is not None
+    assert limiter.hit("react", "a", start + 30 + retry_after - 1) is not None
+    assert limiter.hit("react", "a", start + 30 + retry_after + 0.01) is None
+
+
+def test_least_recently_seen_clients_are_dropped():
+    limiter = RateLimiter({"react": "1/minute"}, max_keys=2)
+    limiter.hit("react", "a", 6000.0)
+    limiter.hit("react", "b", 6000.0)
+    limiter.hit("react", "c", 6000.0)
+    assert limiter.stats()["tracked"] == 2
+    # "a" was forgotten, so it starts over.
+    assert limiter.hit("react", "a", 6000.0) is None
+
+
+def test_instances_converge_through_the_store():
+    async def scenario():
+        storage = MemoryStorage()
+        first = RateLimiter({"react": "10/minute"}, storage=storage)
+        second = RateLimiter({"react": "10/minute"}, storage=storage)
+        now = time.time()
+        for _ in range(3):
+            first.hit("react", "a", now)
+        for _ in range(4):
+            second.hit("react", "a", now)
+        await first.sync()
+        await second.sync()
+        # The first instance had nothing new to push but still picks up the other's hits.
+        await first.sync()
+        key = "react:a"
+        return first._windows[key].current, second._windows[key].current
+
+    assert asyncio.run(scenario()) == (7, 7)
+
+
+def test_background_sync_pushes_hits_until_closed():
+    async def scenario():
+        storage = MemoryStorage()
+        limiter = RateLimiter({"react": "10/minute"}, storage=storage, sync_interval=0.01)
+        limiter.start()
+        limiter.hit("react", "a")
+        await asyncio.sleep(0.05)
+        running = limiter.stats()["running"]
+        # Hits made since the last pass are pushed on close.
+        limiter.hit("react", "a")
+        await limiter.close()
+        return running, limiter.stats(), sum(storage._counts.values())
+
+    running, stats, stored = asyncio.run(scenario())
+    assert running and not stats["running"]
+    assert stats["syncs"] >= 2 and stored == 2
+
+
+def test_storage_from_uri():
+    assert storage_from_uri("") is None
+    assert isinstance(storage_from_uri("memory://"), MemoryStorage)
+    with pytest.raises(ValueError):
+        storage_from_uri("memcached://localhost")
@@ -0,0 +1,55 @@
+import asyncio
+
+import fake_firestore
+
+from app.services import email_outbox
+from app.services.message_ingest import MessageIngestBuffer
+
+
+def _message(message_id):
+    return {"id": message_id, "name": "Ada", "email": "ada@example.com", "type": "internship", "message": "hi"}
+
+
+def _email(message_id):
+    return (f"New message {message_id}", ["owner@example.com"], "hi")
+
+
+def _submit_all(buffer, count):
+    async def scenario():
+        await asyncio.gather(*(buffer.submit(_message(f"m{i}"), _email(f"m{i}")) for i in range(count)))
+        await buffer.close()
+
+    asyncio.run(scenario())
+
+
+def test_messages_in_one_window_share_a_batch(store, monkeypatch):
+    monkeypatch.setattr(email_outbox.email_service, "endpoint", "https://formspree.example")
+    buffer = MessageIngestBuffer(window=0.01)
+    _submit_all(buffer, 5)
+    assert sum(path.startswith("messages/") for path in store.docs) == 5
+    # Each message carries its outbox entry in the same batch.
+    assert sum(path.startswith("email_outbox/") for path in store.docs) == 5
+    assert buffer.stats()["batches"] == 1 and buffer.stats()["written"] == 5
+
+
+def test_full_batches_commit_without_waiting_for_the_window(store):
+    buffer = MessageIngestBuffer(window=3600, max_batch=2)
+    _submit_all(buffer, 4)
+    assert buffer.stats()["batches"] == 2 and buffer.stats()["waiting"] == 0
+
+
+def test_a_failed_commit_fails_every_request_in_it(store, monkeypatch):
+    buffer = MessageIngestBuffer(window=0.01)
+
+    async def unavailable(*args, **kwargs):
+        raise RuntimeError("unavailable")
+
+    monkeypatch.setattr(fake_firestore.AsyncWriteBatch, "commit", unavailable)
+
+    async def scenario():
+        return await asyncio.gather(*(buffer.submit(_message(f"m{i}")) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not any(path.startswith("messages/") for path in store.docs)
+    assert buffer.stats()["failed"] == 3
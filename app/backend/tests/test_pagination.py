@@ -0,0 +1,127 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import MAX_PAGE_SIZE, PageParams, decode_cursor, encode_cursor
+from app.services.card_index import page_cards
+
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trip():
+    for values in (["Kafka", "abc"], [3, "id-1"], [None, "x"], [datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), "d"]):
+        assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    token = encode_cursor(["a" * 31 + "?&/+", "id"])
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+@pytest.mark.parametrize("token", [
+    "not base64 at all!",
+    _raw("{not json"),
+    _raw('{"a": 1}'),
+    _raw('["only one"]'),
+    _raw('[1, 2, 3]'),
+    _raw('[{"$dt": "yesterday"}, "id"]'),
+    _raw('[{"$dt": 5}, "id"]'),
+    "ünïcode",
+])
+def test_malformed_cursor_is_a_400(token):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(token)
+    assert raised.value.status_code == 400
+
+
+def _params(**overrides):
+    args = dict(
+        limit=None, cursor=None, order_by=None, fields=None,
+        default_order="-publishedAt", sortable=("publishedAt", "title"), selectable=("title", "slug", "publishedAt"),
+    )
+    args.update(overrides)
+    return PageParams(**args)
+
+
+def test_page_params_ordering_and_projection():
+    params = _params(order_by="title", fields="slug")
+    assert params.order_field == "title" and not params.descending
+    # The id and the ordering field always come along for the next cursor.
+    assert params.fields == ["id", "slug", "title"]
+    assert not params.is_default
+
+    params = _params()
+    assert params.order_field == "publishedAt" and params.descending
+    assert params.is_default
+
+
+@pytest.mark.parametrize("overrides", [{"order_by": "content"}, {"fields": "title,secret"}])
+def test_page_params_reject_unknown_fields(overrides):
+    with pytest.raises(HTTPException) as raised:
+        _params(**overrides)
+    assert raised.value.status_code == 400
+
+
+def test_cache_key_separates_pages():
+    first = _params(limit=10)
+    second = _params(limit=10, cursor=encode_cursor(["2024-01-01", "x"]))
+    assert first.cache_key() != second.cache_key()
+    assert first.cache_key() == _params(limit=10).cache_key()
+    assert MAX_PAGE_SIZE == 100
+
+
+@pytest.mark.parametrize("values", [
+    ["2024-01-01", "a/b"],
+    ["2024-01-01", ""],
+    ["2024-01-01", ".."],
+    ["2024-01-01", 7],
+    [["a", "list"], "id"],
+    [{"not": "a date"}, "id"],
+])
+def test_cursor_values_and_ids_are_checked(values):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(_raw(json.dumps(values)))
+    assert raised.value.status_code == 400
+
+
+def test_card_pages_order_mixed_types_like_firestore():
+    cards = [
+        {"id": "s", "readingTime": "abc"},
+        {"id": "n", "readingTime": None},
+        {"id": "i", "readingTime": 5},
+        {"id": "f", "readingTime": 2.5},
+    ]
+    params = _params(order_by="readingTime", sortable=("readingTime",), selectable=("readingTime",))
+    items, _ = page_cards(cards, params)
+    assert [card["id"] for card in items] == ["n", "f", "i", "s"]
+
+    # A cursor whose value has another type than the field is still just a position.
+    params = _params(
+        order_by="readingTime", cursor=encode_cursor(["abc", "a"]), sortable=("readingTime",), selectable=("readingTime",),
+    )
+    assert [card["id"] for card in page_cards(cards, params)[0]] == ["s"]
+
+
+WRITING = {
+    "title": "Logs", "slug": "logs", "thumbnail": "", "excerpt": "", "content": "", "readingTime": 5,
+    "tags": ["a"], "publishedAt": "2024-01-01T00:00:00Z",
+}
+
+
+@pytest.mark.parametrize("query", ["fields=title&order_by=readingTime", "tags=a&order_by=readingTime"])
+def test_cursor_of_another_type_is_not_a_500(client, query):
+    assert client.post("/api/v1/writings/", json=WRITING).status_code == 200
+    cursor = encode_cursor(["abc", "zz"])
+    response = client.get(f"/api/v1/writings/?{query}&limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_cursor_with_a_path_id_is_a_400(client):
+    response = client.get(f"/api/v1/writings/?limit=1&order_by=title&cursor={encode_cursor(['a', 'a/b'])}")
+    assert response.status_code == 400
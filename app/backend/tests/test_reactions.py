@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.services.reactions import ReactionBuffer
+
+THREAD = {"title": "Queues?", "content": "", "likes": 1, "dislikes": 0}
+
+
+@pytest.fixture
+def threads(store):
+    store.docs["arena/t1"] = dict(THREAD)
+    store.docs["arena/t2"] = dict(THREAD)
+    return store
+
+
+def test_flush_applies_all_pending_clicks_in_one_batch(threads):
+    buffer = ReactionBuffer(flush_threshold=1000)
+
+    async def scenario():
+        for _ in range(3):
+            buffer.add("t1", "likes")
+        buffer.add("t2", "dislikes")
+        assert buffer.pending("t1", "likes") == 3
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert threads.docs["arena/t1"]["likes"] == 4
+    assert threads.docs["arena/t2"]["dislikes"] == 1
+    assert buffer.pending("t1", "likes") == 0
+
+
+def test_reaching_the_threshold_flushes(threads):
+    buffer = ReactionBuffer(flush_threshold=2)
+
+    async def scenario():
+        buffer.add("t1", "likes")
+        assert threads.docs["arena/t1"]["likes"] == 1
+        buffer.add("t1", "likes")
+        await asyncio.sleep(0)
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert threads.docs["arena/t1"]["likes"] == 3
+
+
+def test_periodic_flusher_runs_until_closed(threads):
+    buffer = ReactionBuffer(flush_interval=0.01, flush_threshold=1000)
+
+    async def scenario():
+        buffer.start()
+        buffer.add("t1", "likes")
+        await asyncio.sleep(0.05)
+        flushed = threads.docs["arena/t1"]["likes"]
+        buffer.add("t1", "likes")
+        await buffer.close()
+        return flushed
+
+    assert asyncio.run(scenario()) == 2
+    assert threads.docs["arena/t1"]["likes"] == 3
+
+
+def test_clicks_on_deleted_threads_do_not_block_the_rest(threads):
+    buffer = ReactionBuffer(flush_threshold=1000)
+    del threads.docs["arena/t2"]
+
+    async def scenario():
+        buffer.add("t1", "likes")
+        buffer.add("t2", "likes")
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert threads.docs["arena/t1"]["likes"] == 2
+    assert "arena/t2" not in threads.docs
+    assert buffer.pending("t2", "likes") == 0
+
+
+def test_failed_flush_keeps_the_clicks(threads, monkeypatch):
+    buffer = ReactionBuffer(flush_threshold=1000)
+
+    async def unavailable(pending):
+        raise RuntimeError("unavailable")
+
+    async def scenario():
+        buffer.add("t1", "likes", 2)
+        monkeypatch.setattr(buffer, "_write", unavailable)
+        await buffer.flush()
+        assert buffer.pending("t1", "likes") == 2
+        monkeypatch.undo()
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert threads.docs["arena/t1"]["likes"] == 3
+
+
+def test_sharded_clicks_land_on_shards(threads):
+    buffer = ReactionBuffer(flush_threshold=1000, shards=4)
+
+    async def scenario():
+        for _ in range(5):
+            buffer.add("t1", "likes")
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    shards = [data for path, data in threads.docs.items() if path.startswith("arena/t1/counter_shards/")]
+    assert len(shards) == 1 and shards[0]["likes"] == 5
+    assert threads.docs["arena/t1"]["likes"] == 1
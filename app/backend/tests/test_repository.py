@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.firebase import async_db
+from app.models.content import VaultEntry, Writing
+from app.repository import Repository, RepositoryHook, notify_written
+
+
+class Recorder(RepositoryHook):
+    def __init__(self):
+        self.events = []
+        self.operations = []
+
+    def written(self, collection, doc_id, data):
+        self.events.append(("written", collection, doc_id, data.get("title")))
+
+    def deleted(self, collection, doc_id):
+        self.events.append(("deleted", collection, doc_id))
+
+    def observed(self, collection, operation, seconds):
+        self.operations.append(operation)
+
+
+def _entry(doc_id, title="Kafka"):
+    return {"id": doc_id, "title": title, "category": "infra", "tags": ["kafka"], "content": "logs"}
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def vault(recorder):
+    return Repository("vault", VaultEntry, not_found="Vault entry not found", hooks=[recorder])
+
+
+def test_committed_writes_reach_every_hook(store, vault, recorder):
+    async def scenario():
+        await vault.create(_entry("a"))
+        await vault.update("a", _entry("a", "Pulsar"))
+        await vault.delete("a")
+
+    asyncio.run(scenario())
+    assert recorder.events == [
+        ("written", "vault", "a", "Kafka"),
+        ("written", "vault", "a", "Pulsar"),
+        ("deleted", "vault", "a"),
+    ]
+    assert recorder.operations == ["create", "update", "delete"]
+    assert "vault/a" not in store.docs
+
+
+def test_writes_to_missing_documents_are_404_without_hooks(store, vault, recorder):
+    for write in (vault.update("missing", _entry("missing")), vault.delete("missing")):
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(write)
+        assert raised.value.status_code == 404
+    assert recorder.events == []
+    # Failed operations are still timed.
+    assert recorder.operations == ["update", "delete"]
+
+
+def test_failed_stage_keeps_the_batch_and_hooks_out(store, vault, recorder):
+    async def stage(batch):
+        raise RuntimeError("extra write could not be staged")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(vault.create(_entry("a"), stage=stage))
+    assert "vault/a" not in store.docs
+    assert recorder.events == []
+
+
+def test_stage_writes_commit_with_the_document(store, vault):
+    async def stage(batch):
+        batch.set(async_db.collection("audit").document("a"), {"action": "create"})
+
+    asyncio.run(vault.create(_entry("a"), stage=stage))
+    assert store.docs["audit/a"] == {"action": "create"}
+    # The card index is written in the same batch.
+    assert store.docs["card_indexes/vault"]["items"]["a"]["title"] == "Kafka"
+
+
+def test_slugged_writes_run_hooks_after_the_transaction(store, recorder):
+    writings = Repository("writings", Writing, hooks=[recorder])
+    data = {
+        "id": "w1", "title": "Logs", "slug": "logs", "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "publishedAt": "2024-01-01T00:00:00Z",
+    }
+    asyncio.run(writings.create(data))
+    assert recorder.events == [("written", "writings", "w1", "Logs")]
+    assert store.docs["writings_slugs/logs"] == {"id": "w1"}
+
+
+def test_slugged_writes_stage_inside_the_transaction(store):
+    writings = Repository("writings", Writing)
+    data = {
+        "id": "w1", "title": "Logs", "slug": "logs", "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "publishedAt": "2024-01-01T00:00:00Z",
+    }
+
+    def audit(action):
+        async def stage(transaction):
+            transaction.set(async_db.collection("audit").document(action), {"id": "w1"})
+        return stage
+
+    async def scenario():
+        await writings.create(data, stage=audit("create"))
+        await writings.update("w1", dict(data, title="Logs 2"), stage=audit("update"))
+        await writings.delete("w1", stage=audit("delete"))
+
+    asyncio.run(scenario())
+    assert {"audit/create", "audit/update", "audit/delete"} <= set(store.docs)
+    assert "writings/w1" not in store.docs and "writings_slugs/logs" not in store.docs
+
+
+def test_notify_written_runs_the_given_hooks(recorder):
+    notify_written("vault", "b", _entry("b"), hooks=[recorder])
+    assert recorder.events == [("written", "vault", "b", "Kafka")]
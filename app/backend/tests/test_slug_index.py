@@ -0,0 +1,46 @@
+import pytest
+
+URL = "/api/v1/writings/"
+
+
+def _writing(slug, title="Logs"):
+    return {
+        "title": title, "slug": slug, "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "publishedAt": "2024-01-01T00:00:00Z",
+    }
+
+
+def test_a_taken_slug_is_a_409(store, client):
+    first = client.post(URL, json=_writing("logs")).json()
+    response = client.post(URL, json=_writing("logs", "Other"))
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Slug 'logs' is already in use"
+    assert store.docs["writings_slugs/logs"] == {"id": first["id"]}
+    assert sum(path.startswith("writings/") for path in store.docs) == 1
+
+
+def test_renaming_releases_the_old_slug(store, client):
+    first = client.post(URL, json=_writing("logs")).json()
+    assert client.put(URL + first["id"], json=_writing("event-logs")).status_code == 200
+    assert "writings_slugs/logs" not in store.docs
+    assert client.get(URL + "event-logs").json()["id"] == first["id"]
+    assert client.get(URL + "logs").status_code == 404
+    assert client.post(URL, json=_writing("logs", "Other")).status_code == 200
+
+
+def test_deleting_releases_the_slug(store, client):
+    first = client.post(URL, json=_writing("logs")).json()
+    client.delete(URL + first["id"])
+    assert "writings_slugs/logs" not in store.docs
+    assert client.post(URL, json=_writing("logs")).status_code == 200
+
+
+def test_documents_written_before_the_index_still_own_their_slug(store, client):
+    store.docs["writings/old"] = dict(_writing("logs"), id="old")
+    assert client.get(URL + "logs").json()["id"] == "old"
+    assert client.post(URL, json=_writing("logs", "Other")).status_code == 409
+
+
+@pytest.mark.parametrize("slug", ["a/b", ".", "..", "_facets"])
+def test_slugs_that_are_not_document_ids_are_a_400(store, client, slug):
+    assert client.post(URL, json=_writing(slug)).status_code == 400
@@ -0,0 +1,99 @@
+import re
+
+from app.core.text_index import InvertedIndex, highlight, match_pattern, tokenize
+
+FIELDS = {
+    "writings": {"title": 2.0, "content": 1.0},
+    "vault": {"title": 2.0, "content": 1.0},
+}
+
+
+def _ids(hits):
+    return [hit["id"] for hit in hits]
+
+
+def _index(*docs):
+    index = InvertedIndex(FIELDS)
+    for collection, doc_id, data in docs:
+        index.add(collection, doc_id, data)
+    return index
+
+
+def test_tokenize():
+    assert tokenize("Kafka's Log, 2 x") == ["kafka", "log", "2"]
+
+
+def test_title_matches_outrank_body_matches():
+    index = _index(
+        ("writings", "body", {"title": "Notes", "content": "queues and kafka"}),
+        ("writings", "title", {"title": "Kafka", "content": "queues and notes"}),
+    )
+    total, hits = index.search("kafka")
+    assert total == 2
+    assert _ids(hits) == ["title", "body"]
+
+
+def test_rare_terms_weigh_more():
+    index = _index(
+        ("writings", "common", {"title": "", "content": "database database"}),
+        ("writings", "rare", {"title": "", "content": "database raft"}),
+        ("writings", "other", {"title": "", "content": "database"}),
+    )
+    _, hits = index.search("database raft")
+    assert _ids(hits)[0] == "rare"
+
+
+def test_shorter_documents_win_on_equal_frequency():
+    index = _index(
+        ("writings", "long", {"title": "", "content": "raft " + "filler words here " * 20}),
+        ("writings", "short", {"title": "", "content": "raft consensus"}),
+    )
+    _, hits = index.search("raft")
+    assert _ids(hits) == ["short", "long"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_last_term_matches_as_prefix():
+    index = _index(
+        ("writings", "a", {"title": "Consensus", "content": ""}),
+        ("writings", "b", {"title": "Consistency", "content": ""}),
+        ("writings", "c", {"title": "Caching", "content": ""}),
+    )
+    assert sorted(_ids(index.search("cons")[1])) == ["a", "b"]
+    # Earlier terms must match whole.
+    assert index.search("cons caching")[0] == 1
+
+
+def test_reindex_and_remove():
+    index = _index(("writings", "a", {"title": "Kafka", "content": ""}))
+    index.add("writings", "a", {"title": "Pulsar", "content": ""})
+    assert index.search("kafka") == (0, [])
+    assert index.search("pulsar")[0] == 1
+    index.remove("writings", "a")
+    assert len(index) == 0 and index.term_count == 0
+    assert index.search("pulsar") == (0, [])
+
+
+def test_collection_filter_and_limit():
+    index = _index(*[(collection, f"{collection}-{i}", {"title": "kafka", "content": ""})
+                     for collection in ("writings", "vault") for i in range(3)])
+    total, hits = index.search("kafka", collections=["vault"], limit=2)
+    assert total == 3
+    assert len(hits) == 2 and {hit["collection"] for hit in hits} == {"vault"}
+
+
+def test_scores_are_recomputed_after_writes():
+    index = _index(("writings", "a", {"title": "kafka", "content": ""}))
+    before = index.search("kafka")[1][0]["score"]
+    index.add("writings", "b", {"title": "other", "content": ""})
+    after = index.search("kafka")[1][0]["score"]
+    # One more document without the term raises its idf.
+    assert after > before
+
+
+def test_highlight_escapes_and_marks_whole_tokens():
+    pattern = match_pattern(["kafka"])
+    snippet = highlight("<b>Kafka</b> and kafkaesque", pattern)
+    assert snippet == "&lt;b&gt;<mark>Kafka</mark>&lt;/b&gt; and kafkaesque"
+    assert highlight("nothing here", pattern) is None
+    assert isinstance(pattern, re.Pattern)
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from pydantic import TypeAdapter, ValidationError
+
+from app.core import http_cache
+from app.core.http_cache import TrustedRenderer, render
+from app.core.pagination import projection_adapter
+from app.models.content import ArenaThread, Project, VaultEntry, Writing
+
+PUBLISHED = DatetimeWithNanoseconds(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+
+DOCS = [
+    (Project, {
+        "id": "p1", "title": "Kafka", "slug": "kafka", "thumbnail": "", "oneLiner": "Logs", "techStack": ["kafka"],
+        "overview": "Ünïcode ✓", "github": None, "internalNote": "extra fields are dropped",
+    }),
+    (Writing, {
+        "id": "w1", "title": "Logs", "slug": "logs", "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 3, "tags": ["a", "b"], "publishedAt": PUBLISHED,
+    }),
+    (Writing, {
+        "id": "w2", "title": "Naive", "slug": "naive", "thumbnail": "", "excerpt": "", "content": "",
+        "readingTime": 1, "tags": [], "series": "s", "publishedAt": datetime(2024, 1, 1, 12),
+    }),
+    (ArenaThread, {"id": "t1", "title": "Queues?", "content": "", "publishedAt": PUBLISHED, "likes": 3}),
+    (VaultEntry, {"id": "v1", "title": "Raft", "category": "db", "tags": [], "content": "x" * 50}),
+]
+
+
+def _validated(model, data):
+    adapter = TypeAdapter(List[model]) if isinstance(data, list) else TypeAdapter(model)
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+@pytest.mark.parametrize("model, doc", DOCS, ids=[f"{model.__name__}-{doc['id']}" for model, doc in DOCS])
+def test_trusted_output_matches_validated_output(model, doc):
+    renderer = TrustedRenderer(model)
+    assert renderer.render(doc).body == _validated(model, doc)
+    assert renderer.render([doc, doc]).body == _validated(model, [doc, doc])
+
+
+def test_documents_missing_required_fields_are_validated():
+    doc = {"id": "v1", "title": "Raft", "category": "db", "tags": []}
+    with pytest.raises(ValidationError):
+        TrustedRenderer(VaultEntry).render(doc)
+
+
+def test_trusted_reads_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(http_cache, "TRUSTED_READS", False)
+    doc = dict(DOCS[0][1], techStack="not a list")
+    with pytest.raises(ValidationError):
+        TrustedRenderer(Project).render(doc)
+
+
+def test_trusted_projections_match_validated_ones():
+    items = [{"id": "w1", "title": "Logs", "publishedAt": PUBLISHED, "tags": ["a"]}]
+    trusted = render(items, projection_adapter, trusted=True).body
+    assert trusted == render(items, projection_adapter).body
@@ -23,4 +23,65 @@ api.interceptors.request.use(
     }
 );
 
+const BOOTSTRAP_STORAGE_KEY = 'bootstrap-sections';
+
+function readStoredSections() {
+    try {
+        return JSON.parse(sessionStorage.getItem(BOOTSTRAP_STORAGE_KEY)) || {};
+    } catch {
+        return {};
+    }
+}
+
+// Every document of a list endpoint, projected to `fields`. Card-only
+// projections are served from the backend's card index; pages of up to 100
+// are followed through the X-Next-Cursor header.
+export async function fetchCards(path, fields) {
+    const items = [];
+    let cursor = null;
+    do {
+        const params = { fields: fields.join(','), limit: 100 };
+        if (cursor) {
+            params.cursor = cursor;
+        }
+        const response = await api.get(path, { params });
+        items.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return items;
+}
+
+// Card data for several collections in one request. Sections are kept in
+// sessionStorage with their etag; ones the server reports unchanged are not
+// sent again.
+export async function fetchBootstrap(sections = ['projects', 'writings', 'systems']) {
+    const stored = readStoredSections();
+    const known = sections
+        .filter((name) => stored[name])
+        .map((name) => `${name}:${stored[name].etag}`)
+        .join(',');
+    const params = { sections: sections.join(',') };
+    if (known) {
+        params.known = known;
+    }
+    const response = await api.get('/bootstrap/', { params });
+
+    const result = {};
+    for (const name of sections) {
+        const section = response.data[name];
+        if (section.unchanged && stored[name]) {
+            result[name] = stored[name].items;
+        } else {
+            result[name] = section.items || [];
+            stored[name] = { etag: section.etag, items: result[name] };
+        }
+    }
+    try {
+        sessionStorage.setItem(BOOTSTRAP_STORAGE_KEY, JSON.stringify(stored));
+    } catch {
+        // Storage full or unavailable: the next visit just downloads everything.
+    }
+    return result;
+}
+
 export default api;
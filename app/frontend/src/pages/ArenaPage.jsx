@@ -5,11 +5,14 @@ import api from '../lib/api';
 import { Button } from '@/components/ui/button';
 import { Textarea } from '@/components/ui/textarea';
 
+const COMMENTS_PAGE_SIZE = 20;
+
 export default function ArenaPage() {
   const [arenaThreads, setArenaThreads] = useState([]);
   const [loading, setLoading] = useState(true);
   const [commentText, setCommentText] = useState({}); // Map of threadId -> text
   const [submittingComment, setSubmittingComment] = useState({}); // Map of threadId -> boolean
+  const [comments, setComments] = useState({}); // Map of threadId -> { items, cursor, loading }
 
   useEffect(() => {
     fetchThreads();
@@ -23,6 +26,7 @@ export default function ArenaPage() {
       setArenaThreads(sorted.map(t => ({
         ...t,
         responses: t.responses || [],
+        commentCount: t.commentCount || (t.responses || []).length,
         likes: t.likes || 0,
         dislikes: t.dislikes || 0
       })));
@@ -55,6 +59,27 @@ export default function ArenaPage() {
     }
   };
 
+  const loadComments = async (threadId) => {
+    const current = comments[threadId];
+    setComments(prev => ({ ...prev, [threadId]: { items: [], ...current, loading: true } }));
+    try {
+      const response = await api.get(`/arena/${threadId}/comments`, {
+        params: { limit: COMMENTS_PAGE_SIZE, cursor: current?.cursor },
+      });
+      setComments(prev => ({
+        ...prev,
+        [threadId]: {
+          items: [...(current?.items || []), ...response.data],
+          cursor: response.headers['x-next-cursor'] || null,
+          loading: false,
+        },
+      }));
+    } catch (err) {
+      console.error("Failed to load comments", err);
+      setComments(prev => ({ ...prev, [threadId]: { items: [], ...current, loading: false } }));
+    }
+  };
+
   const handleCommentSubmit = async (threadId) => {
     const text = commentText[threadId];
     if (!text || !text.trim()) return;
@@ -68,12 +93,16 @@ export default function ArenaPage() {
 
       const newComment = response.data;
 
-      setArenaThreads(prev => prev.map(t => {
-        if (t.id === threadId) {
-          return { ...t, responses: [...(t.responses || []), newComment] };
-        }
-        return t;
-      }));
+      setArenaThreads(prev => prev.map(t =>
+        t.id === threadId ? { ...t, commentCount: (t.commentCount || 0) + 1 } : t
+      ));
+      // Only append to a fully loaded list; otherwise it arrives with the next page.
+      const hadComments = arenaThreads.find(t => t.id === threadId)?.commentCount > 0;
+      setComments(prev => {
+        const current = prev[threadId] || (hadComments ? null : { items: [], cursor: null });
+        if (!current || current.cursor) return prev;
+        return { ...prev, [threadId]: { ...current, items: [...current.items, newComment] } };
+      });
 
       setCommentText(prev => ({ ...prev, [threadId]: '' }));
     } catch (err) {
@@ -152,7 +181,7 @@ export default function ArenaPage() {
                     </Button>
                     <div className="flex items-center gap-2 text-muted-foreground ml-auto">
                       <MessageSquare className="w-4 h-4" />
-                      <span className="text-sm">{thread.responses?.length || 0} Comments</span>
+                      <span className="text-sm">{thread.commentCount || 0} Comments</span>
                     </div>
                   </div>
                 </div>
@@ -185,7 +214,7 @@ export default function ArenaPage() {
 
                   {/* Comment List */}
                   <div className="space-y-4">
-                    {thread.responses && thread.responses.map((response) => (
+                    {(comments[thread.id]?.items || thread.responses).map((response) => (
                       <div
                         key={response.id}
                         className="bg-glass-bg/50 rounded-lg p-4 border border-glass-border backdrop-blur-sm"
@@ -211,7 +240,23 @@ export default function ArenaPage() {
                         </p>
                       </div>
                     ))}
-                    {(!thread.responses || thread.responses.length === 0) && (
+                    {(comments[thread.id]
+                      ? comments[thread.id].cursor || comments[thread.id].loading
+                      : thread.commentCount > thread.responses.length) && (
+                      <div className="flex justify-center">
+                        <Button
+                          variant="ghost"
+                          size="sm"
+                          onClick={() => loadComments(thread.id)}
+                          disabled={comments[thread.id]?.loading}
+                        >
+                          {comments[thread.id]?.loading
+                            ? 'Loading...'
+                            : comments[thread.id] ? 'Load more comments' : `View ${thread.commentCount} comments`}
+                        </Button>
+                      </div>
+                    )}
+                    {!thread.commentCount && (
                       <p className="text-sm text-center text-muted-foreground italic">No comments yet. Be the first to share your thoughts.</p>
                     )}
                   </div>
@@ -4,7 +4,7 @@ import { ArrowRight, Code2, Brain, Database, Cloud, Trophy, Award, Star, Zap, Te
 import Layout from '../components/layout/Layout';
 import CompetitiveAchievements from '../components/home/CompetitiveAchievements';
 import { personalInfo, expertiseDomains, testimonials } from '../data/mock';
-import api from '../lib/api';
+import { fetchBootstrap } from '../lib/api';
 import { Badge } from '../components/ui/badge';
 
 const domainIcons = {
@@ -23,13 +23,11 @@ export default function HomePage() {
   useEffect(() => {
     async function fetchData() {
       try {
-        const [projectsRes, writingsRes] = await Promise.all([
-          api.get('/projects/'),
-          api.get('/writings/')
-        ]);
+        // One request for the project and writing cards.
+        const sections = await fetchBootstrap(['projects', 'writings']);
 
         // Projects Logic
-        const allProjects = projectsRes.data || [];
+        const allProjects = sections.projects || [];
         const publishedProjects = allProjects.filter(p => p.status === 'published');
 
         // 1. Set total count for stats (only published ones)
@@ -42,7 +40,7 @@ export default function HomePage() {
         setProjects(projectsToShow);
 
         // Sort writings by date desc and take top 2
-        const allWritings = writingsRes.data || [];
+        const allWritings = [...(sections.writings || [])];
         const sortedWritings = allWritings.sort((a, b) => new Date(b.publishedAt) - new Date(a.publishedAt));
         setWritings(sortedWritings.slice(0, 2));
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
 import api from '../lib/api'; // Import API client
 import {
@@ -28,9 +28,12 @@ export default function ProjectDetailPage() {
   const [aiExplanation, setAiExplanation] = useState(null);
   const [aiLoading, setAiLoading] = useState(false);
   const [selectedDepth, setSelectedDepth] = useState(null);
+  const [aiStreaming, setAiStreaming] = useState(false);
+  const explanationStream = useRef(null);
 
   useEffect(() => {
     fetchProject();
+    return () => explanationStream.current?.close();
   }, [slug]);
 
   async function fetchProject() {
@@ -74,10 +77,51 @@ export default function ProjectDetailPage() {
     setExpandedSection(expandedSection === section ? null : section);
   };
 
-  // AI explanation handler
-  const getAiExplanation = async (depth) => {
+  // AI explanation handler: stream the answer, fall back to a single request
+  const getAiExplanation = (depth) => {
+    explanationStream.current?.close();
     setAiLoading(true);
+    setAiStreaming(true);
     setSelectedDepth(depth);
+    setAiExplanation(null);
+
+    let received = false;
+    const source = new EventSource(
+      `${api.defaults.baseURL}/projects/slug/${slug}/explain/stream?persona=${encodeURIComponent(depth)}`
+    );
+    explanationStream.current = source;
+    const finish = () => {
+      source.close();
+      setAiLoading(false);
+      setAiStreaming(false);
+    };
+
+    source.addEventListener('chunk', (event) => {
+      const { text } = JSON.parse(event.data);
+      if (!received) {
+        received = true;
+        setAiLoading(false);
+      }
+      setAiExplanation(prev => (prev || '') + text);
+    });
+    source.addEventListener('done', finish);
+    source.addEventListener('failed', (event) => {
+      if (!received) setAiExplanation(JSON.parse(event.data).detail);
+      finish();
+    });
+    source.onerror = () => {
+      // Connection-level failure (EventSource would keep reconnecting).
+      source.close();
+      if (received) {
+        finish();
+      } else {
+        fetchAiExplanation(depth).finally(() => setAiStreaming(false));
+      }
+    };
+  };
+
+  const fetchAiExplanation = async (depth) => {
+    setAiLoading(true);
 
     try {
       const response = await api.post(`/projects/slug/${slug}/explain`, {
@@ -219,7 +263,7 @@ export default function ProjectDetailPage() {
             <Button
               variant={selectedDepth === 'recruiter' ? 'default' : 'outline'}
               onClick={() => getAiExplanation('recruiter')}
-              disabled={aiLoading}
+              disabled={aiLoading || aiStreaming}
               className={selectedDepth === 'recruiter' ? 'bg-primary text-primary-foreground border-none' : 'border-glass-border text-muted-foreground hover:bg-glass-bg hover:text-foreground'}
             >
               Recruiter (30s)
@@ -227,7 +271,7 @@ export default function ProjectDetailPage() {
             <Button
               variant={selectedDepth === 'engineer' ? 'default' : 'outline'}
               onClick={() => getAiExplanation('engineer')}
-              disabled={aiLoading}
+              disabled={aiLoading || aiStreaming}
               className={selectedDepth === 'engineer' ? 'bg-primary text-primary-foreground border-none' : 'border-glass-border text-muted-foreground hover:bg-glass-bg hover:text-foreground'}
             >
               Engineer (5 min)
@@ -235,7 +279,7 @@ export default function ProjectDetailPage() {
             <Button
               variant={selectedDepth === 'architect' ? 'default' : 'outline'}
               onClick={() => getAiExplanation('architect')}
-              disabled={aiLoading}
+              disabled={aiLoading || aiStreaming}
               className={selectedDepth === 'architect' ? 'bg-primary text-primary-foreground border-none' : 'border-glass-border text-muted-foreground hover:bg-glass-bg hover:text-foreground'}
             >
               Architect (Deep Dive)
@@ -2,11 +2,13 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, Filter } from 'lucide-react';
 import Layout from '../components/layout/Layout';
-import api from '../lib/api';
+import { fetchCards } from '../lib/api';
 import { Badge } from '../components/ui/badge';
 import { Input } from '../components/ui/input';
 import LoadingState from '../components/ui/LoadingState';
 
+const PROJECT_CARD_FIELDS = ['title', 'slug', 'thumbnail', 'oneLiner', 'techStack', 'featured', 'status'];
+
 export default function ProjectsPage() {
   const [projects, setProjects] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
@@ -19,9 +21,9 @@ export default function ProjectsPage() {
 
   async function fetchProjects() {
     try {
-      const response = await api.get('/projects/');
+      const cards = await fetchCards('/projects/', PROJECT_CARD_FIELDS);
       // Filter only published projects for public view
-      const published = response.data.filter(p => p.status === 'published');
+      const published = cards.filter(p => p.status === 'published');
       setProjects(published);
     } catch (err) {
       console.error("Failed to fetch projects", err);
@@ -3,10 +3,12 @@ import { Link } from 'react-router-dom';
 import { Search, Clock, Tag, BookOpen } from 'lucide-react';
 import Layout from '../components/layout/Layout';
 // import { writings } from '../data/mock'; // Removed mock
-import api from '../lib/api';
+import { fetchCards } from '../lib/api';
 import { Badge } from '../components/ui/badge';
 import { Input } from '../components/ui/input';
 
+const WRITING_CARD_FIELDS = ['title', 'slug', 'thumbnail', 'excerpt', 'tags', 'series', 'readingTime', 'publishedAt'];
+
 export default function WritingsPage() {
   const [writings, setWritings] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
@@ -20,8 +22,7 @@ export default function WritingsPage() {
 
   async function fetchWritings() {
     try {
-      const response = await api.get('/writings/');
-      setWritings(response.data);
+      setWritings(await fetchCards('/writings/', WRITING_CARD_FIELDS));
     } catch (err) {
       console.error("Failed to fetch writings", err);
     } finally {